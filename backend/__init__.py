@@ -0,0 +1 @@
+# Thema Signal Backend
@@ -0,0 +1,337 @@
+"""
+테마 지표 계산 모듈 (calculation_logic.md 1~3장)
+- 월별 가격 데이터를 (종목 × 거래일) 행렬로 적재
+- 전체 종목/테마 지표를 한 번에 벡터 연산으로 계산
+- 결과를 theme_metrics.json 으로 저장 (웹에서 그대로 렌더링)
+"""
+import os
+import sys
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# crawlers/storage 모듈 경로 추가
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "crawlers"))
+
+import storage
+
+try:
+    from backend import history_recorder
+except ImportError:
+    # python backend/calculator.py 로 직접 실행
+    import history_recorder
+
+
+# ============================================
+# 파라미터 (calculation_logic.md 6장)
+# ============================================
+PERIODS = (3, 6, 9)              # 수익률 계산 기간 (주)
+TRADING_DAYS_PER_WEEK = 5        # 주당 거래일 수
+AVG_VOLUME_DAYS = 5              # 평균 거래대금 계산 일수 (1주)
+TOP_N_MIN = 3                    # 테마 수익률 계산 상위 종목 수 (최소)
+TOP_N_STOCKS = 5                 # 테마 수익률 계산 상위 종목 수 (최대)
+SPREAD_THRESHOLD_3W = 10         # 3주 확산도 기준 수익률 (%)
+SPREAD_THRESHOLD_6W = 15         # 6주 확산도 기준 수익률 (%)
+STAGE_1_THRESHOLD = 20           # 1→2단계 확산도 기준 (%)
+STAGE_2_THRESHOLD = 50           # 2→3단계 확산도 기준 (%)
+
+
+class PriceMatrix:
+    """종목 × 거래일 가격 행렬 (거래일 오름차순, 데이터 없는 칸은 NaN)"""
+
+    def __init__(self, codes: List[str], dates: List[str], close: np.ndarray, value: np.ndarray):
+        self.codes = codes
+        self.dates = dates
+        self.close = close
+        self.value = value
+        self.index = {code: i for i, code in enumerate(codes)}
+
+    @classmethod
+    def from_store(cls, dates: List[str], codes: List[str], close: np.ndarray, value: np.ndarray) -> "PriceMatrix":
+        """
+        storage.load_prices_range(columnar=True) 결과를 행렬로 변환
+
+        Args:
+            dates: 거래일 목록
+            codes: 종목코드 목록
+            close/value: (거래일 × 종목) int64 배열, 데이터 없으면 PriceStore.MISSING
+        """
+        present = np.asarray(close).T != storage.PriceStore.MISSING
+        close_matrix = np.where(present, np.asarray(close).T, np.nan)
+        value_matrix = np.where(present, np.asarray(value).T, np.nan)
+        return cls(list(codes), list(dates), close_matrix, value_matrix)
+
+    @property
+    def last_date(self) -> Optional[str]:
+        """마지막 거래일"""
+        return self.dates[-1] if self.dates else None
+
+
+# ============================================
+# 1. 종목별 지표
+# ============================================
+def _nth_recent(matrix: PriceMatrix, days_ago: int) -> np.ndarray:
+    """
+    종목별 N거래일 전 종가 (종목마다 데이터가 있는 날짜 기준)
+
+    Returns:
+        (종목 수,) 배열, 데이터가 없거나 종가 0이면 NaN
+    """
+    present = ~np.isnan(matrix.close)
+    # 각 칸에서 마지막 거래일까지 남은 데이터 개수 (해당 칸 포함)
+    remaining = np.cumsum(present[:, ::-1], axis=1)[:, ::-1]
+
+    mask = present & (remaining == days_ago + 1)
+    has_value = mask.any(axis=1)
+    cols = mask.argmax(axis=1)
+
+    prices = matrix.close[np.arange(len(matrix.codes)), cols]
+    return np.where(has_value & (prices > 0), prices, np.nan)
+
+
+def calc_stock_metrics(matrix: PriceMatrix) -> Dict[str, np.ndarray]:
+    """
+    전체 종목 지표 일괄 계산
+
+    Returns:
+        {
+            "return_3w": (종목 수,) 배열 (계산 불가 시 NaN),
+            "return_6w": ...,
+            "return_9w": ...,
+            "avg_volume_1w": (종목 수,) 배열
+        }
+    """
+    metrics = {}
+    current = _nth_recent(matrix, 0)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for weeks in PERIODS:
+            past = _nth_recent(matrix, weeks * TRADING_DAYS_PER_WEEK)
+            metrics[f"return_{weeks}w"] = (current - past) / past * 100
+
+        # 최근 5거래일 평균 거래대금
+        present = ~np.isnan(matrix.close)
+        remaining = np.cumsum(present[:, ::-1], axis=1)[:, ::-1]
+        recent = present & (remaining <= AVG_VOLUME_DAYS)
+        total = np.where(recent, np.nan_to_num(matrix.value), 0).sum(axis=1)
+        count = recent.sum(axis=1)
+        metrics["avg_volume_1w"] = np.where(count > 0, total / np.maximum(count, 1), 0)
+
+    return metrics
+
+
+# ============================================
+# 2. 테마별 지표
+# ============================================
+def _membership_matrix(themes: List[Dict], matrix: PriceMatrix, theme_index: Optional[Dict] = None) -> np.ndarray:
+    """
+    테마 × 종목 인덱스 행렬 (가격 데이터 없는 종목/빈칸은 -1)
+    - theme_index(storage.load_theme_index)가 있으면 종목코드 조회는 고유 종목당 1회
+    """
+    if theme_index is None or theme_index["themes"] != [theme["id"] for theme in themes]:
+        theme_index = storage.build_theme_index(themes)
+
+    # 역색인 종목 ID -> 가격 행렬 행
+    positions = np.array([matrix.index.get(code, -1) for code in theme_index["codes"]] or [-1], dtype=np.int64)
+
+    width = max((len(stock_ids) for stock_ids in theme_index["members"]), default=0)
+    members = np.full((len(themes), max(width, 1)), -1, dtype=np.int64)
+
+    for t, stock_ids in enumerate(theme_index["members"]):
+        members[t, :len(stock_ids)] = positions[stock_ids]
+
+    return members
+
+
+def _gather(values: np.ndarray, members: np.ndarray) -> np.ndarray:
+    """종목 지표를 테마 × 종목 형태로 모음 (빈칸은 NaN)"""
+    if len(values) == 0:
+        return np.full(members.shape, np.nan)
+    return np.where(members >= 0, values[members], np.nan)
+
+
+def _theme_return(returns: np.ndarray) -> np.ndarray:
+    """테마 수익률 = 상위 3~5개 종목 수익률 평균 (종목 수에 따라 조정)"""
+    ordered = -np.sort(-returns, axis=1)  # 내림차순, NaN은 뒤로
+    count = (~np.isnan(returns)).sum(axis=1)
+
+    top_count = np.minimum(np.clip(count // 2, TOP_N_MIN, TOP_N_STOCKS), count)
+    top_count = np.maximum(top_count, 1)
+    cumsum = np.cumsum(np.nan_to_num(ordered), axis=1)
+    top_sum = cumsum[np.arange(len(returns)), top_count - 1]
+
+    return np.where(count > 0, top_sum / top_count, 0.0)
+
+
+def _spread(returns: np.ndarray, threshold: float) -> np.ndarray:
+    """확산도 = threshold 이상 상승 종목 비율 (%, 반올림)"""
+    count = (~np.isnan(returns)).sum(axis=1)
+    above = (returns >= threshold).sum(axis=1)
+    ratio = above / np.maximum(count, 1) * 100
+    return np.where(count > 0, np.floor(ratio + 0.5), 0).astype(int)
+
+
+def _leader_positions(values: np.ndarray, strict_positive: bool = False) -> np.ndarray:
+    """
+    테마별 대장주 위치 (테마 종목 리스트 내 인덱스, 없으면 -1)
+    - 동률이면 먼저 나온 종목
+    """
+    filled = np.where(np.isnan(values), -np.inf, values)
+    positions = filled.argmax(axis=1)
+    best = filled[np.arange(len(values)), positions]
+    valid = best > 0 if strict_positive else np.isfinite(best)
+    return np.where(valid, positions, -1)
+
+
+def _ranks(values: np.ndarray) -> np.ndarray:
+    """내림차순 순위 (동률이면 원래 순서 유지)"""
+    order = np.argsort(-values, kind="stable")
+    ranks = np.empty(len(values), dtype=int)
+    ranks[order] = np.arange(1, len(values) + 1)
+    return ranks
+
+
+def determine_stage(return_3w: float, return_6w: float, spread_3w: int, spread_6w: int) -> Dict[str, str]:
+    """
+    단계 결정 (web/data.js determineStage 와 동일)
+
+    Returns:
+        {"stage": "2단계", "label": "확산"}
+    """
+    max_spread = max(spread_3w, spread_6w)
+
+    if max_spread >= STAGE_2_THRESHOLD:
+        return {"stage": "3단계", "label": "과열"}
+    if max_spread >= STAGE_1_THRESHOLD:
+        return {"stage": "2단계", "label": "확산"}
+    if return_3w >= SPREAD_THRESHOLD_3W or return_6w >= SPREAD_THRESHOLD_6W:
+        return {"stage": "1단계", "label": "초기"}
+    if return_3w >= 5 or return_6w >= 8:
+        return {"stage": "0단계", "label": "주목"}
+
+    # 하락 추세 판단
+    if return_3w < 0 and spread_3w < 10:
+        if return_6w < 0:
+            return {"stage": "소멸", "label": "소멸"}
+        return {"stage": "정리", "label": "정리"}
+
+    return {"stage": "0단계", "label": "주목"}
+
+
+def _number(value: float) -> float:
+    """NaN -> 0 (data.js 의 `|| 0` 과 동일)"""
+    return 0 if np.isnan(value) else float(value)
+
+
+def calc_theme_metrics(themes: List[Dict], matrix: PriceMatrix, theme_index: Optional[Dict] = None) -> List[Dict]:
+    """
+    전체 테마 지표 일괄 계산
+
+    Args:
+        themes: storage.load_themes() 결과
+        matrix: 가격 행렬
+        theme_index: storage.load_theme_index() 결과 (없으면 themes 로 생성)
+
+    Returns:
+        [{
+            "id": "141",
+            "name": "2차전지_소재",
+            "stocks": [...],
+            "metrics": {"return_3w": ..., "spread_3w": ..., "rank_3w": ..., "stage": ..., "leader_3w": ...},
+            "stockMetrics": {"005930": {"return_3w": ..., "avg_volume_1w": ...}, ...},
+            "history": []
+        }, ...]
+    """
+    if not themes:
+        return []
+
+    stock_metrics = calc_stock_metrics(matrix)
+    members = _membership_matrix(themes, matrix, theme_index)
+
+    gathered = {key: _gather(values, members) for key, values in stock_metrics.items()}
+
+    theme_returns = {weeks: _theme_return(gathered[f"return_{weeks}w"]) for weeks in PERIODS}
+    theme_ranks = {weeks: _ranks(theme_returns[weeks]) for weeks in PERIODS}
+    leaders = {weeks: _leader_positions(gathered[f"return_{weeks}w"]) for weeks in PERIODS}
+    volume_leaders = _leader_positions(gathered["avg_volume_1w"], strict_positive=True)
+    spread_3w = _spread(gathered["return_3w"], SPREAD_THRESHOLD_3W)
+    spread_6w = _spread(gathered["return_6w"], SPREAD_THRESHOLD_6W)
+
+    def leader_code(theme, position):
+        return theme["stocks"][position] if position >= 0 else None
+
+    result = []
+    for t, theme in enumerate(themes):
+        metrics = {}
+        for weeks in PERIODS:
+            metrics[f"return_{weeks}w"] = float(theme_returns[weeks][t])
+        metrics["spread_3w"] = int(spread_3w[t])
+        metrics["spread_6w"] = int(spread_6w[t])
+        for weeks in PERIODS:
+            metrics[f"rank_{weeks}w"] = int(theme_ranks[weeks][t])
+
+        stage = determine_stage(metrics["return_3w"], metrics["return_6w"], metrics["spread_3w"], metrics["spread_6w"])
+        metrics["stage"] = stage["stage"]
+        metrics["stageLabel"] = stage["label"]
+
+        for weeks in PERIODS:
+            metrics[f"leader_{weeks}w"] = leader_code(theme, leaders[weeks][t])
+        metrics["leader_volume"] = leader_code(theme, volume_leaders[t])
+
+        # 종목별 지표 (테마 내 종목 순서 유지)
+        theme_stock_metrics = {}
+        for s, code in enumerate(theme["stocks"]):
+            theme_stock_metrics[code] = {
+                key: _number(gathered[key][t, s]) for key in stock_metrics
+            }
+
+        result.append({
+            "id": theme["id"],
+            "name": theme["name"],
+            "stocks": theme["stocks"],
+            "metrics": metrics,
+            "stockMetrics": theme_stock_metrics,
+            "history": []
+        })
+
+    return result
+
+
+# ============================================
+# 실행
+# ============================================
+def run_calculation(months: Optional[List[str]] = None, record_history: bool = False) -> List[Dict]:
+    """
+    저장된 데이터로 전체 테마 지표 계산 후 theme_metrics.json + 웹 데이터 묶음 저장
+
+    Args:
+        months: 가격 데이터 월 목록, 기본값 최근 3개월 (웹과 동일)
+        record_history: True면 일별 히스토리 기록 + 꺾임 판정 반영 (일별 크롤링 후)
+
+    Returns:
+        계산된 테마 지표 리스트
+    """
+    if months is None:
+        months = storage.get_recent_months(3)
+
+    themes = storage.load_themes()
+    matrix = PriceMatrix.from_store(*storage.load_prices_range(months, columnar=True))
+    print(f"가격 행렬: {len(matrix.codes)}개 종목 × {len(matrix.dates)}거래일")
+
+    result = calc_theme_metrics(themes, matrix, storage.load_theme_index())
+    if record_history and matrix.last_date:
+        history_recorder.record_history(matrix.last_date, result)
+    elif result:
+        # 기록하지 않는 재계산: 마지막 기록의 단계 변화 이벤트 + 같은 날 꺾임 단계 유지
+        history_recorder.attach_history(result, matrix.last_date)
+    storage.save_theme_metrics(matrix.last_date, result)
+    print(f"테마 지표 계산 완료: {len(result)}개 테마")
+
+    # 웹 데이터 묶음 (테마 지표 포함)
+    storage.export_web_bundle()
+    return result
+
+
+if __name__ == "__main__":
+    # 인자로 월 목록 지정 가능: python calculator.py 2026-01 2025-12 2025-11
+    run_calculation(sys.argv[1:] or None)
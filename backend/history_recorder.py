@@ -0,0 +1,209 @@
+"""
+테마 히스토리 기록 (calculation_logic.md 3.2 ~ 4장)
+- 일별 크롤링 후 테마별 지표를 하루 한 줄로 기록 (history/YYYY-MM.jsonl, append-only)
+- 꺾임 판정은 증분 상태(전일 값, 고점, 연속 감소 일수)만 사용 (전체 기록 재조회 없음)
+- 꺾임 시 단계 전환 (3.3) 및 단계 변화 이벤트 생성 (4.2) -> theme_metrics.json "history"
+"""
+import os
+import sys
+from typing import Dict, List, Optional
+
+# crawlers/storage 모듈 경로 추가
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "crawlers"))
+
+import storage
+
+
+# ============================================
+# 파라미터 (calculation_logic.md 6장)
+# ============================================
+DECLINE_DAY_THRESHOLD = 3        # 전일 대비 꺾임 기준 (%p)
+DECLINE_PEAK_THRESHOLD = 5       # 고점 대비 꺾임 기준 (%p)
+DECLINE_STREAK_DAYS = 2          # 연속 감소 꺾임 기준 (일)
+HISTORY_EVENTS = 10              # theme_metrics.json 에 포함할 최근 단계 변화 수
+
+RISING_STAGES = ("0단계", "1단계", "2단계", "3단계")
+
+# 상승 종목 기준 (3.1)
+RISING_RETURN_3W = 10
+RISING_RETURN_6W = 15
+
+
+def detect_collapse(state: Optional[Dict], return_3w: float) -> Dict:
+    """
+    꺾임 판정 (3.2) - 증분 상태만 사용
+
+    Args:
+        state: 테마 이전 상태 {"prev": 전일 수익률, "peak": 고점, "streak": 연속 감소 일수}
+        return_3w: 오늘 테마 3주 수익률
+
+    Returns:
+        {"collapse": "day" | "peak" | "streak" | None, "prev", "peak", "streak", "drop_from_peak"}
+    """
+    if not state:
+        return {"collapse": None, "prev": return_3w, "peak": return_3w, "streak": 0, "drop_from_peak": 0.0}
+
+    prev = state["prev"]
+    peak = max(state["peak"], return_3w)
+    streak = state["streak"] + 1 if return_3w < prev else 0
+    drop_from_peak = peak - return_3w
+
+    collapse = None
+    if prev - return_3w >= DECLINE_DAY_THRESHOLD:
+        collapse = "day"
+    elif drop_from_peak >= DECLINE_PEAK_THRESHOLD:
+        collapse = "peak"
+    elif streak >= DECLINE_STREAK_DAYS:
+        collapse = "streak"
+
+    return {
+        "collapse": collapse,
+        "prev": return_3w,
+        # 꺾임 후에는 현재 값부터 고점을 다시 추적
+        "peak": return_3w if collapse else peak,
+        "streak": streak,
+        "drop_from_peak": drop_from_peak,
+    }
+
+
+def stage_message(theme: Dict, stage: str, drop_from_peak: float, stock_names: Dict[str, Dict]) -> str:
+    """단계 진입 이벤트 메시지 (4.2)"""
+    metrics = theme["metrics"]
+    if stage == "0단계":
+        leader = metrics.get("leader_3w")
+        name = stock_names.get(leader, {}).get("name", leader) if leader else "-"
+        return f"{name} 단독 상승"
+    if stage == "1단계":
+        rising = sum(
+            1 for stock in theme.get("stockMetrics", {}).values()
+            if stock["return_3w"] >= RISING_RETURN_3W or stock["return_6w"] >= RISING_RETURN_6W
+        )
+        return f"{rising}개 종목 상승, 테마 형성 시작"
+    if stage == "2단계":
+        return f"확산도 {max(metrics['spread_3w'], metrics['spread_6w'])}% 돌파"
+    if stage == "3단계":
+        return f"확산도 {max(metrics['spread_3w'], metrics['spread_6w'])}% 돌파, 과열 구간"
+    if stage == "정리":
+        return f"고점 대비 -{drop_from_peak:.1f}%p 하락, 차익실현 구간"
+    return "테마 형성 실패"
+
+
+def _row(metrics: Dict, collapse: Optional[str]) -> List:
+    """기록 한 줄의 테마 값 (storage.HISTORY_FIELDS 순서)"""
+    values = {key: metrics.get(key) for key in storage.HISTORY_FIELDS}
+    for key in ("return_3w", "return_6w", "return_9w"):
+        values[key] = round(values[key], 2)
+    values["collapse"] = collapse
+    return [values[key] for key in storage.HISTORY_FIELDS]
+
+
+def record_history(date: str, themes: List[Dict]) -> List[Dict]:
+    """
+    하루치 테마 기록 (calc_theme_metrics 결과에 꺾임 단계/히스토리 반영)
+    - 같은 날짜를 다시 기록하면 마지막 줄을 교체 (전날 상태 기준으로 재계산)
+    - 이전 날짜는 기록하지 않음
+
+    Args:
+        date: 기준일 (가격 데이터 마지막 거래일)
+        themes: calc_theme_metrics 결과 (metrics.stage/stageLabel, history 갱신됨)
+
+    Returns:
+        themes
+    """
+    state = storage.load_history_state()
+    last_date = state.get("date")
+
+    if last_date and date < last_date:
+        print(f"히스토리 기록 생략: {date} (마지막 기록 {last_date})")
+        return attach_history(themes, date)
+
+    truncate_at = None
+    previous = state.get("themes", {})
+    if date == last_date:
+        truncate_at = state["offset"]
+        previous = state.get("base", {})
+
+    stock_names = storage.load_stocks()
+    current = {}
+    rows = {}
+    for theme in themes:
+        metrics = theme["metrics"]
+        theme_state = previous.get(theme["id"])
+
+        result = detect_collapse(theme_state, metrics["return_3w"])
+        prev_stage = theme_state.get("stage") if theme_state else None
+
+        # 꺾임 시 하락 전환 (3.3)
+        if result["collapse"] and metrics["stage"] in RISING_STAGES and prev_stage:
+            stage = "소멸" if prev_stage in ("0단계", "1단계") else "정리"
+            metrics["stage"] = stage
+            metrics["stageLabel"] = stage
+        metrics["collapse"] = result["collapse"]
+
+        # 단계 변화 이벤트 (4.1)
+        events = list(theme_state.get("events", [])) if theme_state else []
+        if metrics["stage"] != prev_stage:
+            events.append({
+                "date": date,
+                "stage": metrics["stage"],
+                "message": stage_message(theme, metrics["stage"], result["drop_from_peak"], stock_names),
+            })
+            events = events[-HISTORY_EVENTS:]
+        theme["history"] = events
+
+        current[theme["id"]] = {
+            "prev": result["prev"],
+            "peak": result["peak"],
+            "streak": result["streak"],
+            "stage": metrics["stage"],
+            "collapse": result["collapse"],
+            "events": events,
+        }
+        rows[theme["id"]] = _row(metrics, result["collapse"])
+
+    offset = storage.append_history(date, rows, truncate_at)
+    storage.save_history_state({"date": date, "offset": offset, "base": previous, "themes": current})
+
+    collapsed = sum(1 for row in rows.values() if row[-1])
+    print(f"히스토리 기록 완료: {date}, {len(rows)}개 테마 (꺾임 {collapsed}개)")
+    return themes
+
+
+def attach_history(themes: List[Dict], date: Optional[str] = None) -> List[Dict]:
+    """
+    기록 없이 재계산할 때 마지막 기록의 단계 변화 이벤트를 붙임
+    - 기준일이 마지막 기록일과 같으면 그날 꺾임으로 전환된 단계(소멸/정리)도 다시 적용
+      (주간/재계산/보충 후 theme_metrics.json 이 꺾임 전 단계로 되돌아가지 않도록)
+
+    Args:
+        themes: calc_theme_metrics 결과
+        date: 계산 기준일 (가격 데이터 마지막 거래일)
+    """
+    state = storage.load_history_state()
+    previous = state.get("themes", {})
+    same_day = date is not None and date == state.get("date")
+    for theme in themes:
+        theme_state = previous.get(theme["id"], {})
+        theme["history"] = theme_state.get("events", [])
+
+        if same_day and theme_state.get("collapse"):
+            metrics = theme["metrics"]
+            metrics["collapse"] = theme_state["collapse"]
+            if metrics["stage"] in RISING_STAGES and theme_state["stage"] not in RISING_STAGES:
+                metrics["stage"] = theme_state["stage"]
+                metrics["stageLabel"] = theme_state["stage"]
+    return themes
+
+
+def load_theme_history(theme_id: str, start_date: str, end_date: str) -> List[Dict]:
+    """
+    테마 일별 기록 조회 (기간 내 월 파일만 읽음)
+
+    Returns:
+        [{"date": "2025-01-20", "return_3w": ..., "stage": ..., "collapse": ...}, ...]
+    """
+    return [
+        {"date": day["date"], **dict(zip(storage.HISTORY_FIELDS, day["themes"][theme_id]))}
+        for day in storage.load_history(start_date, end_date, [theme_id])
+        if theme_id in day["themes"]
+    ]
@@ -0,0 +1,488 @@
+"""
+수집 파이프라인 벤치마크
+- 시뮬레이터(kiwoom/simulator.py) + 합성 데이터로 scheduler 진입점 실행
+- 측정: 단계별 실행 시간, TR 요청 수, 대기 시간, 최대 메모리(RSS), storage 읽기/쓰기 바이트
+- 시나리오(진입점 × 규모)마다 별도 프로세스에서 실행 (최대 RSS 분리)
+- 결과는 JSON (버전 간 비교용)
+
+사용법:
+    python benchmark.py                                   # 전체 진입점 × 기본 규모
+    python benchmark.py --jobs daily update --scales 500x60 --out bench.json
+    python benchmark.py --latency 0.01                    # TR 1회 응답 지연 (초)
+    python benchmark.py --financial-http                  # 재무 단계를 로컬 대역 서버로 요청
+
+참고:
+    - TR 요청 제한은 가상 시계로 계산 (rate_limit_wait_s = 실제였다면 대기했을 시간)
+    - 재무 데이터(네이버)는 네트워크 없이 합성 데이터로 대체
+      (--financial-http: naver/fixture_server.py 대역 서버에 실제 요청 + 파싱)
+    - storage_read_bytes / storage_write_bytes 는 storage / price_store 가 읽고 쓴 바이트 (io_metrics.STORAGE_IO)
+      (시뮬레이터, 합성 데이터 준비, 표준 출력 제외 / 가격 저장소 조회는 반환 구간 크기 기준)
+    - 성공 여부는 진입점 반환값(False = 실패) + 진입점 밖으로 나온 예외
+    - 최대 RSS 는 리눅스 /proc, 그 외 resource 모듈 (둘 다 없으면 null - Windows)
+"""
+import argparse
+import contextlib
+import functools
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import storage
+import scheduler
+from io_metrics import STORAGE_IO
+from kiwoom.api import KiwoomAPI
+from kiwoom.market_crawler import MarketCrawler
+from kiwoom.price_crawler import PriceCrawler
+from kiwoom.rate_limiter import RateLimiter, VirtualClock
+from kiwoom.simulator import SimulatedOCX
+from kiwoom.theme_crawler import ThemeCrawler
+from naver.financial_crawler import FinancialCrawler
+from naver.fixture_server import FixtureServer
+
+# 측정 대상 진입점
+JOBS = {
+    "init": scheduler.run_initial_crawl,
+    "daily": scheduler.run_daily_crawler,
+    "update": scheduler.run_update_crawler,
+    "all": scheduler.run_all_stocks,
+}
+
+# 실패 시 결과에 남길 작업 출력 줄 수
+OUTPUT_TAIL_LINES = 20
+
+# 기본 규모 (종목 수, 거래일 수)
+DEFAULT_SCALES = [(500, 60), (2500, 120), (10000, 250)]
+
+# update 시나리오: 저장소보다 앞선 거래일 수
+UPDATE_GAP_DAYS = 5
+
+# all 시나리오: 기존 저장 종목 비율 (나머지는 신규)
+ALL_EXISTING_RATIO = 0.25
+
+
+class FixtureFinancialCrawler(FinancialCrawler):
+    """
+    재무 크롤러 (외부 네트워크 없음)
+    - server_url 지정 시 로컬 대역 서버에 요청
+    - 미지정 시 합성 데이터 바로 반환
+    """
+
+    data: Dict[str, Dict] = {}
+    server_url: str = None
+
+    def __init__(self):
+        super().__init__(base_url=self.server_url, request_interval=0.0)
+
+    def crawl_stocks(self, stock_codes: List[str]) -> Dict[str, Dict]:
+        if self.server_url:
+            return super().crawl_stocks(stock_codes)
+        return {code: self.data[code] for code in stock_codes if code in self.data}
+
+
+# 단계 구분 (소유 객체, 속성명, 단계명) - 바깥쪽 호출만 기록
+STAGES = [
+    (ThemeCrawler, "crawl_all", "themes"),
+    (PriceCrawler, "crawl_stocks", "prices"),
+    (PriceCrawler, "crawl_today_batch", "prices"),
+    (MarketCrawler, "crawl_stocks", "market"),
+    (MarketCrawler, "crawl_from_prices", "market"),
+    (FixtureFinancialCrawler, "crawl_stocks", "financial"),
+    (scheduler, "run_calculation", "calculate"),
+] + [
+    (storage, name, "storage")
+    for name in (
+        "save_stocks", "load_stocks", "save_themes", "load_themes",
+        "save_market", "load_market", "save_financial", "load_financial",
+        "save_prices", "load_prices", "merge_monthly_prices", "add_daily_prices",
+        "compact_price_deltas", "get_last_price_date", "init_data_directory",
+        "save_crawl_progress", "load_crawl_progress",
+    )
+]
+
+
+# ============================================
+# 합성 데이터
+# ============================================
+def trading_days(n_days: int, end: datetime = None) -> List[str]:
+    """오늘로 끝나는 평일 n_days개 (오래된 순)"""
+    day = end or datetime.now()
+    dates = [day.strftime("%Y-%m-%d")]
+    while len(dates) < n_days:
+        day -= timedelta(days=1)
+        if day.weekday() < 5:
+            dates.append(day.strftime("%Y-%m-%d"))
+    return dates[::-1]
+
+
+def make_fixtures(n_stocks: int, n_days: int, seed: int = 0) -> Dict:
+    """
+    합성 시장 데이터 생성
+
+    Returns:
+        {"themes": [...], "stocks": {...}, "market": {...}, "prices": {...}, "financial": {...}}
+    """
+    rng = random.Random(seed)
+    dates = trading_days(n_days)
+
+    codes = [f"{i:06d}" for i in range(1, n_stocks + 1)]
+    stocks = {
+        code: {"name": f"종목{code}", "market": "KOSPI" if i % 3 == 0 else "KOSDAQ"}
+        for i, code in enumerate(codes)
+    }
+
+    prices = {}
+    market = {}
+    financial = {}
+    for code in codes:
+        close = rng.randint(1000, 200000)
+        daily = {}
+        for date in dates:
+            close = max(100, int(close * (1 + rng.gauss(0, 0.02))))
+            daily[date] = {"close": close, "value": close * rng.randint(1000, 500000)}
+        prices[code] = daily
+
+        shares = rng.randint(5000, 500000)  # 천주
+        market[code] = {
+            "market_cap": close * shares * 1000,
+            "shares": shares,
+            "per": round(rng.uniform(3, 40), 2),
+            "pbr": round(rng.uniform(0.3, 5), 2),
+        }
+        revenue = rng.randint(10, 10000) * 100000000
+        financial[code] = {"revenue": revenue, "operating_profit": revenue // rng.randint(5, 30)}
+
+    # 실제 데이터와 비슷하게 종목의 약 1/4 이 테마에 속함
+    theme_pool = codes[:max(1, n_stocks // 4)]
+    themes = []
+    for i in range(max(1, n_stocks // 18)):
+        members = rng.sample(theme_pool, min(len(theme_pool), rng.randint(3, 30)))
+        themes.append({"id": str(100 + i), "name": f"테마{i}", "stocks": members})
+
+    return {
+        "themes": themes,
+        "stocks": stocks,
+        "market": market,
+        "prices": prices,
+        "financial": financial,
+        "dates": dates,
+    }
+
+
+def seed_storage(fixtures: Dict, codes: List[str], last_date: str):
+    """기존 저장 데이터 구성 (last_date 까지의 가격)"""
+    code_set = set(codes)
+    storage.init_data_directory()
+    storage.save_stocks({code: fixtures["stocks"][code] for code in codes})
+    storage.save_themes([
+        {"id": t["id"], "name": t["name"], "stocks": [c for c in t["stocks"] if c in code_set]}
+        for t in fixtures["themes"]
+    ])
+
+    market = {}
+    for code in codes:
+        info = fixtures["market"][code]
+        market[code] = dict(
+            info,
+            eps=round(info["market_cap"] / info["shares"] / 1000 / info["per"]),
+            bps=round(info["market_cap"] / info["shares"] / 1000 / info["pbr"]),
+        )
+    storage.save_market(last_date, market)
+
+    monthly: Dict[str, Dict] = {}
+    for code in codes:
+        for date, price in fixtures["prices"][code].items():
+            if date <= last_date:
+                monthly.setdefault(date[:7], {}).setdefault(code, {})[date] = price
+    for year_month, data in sorted(monthly.items()):
+        storage.save_prices(year_month, data)
+
+
+def prepare(job: str, fixtures: Dict):
+    """시나리오별 저장소 준비"""
+    codes = list(fixtures["stocks"])
+    dates = fixtures["dates"]
+
+    if job == "init":
+        return
+    if job == "daily":
+        seed_storage(fixtures, codes, dates[-2])
+    elif job == "update":
+        seed_storage(fixtures, codes, dates[-1 - UPDATE_GAP_DAYS])
+    elif job == "all":
+        theme_codes = sorted({c for t in fixtures["themes"] for c in t["stocks"]})
+        existing = theme_codes[:max(1, int(len(codes) * ALL_EXISTING_RATIO))]
+        seed_storage(fixtures, existing, dates[-1])
+
+
+# ============================================
+# 측정
+# ============================================
+def reset_peak_rss() -> bool:
+    """최대 RSS 초기화 (리눅스 clear_refs), 실패 시 False"""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_kb() -> Optional[int]:
+    """최대 RSS (KB), 측정 불가 시 None"""
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    try:
+        import resource  # 유닉스 전용 (Windows 에는 없음)
+    except ImportError:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return usage // 1024 if sys.platform == "darwin" else usage
+
+
+class Recorder:
+    """단계별 측정값 누적"""
+
+    COUNTERS = ("wall_s", "requests", "rate_limit_wait_s", "latency_s", "storage_read_bytes", "storage_write_bytes")
+
+    def __init__(self):
+        self.api = None
+        self.latency = 0.0
+        self.depth = 0
+        self.stages: Dict[str, Dict] = {}
+
+    def sleep(self, seconds: float):
+        """시뮬레이터 응답 지연 (실제 대기 + 기록)"""
+        time.sleep(seconds)
+        self.latency += seconds
+
+    def snapshot(self) -> Dict:
+        limiter = self.api.rate_limiter if self.api else None
+        storage_io = STORAGE_IO.snapshot()
+        return {
+            "wall_s": time.perf_counter(),
+            "requests": limiter.request_count if limiter else 0,
+            "rate_limit_wait_s": limiter.total_wait if limiter else 0.0,
+            "latency_s": self.latency,
+            "storage_read_bytes": storage_io["read_bytes"],
+            "storage_write_bytes": storage_io["write_bytes"],
+        }
+
+    @staticmethod
+    def diff(before: Dict, after: Dict) -> Dict:
+        result = {}
+        for key in Recorder.COUNTERS:
+            if before[key] is None or after[key] is None:
+                result[key] = None
+            else:
+                result[key] = after[key] - before[key]
+        return result
+
+    def wrap(self, func, stage: str):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if self.depth > 0:
+                return func(*args, **kwargs)
+
+            self.depth += 1
+            before = self.snapshot()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                delta = self.diff(before, self.snapshot())
+                self.depth -= 1
+
+                entry = self.stages.setdefault(stage, dict({key: 0 for key in self.COUNTERS}, calls=0))
+                entry["calls"] += 1
+                for key, value in delta.items():
+                    entry[key] = None if value is None or entry[key] is None else entry[key] + value
+                rss = peak_rss_kb()
+                if rss is not None:
+                    entry["peak_rss_kb"] = max(entry.get("peak_rss_kb") or 0, rss)
+                else:
+                    entry.setdefault("peak_rss_kb", None)
+        return wrapper
+
+
+def run_scenario(
+    job: str,
+    n_stocks: int,
+    n_days: int,
+    latency: float = 0.0,
+    seed: int = 0,
+    financial_http: bool = False
+) -> Dict:
+    """
+    시나리오 1개 실행 (현재 프로세스)
+
+    Args:
+        financial_http: 재무 단계를 로컬 대역 서버로 요청
+
+    Returns:
+        측정 결과 dict
+    """
+    data_path = tempfile.mkdtemp(prefix=f"bench_{job}_")
+    storage.set_base_path(data_path)
+    recorder = Recorder()
+    server = None
+
+    try:
+        setup_start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            fixtures = make_fixtures(n_stocks, n_days, seed)
+            prepare(job, fixtures)
+            ocx = SimulatedOCX(latency=latency, sleep=recorder.sleep, fixtures=fixtures)
+        setup_s = time.perf_counter() - setup_start
+
+        def create_api(backend: str = None, rate_limiter: RateLimiter = None) -> KiwoomAPI:
+            clock = VirtualClock()
+            recorder.api = KiwoomAPI(rate_limiter=RateLimiter(clock=clock, sleep=clock.sleep), ocx=ocx)
+            return recorder.api
+
+        # 측정용 래퍼 설치 (이 프로세스 안에서만 유효)
+        FixtureFinancialCrawler.data = fixtures["financial"]
+        if financial_http:
+            server = FixtureServer(financial=fixtures["financial"], latency=latency, seed=seed)
+            FixtureFinancialCrawler.server_url = server.start()
+        scheduler.create_api = create_api
+        scheduler.FinancialCrawler = FixtureFinancialCrawler
+        for owner, name, stage in STAGES:
+            setattr(owner, name, recorder.wrap(getattr(owner, name), stage))
+
+        output = io.StringIO()
+        rss_reset = reset_peak_rss()
+        before = recorder.snapshot()
+        errors = []
+        with contextlib.redirect_stdout(output):
+            try:
+                if JOBS[job]() is False:
+                    errors.append(f"{JOBS[job].__name__} 실패 반환")
+            except Exception as e:
+                errors.append(f"{type(e).__name__}: {e}")
+        total = Recorder.diff(before, recorder.snapshot())
+
+        staged_wall = sum(stage["wall_s"] for stage in recorder.stages.values())
+        return dict(
+            total,
+            job=job,
+            stocks=n_stocks,
+            days=n_days,
+            latency=latency,
+            financial_http=financial_http,
+            setup_s=setup_s,
+            other_wall_s=max(0.0, total["wall_s"] - staged_wall),
+            peak_rss_kb=peak_rss_kb(),
+            peak_rss_reset=rss_reset,
+            data_bytes=_dir_size(data_path),
+            stages=recorder.stages,
+            success=not errors,
+            errors=errors,
+            # 실패 시 원인 확인용 (작업 로그 마지막 줄들)
+            output_tail=output.getvalue().splitlines()[-OUTPUT_TAIL_LINES:] if errors else [],
+        )
+    finally:
+        if server is not None:
+            server.stop()
+        shutil.rmtree(data_path, ignore_errors=True)
+
+
+def _dir_size(path: str) -> int:
+    """디렉토리 전체 크기 (바이트)"""
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            total += os.path.getsize(os.path.join(root, name))
+    return total
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)), stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_scale(text: str) -> Tuple[int, int]:
+    """"500x60" -> (500, 60)"""
+    stocks, days = text.lower().split("x")
+    return int(stocks), int(days)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="수집 파이프라인 벤치마크")
+    parser.add_argument("--jobs", nargs="+", choices=list(JOBS), default=list(JOBS))
+    parser.add_argument("--scales", nargs="+", type=parse_scale, default=DEFAULT_SCALES,
+                        help="종목수x거래일수 (예: 500x60 2500x120)")
+    parser.add_argument("--latency", type=float, default=0.0, help="TR 1회 응답 지연 (초)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--financial-http", action="store_true", help="재무 단계를 로컬 대역 서버로 요청")
+    parser.add_argument("--out", help="결과 JSON 파일 (기본: 표준출력)")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        # 자식 프로세스: 시나리오 1개 실행 후 결과 JSON 출력
+        n_stocks, n_days = args.scales[0]
+        result = run_scenario(args.jobs[0], n_stocks, n_days, args.latency, args.seed, args.financial_http)
+        sys.stdout.write(json.dumps(result))
+        return
+
+    results = []
+    for n_stocks, n_days in args.scales:
+        for job in args.jobs:
+            print(f"[{job}] {n_stocks}종목 x {n_days}일 ...", file=sys.stderr)
+            proc = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--worker",
+                 "--jobs", job, "--scales", f"{n_stocks}x{n_days}",
+                 "--latency", str(args.latency), "--seed", str(args.seed)]
+                + (["--financial-http"] if args.financial_http else []),
+                cwd=os.path.dirname(os.path.abspath(__file__)),
+                stdout=subprocess.PIPE
+            )
+            if proc.returncode != 0:
+                results.append({"job": job, "stocks": n_stocks, "days": n_days, "failed": True,
+                                "success": False, "errors": [f"프로세스 종료 코드 {proc.returncode}"]})
+                continue
+            result = json.loads(proc.stdout)
+            results.append(result)
+            rss = result["peak_rss_kb"]
+            print(f"  {result['wall_s']:.2f}초, TR {result['requests']}회, "
+                  f"최대 RSS {f'{rss // 1024}MB' if rss is not None else '-'}", file=sys.stderr)
+            for error in result["errors"]:
+                print(f"  실패: {error}", file=sys.stderr)
+
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "revision": _git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+        print(f"저장 완료: {args.out}", file=sys.stderr)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
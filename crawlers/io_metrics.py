@@ -0,0 +1,39 @@
+"""
+저장소 입출력 계측
+- storage / price_store 가 읽고 쓴 바이트 수 누적 (JSON, 변경분/기록 로그, 가격 저장소 행렬)
+- 가격 저장소 memmap 조회는 반환한 구간 크기로 계산 (실제 디스크 페이지 I/O 와 다를 수 있음)
+- 프로세스 전체에서 STORAGE_IO 하나를 공유 (benchmark.py 단계별 측정)
+"""
+import threading
+from typing import Dict
+
+
+class IOMetrics:
+    """읽기/쓰기 바이트 누적 (스레드 안전)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """계측값 초기화"""
+        with self._lock:
+            self.read_bytes = 0
+            self.write_bytes = 0
+
+    def add_read(self, nbytes: int):
+        with self._lock:
+            self.read_bytes += int(nbytes)
+
+    def add_write(self, nbytes: int):
+        with self._lock:
+            self.write_bytes += int(nbytes)
+
+    def snapshot(self) -> Dict:
+        """{"read_bytes", "write_bytes"}"""
+        with self._lock:
+            return {"read_bytes": self.read_bytes, "write_bytes": self.write_bytes}
+
+
+# 프로세스 공용 계측
+STORAGE_IO = IOMetrics()
@@ -0,0 +1,240 @@
+"""
+수집 작업 관리자 (server.py)
+- 작업마다 ID 부여, 작업 큐 + 작업 스레드 1개로 순서대로 실행 (키움 세션 중복 로그인 방지)
+- 단계별 소요 시간 / 진행 종목 수 기록 (크롤러 루프에서 report_stage, report_progress 호출)
+- 상태 변경 시 구독자에게 알림 (Server-Sent Events)
+- 완료된 작업은 jobs/log.jsonl 에 기록 (storage.append_job_log)
+"""
+import itertools
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import storage
+
+# 완료 후 메모리에 유지할 작업 수 (나머지는 작업 로그에서 조회)
+RECENT_JOBS = 20
+
+
+class JobManager:
+    """수집 작업 큐 (작업 스레드 1개)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._queue: "queue.Queue[Dict]" = queue.Queue()
+        self._jobs: Dict[str, Dict] = {}
+        self._funcs: Dict[str, Callable[[], None]] = {}
+        self._ids = itertools.count(1)
+        self.version = 0  # 상태 변경 횟수 (SSE 구독자 깨우기)
+        self.active: Optional[Dict] = None
+        self._worker = threading.Thread(target=self._run, name="job-worker", daemon=True)
+        self._worker.start()
+
+    # ============================================
+    # 작업 등록 / 조회
+    # ============================================
+    def submit(self, job_type: str, label: str, func: Callable[[], None]):
+        """
+        작업 등록 (같은 종류 작업이 대기/실행 중이면 등록하지 않음)
+
+        Args:
+            job_type: "daily", "weekly", "quarterly", "init"
+            label: 표시 이름 ("일별")
+            func: 실행 함수 (False 반환 또는 예외 발생 시 실패로 기록)
+
+        Returns:
+            (작업, 새로 등록 여부)
+        """
+        with self._lock:
+            for job in self._jobs.values():
+                if job["type"] == job_type and job["state"] in ("queued", "running"):
+                    return self._copy(job), False
+
+            job_id = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{next(self._ids)}"
+            job = {
+                "id": job_id,
+                "type": job_type,
+                "label": label,
+                "state": "queued",
+                "message": f"{label} 크롤링 대기 중",
+                "created_at": datetime.now().isoformat(timespec="seconds"),
+                "started_at": None,
+                "finished_at": None,
+                "stage": None,
+                "progress": {"done": 0, "total": 0},
+                "stages": [],
+                "error": None,  # 실패 사유 (report_error)
+            }
+            self._jobs[job_id] = job
+            self._funcs[job_id] = func
+            self._notify()
+
+        self._queue.put(job)
+        return self._copy(job), True
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """작업 조회 (메모리에 없으면 작업 로그)"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                return self._copy(job)
+        return next((job for job in storage.load_job_log() if job["id"] == job_id), None)
+
+    def list(self) -> List[Dict]:
+        """대기/실행 중 + 최근 완료 작업 (최신순)"""
+        with self._lock:
+            return [self._copy(job) for job in reversed(list(self._jobs.values()))]
+
+    def status(self) -> Dict:
+        """
+        기존 /api/status 형식 {"running", "type", "message"} + 현재 작업
+        - running: 실행 중이거나 대기 중인 작업이 있으면 True
+        """
+        with self._lock:
+            queued = next((job for job in self._jobs.values() if job["state"] == "queued"), None)
+            pending = self.active or queued
+            job = pending or next(reversed(list(self._jobs.values())), None)
+            return {
+                "running": pending is not None,
+                "type": pending["label"] if pending else None,
+                "message": job["message"] if job else "",
+                "job": self._copy(job) if job else None,
+            }
+
+    def wait_for_change(self, version: int, timeout: float) -> int:
+        """상태가 version 이후로 바뀔 때까지 대기 (SSE), 현재 version 반환"""
+        with self._changed:
+            self._changed.wait_for(lambda: self.version != version, timeout)
+            return self.version
+
+    # ============================================
+    # 크롤러에서 호출 (작업 스레드)
+    # ============================================
+    def report_stage(self, name: str, total: int = 0):
+        """현재 작업의 새 단계 시작 (이전 단계 소요 시간 기록)"""
+        with self._lock:
+            job = self.active
+            if job is None:
+                return
+            self._close_stage(job)
+            job["stage"] = name
+            job["progress"] = {"done": 0, "total": total}
+            job["stages"].append({"name": name, "started_at": time.time(), "seconds": None})
+            job["message"] = f"{job['label']} 크롤링 진행 중: {name}"
+            self._notify()
+
+    def report_progress(self, done: int, total: int):
+        """현재 단계 진행 종목 수"""
+        with self._lock:
+            job = self.active
+            if job is None:
+                return
+            job["progress"] = {"done": done, "total": total}
+            self._notify()
+
+    def report_error(self, message: str):
+        """현재 작업의 실패 사유 (작업이 실패로 끝나면 메시지에 표시)"""
+        with self._lock:
+            job = self.active
+            if job is None:
+                return
+            job["error"] = message
+            self._notify()
+
+    # ============================================
+    # 작업 스레드
+    # ============================================
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            func = self._funcs.pop(job["id"])
+
+            with self._lock:
+                job["state"] = "running"
+                job["started_at"] = datetime.now().isoformat(timespec="seconds")
+                job["message"] = f"{job['label']} 크롤링 진행 중..."
+                self.active = job
+                self._notify()
+
+            # 수집 함수는 에러를 잡아 출력하고 성공 여부를 반환 (False = 로그인 실패, 수집 에러 등)
+            try:
+                if func() is False:
+                    reason = job.get("error") or "서버 로그 확인"
+                    state, message = "failed", f"{job['label']} 크롤링 실패 ({reason})"
+                else:
+                    state, message = "done", f"{job['label']} 크롤링 완료!"
+            except storage.CorruptedFileError as e:
+                state, message = "failed", f"{job['label']} 크롤링 실패: 저장 파일 손상 {e.filepath} - 복구: {e.recovery}"
+            except Exception as e:
+                state, message = "failed", f"{job['label']} 크롤링 실패: {str(e)}"
+
+            with self._lock:
+                self._close_stage(job)
+                job["state"] = state
+                job["message"] = message
+                job["finished_at"] = datetime.now().isoformat(timespec="seconds")
+                self.active = None
+                record = self._copy(job)
+                self._trim()
+                self._notify()
+
+            storage.append_job_log(record)
+
+    def _close_stage(self, job: Dict):
+        if job["stages"] and job["stages"][-1]["seconds"] is None:
+            stage = job["stages"][-1]
+            stage["seconds"] = round(time.time() - stage["started_at"], 3)
+
+    def _trim(self):
+        """완료된 작업은 최근 RECENT_JOBS 개만 메모리에 유지"""
+        finished = [job_id for job_id, job in self._jobs.items() if job["state"] in ("done", "failed")]
+        for job_id in finished[:-RECENT_JOBS]:
+            del self._jobs[job_id]
+
+    def _notify(self):
+        self.version += 1
+        self._changed.notify_all()
+
+    @staticmethod
+    def _copy(job: Dict) -> Dict:
+        return {
+            **job,
+            "progress": dict(job["progress"]),
+            "stages": [
+                {"name": stage["name"], "seconds": stage["seconds"]}
+                for stage in job["stages"]
+            ],
+        }
+
+
+# 프로세스 공유 작업 관리자 (server.py 에서 생성)
+_manager: Optional[JobManager] = None
+
+
+def get_job_manager() -> JobManager:
+    """작업 관리자 반환 (최초 호출 시 작업 스레드 시작)"""
+    global _manager
+    if _manager is None:
+        _manager = JobManager()
+    return _manager
+
+
+def report_stage(name: str, total: int = 0):
+    """작업 단계 시작 알림 (서버 작업이 아니면 무시)"""
+    if _manager is not None:
+        _manager.report_stage(name, total)
+
+
+def report_progress(done: int, total: int):
+    """작업 진행 종목 수 알림 (서버 작업이 아니면 무시)"""
+    if _manager is not None:
+        _manager.report_progress(done, total)
+
+
+def report_error(message: str):
+    """작업 실패 사유 알림 (서버 작업이 아니면 무시)"""
+    if _manager is not None:
+        _manager.report_error(message)
@@ -2,24 +2,50 @@
 키움 Open API+ 연결 모듈
 - 32bit Python 필요
 - Open API+ 모듈 설치 필요
+- ocx 주입 시 PyQt/Open API+ 없이 동작 (kiwoom/fake_ocx.py)
+- KIWOOM_BACKEND=sim 이면 create_api() 가 시뮬레이터 사용 (kiwoom/simulator.py)
+- TR 요청마다 응답 지연/결과/파싱 시간/요청 제한 대기 기록 (kiwoom/metrics.py)
+- TR 응답은 (화면번호, 요청명) 키로 요청별 분배 (kiwoom/tr_dispatcher.py) - 여러 TR 동시 대기 가능
 """
+import os
 import sys
-from PyQt5.QAxContainer import QAxWidget
-from PyQt5.QtWidgets import QApplication
-from PyQt5.QtCore import QEventLoop, QTimer
+from typing import Callable, Dict, List
+from .metrics import TR_METRICS, TRMetrics
+from .rate_limiter import RateLimiter, VirtualClock
+from .tr_dispatcher import TRDispatcher, TRRequest
 
 
 class KiwoomAPI:
     """키움 Open API+ 래퍼 클래스"""
 
-    def __init__(self):
-        self.app = QApplication(sys.argv)
-        self.ocx = QAxWidget("KHOPENAPI.KHOpenAPICtrl.1")
+    # CommKwRqData 1회 최대 종목 수
+    KW_MAX_CODES = 100
+
+    def __init__(self, rate_limiter: RateLimiter = None, ocx=None, metrics: TRMetrics = None):
+        """
+        Args:
+            rate_limiter: TR 요청 제한기, 기본값 키움 조회 제한 (1초 5회, 1분 100회, 1시간 1000회)
+            ocx: OCX 객체 주입 (가짜 OCX 등), 기본값 키움 Open API+ 컨트롤
+            metrics: TR 요청 계측, 기본값 프로세스 공유 TR_METRICS
+        """
+        if ocx is None:
+            from PyQt5.QAxContainer import QAxWidget
+            from PyQt5.QtWidgets import QApplication
+            # 프로세스당 QApplication 1개 (세션 재생성 / 서버 작업 반복 시 재사용)
+            self.app = QApplication.instance() or QApplication(sys.argv)
+            ocx = QAxWidget("KHOPENAPI.KHOpenAPICtrl.1")
+        else:
+            self.app = None
+
+        self.ocx = ocx
         self.connected = False
+        self.login_done = False
         self.login_loop = None
         self.request_loop = None
-        self.tr_data = None
-        self.tr_handler = None  # TR별 데이터 처리 핸들러
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.metrics = metrics or TR_METRICS
+        self.dispatcher = TRDispatcher(self.metrics.clock)
+        self._waiting: List[TRRequest] = []  # wait() 로 대기 중인 요청
 
         # 이벤트 연결
         self.ocx.OnEventConnect.connect(self._on_event_connect)
@@ -35,14 +61,35 @@ class KiwoomAPI:
         Returns:
             로그인 성공 여부
         """
+        self.login_done = False
         self.ocx.dynamicCall("CommConnect()")
 
-        self.login_loop = QEventLoop()
-        QTimer.singleShot(timeout * 1000, self.login_loop.quit)
-        self.login_loop.exec_()
+        self._wait_event("login_loop", lambda: self.login_done, timeout)
 
         return self.connected
 
+    def _wait_event(self, loop_name: str, received: Callable[[], bool], timeout: int):
+        """
+        이벤트 수신 대기 (QEventLoop)
+        - 이벤트가 이미 동기적으로 도착했으면(가짜 OCX 등) 바로 반환
+        - 주입된 OCX는 이벤트를 호출 안에서 발생시켜야 함 (미수신 = 타임아웃)
+
+        Args:
+            loop_name: 이벤트 핸들러에서 종료할 루프 속성명
+            received: 수신 완료 여부 함수
+            timeout: 타임아웃 (초)
+        """
+        if received() or self.app is None:
+            return
+
+        from PyQt5.QtCore import QEventLoop, QTimer
+
+        loop = QEventLoop()
+        setattr(self, loop_name, loop)
+        QTimer.singleShot(timeout * 1000, loop.quit)
+        loop.exec_()
+        setattr(self, loop_name, None)
+
     def _on_event_connect(self, err_code: int):
         """로그인 이벤트 핸들러"""
         if err_code == 0:
@@ -52,6 +99,7 @@ class KiwoomAPI:
             self.connected = False
             print(f"로그인 실패: {err_code}")
 
+        self.login_done = True
         if self.login_loop:
             self.login_loop.quit()
 
@@ -74,7 +122,7 @@ class KiwoomAPI:
 
     def comm_rq_data(self, rq_name: str, tr_code: str, prev_next: int, screen_no: str, timeout: int = 10, handler=None) -> dict:
         """
-        TR 요청
+        TR 요청 후 응답 대기 (요청 제한기가 허용할 때까지 대기 후 요청)
 
         Args:
             rq_name: 요청명
@@ -84,40 +132,205 @@ class KiwoomAPI:
             timeout: 타임아웃 (초)
             handler: 데이터 처리 핸들러 함수 (이벤트 안에서 호출됨)
 
+        Returns:
+            TR 응답 데이터 (타임아웃이면 None)
+        """
+        request = self.request_rq_data(rq_name, tr_code, prev_next, screen_no, timeout, handler)
+        self.wait([request])
+        return request.result()
+
+    def comm_kw_rq_data(self, stock_codes: List[str], rq_name: str, screen_no: str, timeout: int = 10, handler=None, type_flag: int = 0) -> dict:
+        """
+        복수종목 TR 요청 후 응답 대기 (CommKwRqData -> OPTKWFID)
+
+        Args:
+            stock_codes: 종목코드 리스트 (최대 100개)
+            rq_name: 요청명
+            screen_no: 화면번호 (4자리)
+            timeout: 타임아웃 (초)
+            handler: 데이터 처리 핸들러 함수 (이벤트 안에서 호출됨)
+            type_flag: 0: 주식, 3: 선물옵션
+
         Returns:
             TR 응답 데이터
         """
-        self.tr_data = None
-        self.tr_handler = handler
-        self.ocx.dynamicCall(
-            "CommRqData(QString, QString, int, QString)",
-            rq_name, tr_code, prev_next, screen_no
+        request = self.request_kw_rq_data(stock_codes, rq_name, screen_no, timeout, handler, type_flag)
+        self.wait([request])
+        return request.result()
+
+    def request_rq_data(self, rq_name: str, tr_code: str, prev_next: int, screen_no: str, timeout: int = 10, handler=None) -> TRRequest:
+        """
+        TR 요청만 보내고 바로 반환 (응답은 wait() 또는 request.add_done_callback 으로 받음)
+        - 입력값(set_input_value)은 요청 직전에 설정
+
+        Returns:
+            TRRequest
+        """
+        return self._send(
+            screen_no, rq_name, tr_code, timeout, handler,
+            lambda tagged: self.ocx.dynamicCall(
+                "CommRqData(QString, QString, int, QString)",
+                tagged, tr_code, prev_next, screen_no
+            )
         )
 
-        self.request_loop = QEventLoop()
-        QTimer.singleShot(timeout * 1000, self.request_loop.quit)
-        self.request_loop.exec_()
+    def request_kw_rq_data(self, stock_codes: List[str], rq_name: str, screen_no: str, timeout: int = 10, handler=None, type_flag: int = 0) -> TRRequest:
+        """
+        복수종목 TR 요청만 보내고 바로 반환
 
-        self.tr_handler = None
-        return self.tr_data
+        Returns:
+            TRRequest
+        """
+        if len(stock_codes) > self.KW_MAX_CODES:
+            raise ValueError(f"CommKwRqData 는 최대 {self.KW_MAX_CODES}개 종목까지 요청 가능")
 
-    def _on_receive_tr_data(self, screen_no, rq_name, tr_code, record_name, prev_next, *args):
-        """TR 데이터 수신 이벤트 핸들러 - 이 안에서 데이터를 읽어야 함"""
-        self.tr_data = {
-            "screen_no": screen_no,
-            "rq_name": rq_name,
-            "tr_code": tr_code,
-            "record_name": record_name,
-            "prev_next": prev_next,
-        }
-
-        # TR 핸들러가 있으면 실행 (이벤트 안에서 데이터 읽기)
-        if self.tr_handler:
-            self.tr_data["result"] = self.tr_handler(tr_code, rq_name)
-
-        if self.request_loop:
+        return self._send(
+            screen_no, rq_name, "OPTKWFID", timeout, handler,
+            lambda tagged: self.ocx.dynamicCall(
+                "CommKwRqData(QString, bool, int, int, QString, QString)",
+                ";".join(stock_codes), 0, len(stock_codes), type_flag, tagged, screen_no
+            )
+        )
+
+    def _send(self, screen_no: str, rq_name: str, tr_code: str, timeout: int, handler, send: Callable[[str], int]) -> TRRequest:
+        """
+        TR 요청 공통 처리 (요청 제한 대기 -> 분배기 등록 -> 요청)
+        - 타임아웃은 wait() 시작 시점부터 계산 (요청 제한 대기 중에 이전 요청이 만료되지 않도록)
+
+        Args:
+            screen_no: 화면번호
+            rq_name: 요청명 (분배기가 일련번호를 붙임)
+            tr_code: 계측용 TR 코드
+            timeout: 타임아웃 (초)
+            handler: 데이터 처리 핸들러 함수
+            send: 실제 요청 함수 (일련번호 붙은 요청명 -> 키움 반환 코드)
+
+        Returns:
+            TRRequest
+        """
+        rate_limit_wait = self.rate_limiter.acquire()
+
+        request = self.dispatcher.new_request(screen_no, rq_name, tr_code, handler, timeout, rate_limit_wait)
+        request.add_done_callback(self._on_request_done)
+
+        ret = send(request.rq_name)
+
+        # 요청 실패 (음수 반환 코드) -> 응답이 오지 않으므로 바로 타임아웃 처리
+        if isinstance(ret, int) and ret < 0:
+            print(f"TR 요청 실패 ({tr_code}): {ret}")
+            self.dispatcher.expire(request)
+
+        return request
+
+    def wait(self, requests: List[TRRequest]):
+        """
+        요청들이 모두 완료(응답 또는 타임아웃)될 때까지 이벤트 처리
+        - 요청마다 루프를 만들지 않고 대기 중인 요청 전체에 QEventLoop 1개
+        - 요청별 타임아웃(QTimer)은 여기서 시작 (이미 대기를 시작한 요청은 그대로)
+        - 주입된 OCX 는 process_events() 가 있으면 호출 (보류된 응답 발생), 그래도 미수신이면 타임아웃
+        """
+        if all(request.done() for request in requests):
+            return
+
+        if self.app is not None:
+            from PyQt5.QtCore import QEventLoop, QTimer
+
+            for request in requests:
+                if not request.done() and not request.timer_started:
+                    request.timer_started = True
+                    QTimer.singleShot(int(request.timeout * 1000), lambda request=request: self.dispatcher.expire(request))
+
+            self._waiting = requests
+            self.request_loop = QEventLoop()
+            self.request_loop.exec_()
+            self.request_loop = None
+            self._waiting = []
+            return
+
+        process_events = getattr(self.ocx, "process_events", None)
+        if process_events is not None:
+            process_events()
+        for request in requests:
+            self.dispatcher.expire(request)
+
+    def _on_request_done(self, request: TRRequest):
+        """요청 완료 (응답 / 타임아웃) -> 계측 기록, wait() 대기 요청이 모두 끝나면 루프 종료"""
+        if request.state == "timeout":
+            outcome = "timeout"
+            latency = self.metrics.clock() - request.sent_at
+        else:
+            if request.error is not None:
+                outcome = "error"
+            elif request.handler is not None and not request.data.get("result"):
+                outcome = "empty"
+            else:
+                outcome = "ok"
+            latency = request.received_at - request.sent_at
+        self.metrics.record(request.tr_code, outcome, latency, request.parse_time, request.rate_limit_wait)
+
+        if self.request_loop and all(waiting.done() for waiting in self._waiting):
             self.request_loop.quit()
 
+    def get_multi_quotes(self, stock_codes: List[str], fields: List[str], screen_no: str = "0200") -> Dict[str, Dict[str, str]]:
+        """
+        복수종목 시세 조회 (100개씩 나눠 요청, 결과는 종목코드별로 분리)
+
+        Args:
+            stock_codes: 종목코드 리스트 (개수 제한 없음)
+            fields: OPTKWFID 출력 항목명 ["현재가", "거래대금", ...]
+
+        Returns:
+            {"005930": {"현재가": "71000", "거래대금": "850000"}, ...}
+            - 응답에 없는 종목(거래정지 등)은 제외
+        """
+        requested = set(stock_codes)
+        quotes = {}
+
+        def handler(tr_code, rq_name):
+            rows = {}
+            for i in range(self._get_repeat_cnt(tr_code, rq_name)):
+                code = self._get_comm_data(tr_code, rq_name, i, "종목코드").lstrip("A")
+                if not code:
+                    continue
+                rows[code] = {
+                    field: self._get_comm_data(tr_code, rq_name, i, field)
+                    for field in fields
+                }
+            return rows
+
+        # 요청 제한기가 바로 허용하는 만큼 보낸 뒤 함께 대기 (대기 중에는 요청 제한으로 잠들지 않음)
+        # 묶음마다 화면번호 분리, 응답 순서와 무관하게 요청별로 전달됨
+        starts = list(range(0, len(stock_codes), self.KW_MAX_CODES))
+        sent = 0
+        while sent < len(starts):
+            window = []
+            while sent < len(starts) and (not window or self.rate_limiter.wait_time() <= 0):
+                start = starts[sent]
+                window.append(self.request_kw_rq_data(
+                    stock_codes[start:start + self.KW_MAX_CODES], "관심종목조회",
+                    f"{int(screen_no) + sent:04d}", handler=handler
+                ))
+                sent += 1
+            self.wait(window)
+
+            for request in window:
+                try:
+                    result = request.result()
+                except Exception as e:
+                    # 한 묶음 파싱 실패는 해당 묶음만 제외 (나머지 종목은 계속 수집)
+                    print(f"복수종목 시세 파싱 에러 ({request.rq_name}): {e}")
+                    continue
+                if result and "result" in result:
+                    for code, row in result["result"].items():
+                        if code in requested:
+                            quotes[code] = row
+
+        return quotes
+
+    def _on_receive_tr_data(self, screen_no, rq_name, tr_code, record_name, prev_next, *args):
+        """TR 데이터 수신 이벤트 핸들러 - 해당 요청의 핸들러가 이 안에서 데이터를 읽음"""
+        self.dispatcher.dispatch(screen_no, rq_name, tr_code, record_name, prev_next)
+
     def _get_comm_data(self, tr_code: str, rq_name: str, index: int, item_name: str) -> str:
         """TR 데이터 조회 (이벤트 핸들러 내에서만 호출)"""
         return self.ocx.dynamicCall(
@@ -136,6 +349,43 @@ class KiwoomAPI:
         """연결 해제"""
         self.ocx.dynamicCall("CommTerminate()")
         self.connected = False
+        print(self.metrics.summary())
+
+
+def create_api(backend: str = None, rate_limiter: RateLimiter = None) -> KiwoomAPI:
+    """
+    백엔드 선택하여 KiwoomAPI 생성
+
+    Args:
+        backend: "ocx" (키움 Open API+) 또는 "sim" (시뮬레이터), 기본값 KIWOOM_BACKEND 환경변수
+        rate_limiter: TR 요청 제한기
+
+    환경변수 (sim):
+        KIWOOM_SIM_DATA: 기록 데이터 경로, 기본값 web/data
+        KIWOOM_SIM_LATENCY: TR 1회 응답 지연 (초), 기본값 0
+
+    Returns:
+        KiwoomAPI
+        - sim: 요청 제한은 가상 시계로 계산 (rate_limiter.total_wait = 실제였다면 대기했을 시간)
+    """
+    backend = backend or os.environ.get("KIWOOM_BACKEND", "ocx")
+
+    if backend == "ocx":
+        return KiwoomAPI(rate_limiter=rate_limiter)
+
+    if backend == "sim":
+        from .simulator import DEFAULT_DATA_PATH, SimulatedOCX
+
+        ocx = SimulatedOCX(
+            data_path=os.environ.get("KIWOOM_SIM_DATA", DEFAULT_DATA_PATH),
+            latency=float(os.environ.get("KIWOOM_SIM_LATENCY", "0"))
+        )
+        if rate_limiter is None:
+            clock = VirtualClock()
+            rate_limiter = RateLimiter(clock=clock, sleep=clock.sleep)
+        return KiwoomAPI(rate_limiter=rate_limiter, ocx=ocx)
+
+    raise ValueError(f"알 수 없는 키움 백엔드: {backend}")
 
 
 if __name__ == "__main__":
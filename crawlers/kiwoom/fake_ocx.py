@@ -0,0 +1,135 @@
+"""
+가짜 키움 OCX
+- KiwoomAPI(ocx=FakeOCX(...)) 로 리눅스에서 PyQt/Open API+ 없이 실행
+- dynamicCall("Name(...)", ...) 을 같은 이름의 메서드로 분기
+- 이벤트(OnEventConnect, OnReceiveTrData)는 호출 안에서 동기적으로 발생
+- deferred=True 이면 TR 응답을 보류했다가 process_events() 에서 발생 (event_order 로 순서 변경 가능)
+"""
+from typing import Callable, Dict, List, Tuple
+
+
+class FakeSignal:
+    """pyqtSignal 대용 (connect / emit)"""
+
+    def __init__(self):
+        self._slots = []
+
+    def connect(self, slot):
+        self._slots.append(slot)
+
+    def emit(self, *args):
+        for slot in list(self._slots):
+            slot(*args)
+
+
+class FakeOCX:
+    """가짜 키움 OCX"""
+
+    def __init__(
+        self,
+        quotes: Dict[str, Dict[str, str]] = None,
+        deferred: bool = False,
+        event_order: Callable[[List[Tuple]], List[Tuple]] = None
+    ):
+        """
+        Args:
+            quotes: CommKwRqData(OPTKWFID) 응답 {"005930": {"현재가": "71000", ...}, ...}
+            deferred: TR 응답을 보류했다가 process_events() 에서 발생
+            event_order: 보류된 응답 발생 순서 변경 함수 (예: lambda events: events[::-1])
+        """
+        self.OnEventConnect = FakeSignal()
+        self.OnReceiveTrData = FakeSignal()
+
+        self.quotes = quotes or {}
+        self.inputs: Dict[str, str] = {}
+        self.responses: Dict[Tuple[str, str], List[Dict]] = {}  # (TR코드, 요청명) -> 행 목록
+        self.calls: List[Tuple[str, tuple]] = []                 # 호출 기록
+        self.deferred = deferred
+        self.event_order = event_order
+        self.held_events: List[Tuple] = []                       # 보류된 OnReceiveTrData 인자
+
+    def dynamicCall(self, signature: str, *args):
+        """"CommRqData(QString, ...)" -> self.CommRqData(...)"""
+        name = signature.split("(", 1)[0]
+        self.calls.append((name, args))
+        return getattr(self, name)(*args)
+
+    def call_count(self, name: str) -> int:
+        """메서드별 호출 횟수"""
+        return sum(1 for call_name, _ in self.calls if call_name == name)
+
+    # ============================================
+    # 로그인
+    # ============================================
+    def CommConnect(self):
+        self.OnEventConnect.emit(0)
+        return 0
+
+    def GetConnectState(self):
+        return 1
+
+    def GetLoginInfo(self, tag: str) -> str:
+        return {"USER_ID": "fake", "USER_NAME": "가짜계정", "ACCOUNT_CNT": "0", "ACCNO": ""}.get(tag, "")
+
+    def CommTerminate(self):
+        pass
+
+    # ============================================
+    # TR 요청
+    # ============================================
+    def SetInputValue(self, name: str, value: str):
+        self.inputs[name] = value
+
+    def CommRqData(self, rq_name: str, tr_code: str, prev_next: int, screen_no: str):
+        rows = self.handle_tr(tr_code.upper(), dict(self.inputs))
+        self.inputs = {}
+        return self._respond(screen_no, rq_name, tr_code, rows)
+
+    def handle_tr(self, tr_code: str, inputs: Dict[str, str]) -> List[Dict]:
+        """
+        단일 TR 응답 행 생성 (하위 클래스에서 구현)
+
+        Returns:
+            [{"항목명": "값", ...}, ...], None 이면 응답 없음 (타임아웃)
+        """
+        return []
+
+    def CommKwRqData(self, arr_code: str, next_: int, code_count: int, type_flag: int, rq_name: str, screen_no: str):
+        codes = [code for code in arr_code.split(";") if code][:code_count]
+        rows = [dict(self.quotes[code], 종목코드=code) for code in codes if code in self.quotes]
+        return self._respond(screen_no, rq_name, "OPTKWFID", rows)
+
+    def _respond(self, screen_no: str, rq_name: str, tr_code: str, rows: List[Dict]) -> int:
+        """응답 저장 후 OnReceiveTrData 발생 (deferred 이면 보류)"""
+        if rows is None:
+            return 0
+        self.responses[(tr_code, rq_name)] = rows
+        event = (screen_no, rq_name, tr_code, "", "0")
+        if self.deferred:
+            self.held_events.append(event)
+        else:
+            self._emit(event)
+        return 0
+
+    def process_events(self):
+        """보류된 TR 응답 발생 (KiwoomAPI.wait 에서 호출)"""
+        events, self.held_events = self.held_events, []
+        if self.event_order:
+            events = self.event_order(events)
+        for event in events:
+            self._emit(event)
+
+    def _emit(self, event: Tuple):
+        """OnReceiveTrData 발생 (응답 데이터는 이벤트 안에서만 조회 가능)"""
+        screen_no, rq_name, tr_code = event[:3]
+        self.OnReceiveTrData.emit(*event)
+        self.responses.pop((tr_code, rq_name), None)
+
+    def GetRepeatCnt(self, tr_code: str, rq_name: str) -> int:
+        return len(self.responses.get((tr_code, rq_name), []))
+
+    def GetCommData(self, tr_code: str, rq_name: str, index: int, item_name: str) -> str:
+        rows = self.responses.get((tr_code, rq_name), [])
+        if index >= len(rows):
+            return ""
+        return str(rows[index].get(item_name, ""))
@@ -1,21 +1,27 @@
 """
 시장 데이터 크롤러
-- 시총, 주식수, PER, PBR 조회 (OPT10001)
-- 매일 장 마감 후 실행
+- 시총, 주식수, PER, PBR, EPS, BPS 조회 (OPT10001)
+- 기준 정보(주식수, EPS, BPS)는 주 1회 갱신
+- 매일은 당일 종가로 시총/PER/PBR 계산 (추가 TR 없음)
 """
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional
 from .api import KiwoomAPI
-import time
 
 
 class MarketCrawler:
     """시장 데이터 크롤러 (시총, 주식수, PER, PBR)"""
 
-    # TR 요청 간 대기 시간 (초) - 키움 API 제한: 조회TR 3.6초/1회
-    REQUEST_INTERVAL = 3.7
+    # 상장주식 단위 (OPT10001 상장주식 = 천주)
+    SHARES_UNIT = 1000
 
-    def __init__(self, api: KiwoomAPI):
+    def __init__(self, api: KiwoomAPI, progress: Callable[[int, int], None] = None):
+        """
+        Args:
+            api: 키움 API
+            progress: 진행 알림 함수 (완료 종목 수, 전체 종목 수), 서버 작업 진행률용
+        """
         self.api = api
+        self.progress = progress
 
     def get_stock_info(self, stock_code: str) -> Optional[Dict]:
         """
@@ -27,9 +33,11 @@ class MarketCrawler:
         Returns:
             {
                 "market_cap": 420000000000000,  # 시가총액 (원)
-                "shares": 5969782550,            # 상장주식수
+                "shares": 5969782,               # 상장주식수 (천주)
                 "per": 12.5,
-                "pbr": 1.2
+                "pbr": 1.2,
+                "eps": 4950,                     # 주당순이익 (원)
+                "bps": 52002                     # 주당순자산 (원)
             }
         """
         def handler(tr_code, rq_name):
@@ -50,11 +58,17 @@ class MarketCrawler:
                 pbr_str = self.api._get_comm_data(tr_code, rq_name, 0, "PBR")
                 pbr = float(pbr_str or 0)
 
+                # EPS / BPS (일별 PER/PBR 계산용)
+                eps = int(float(self.api._get_comm_data(tr_code, rq_name, 0, "EPS") or 0))
+                bps = int(float(self.api._get_comm_data(tr_code, rq_name, 0, "BPS") or 0))
+
                 return {
                     "market_cap": market_cap,
                     "shares": shares,
                     "per": per,
-                    "pbr": pbr
+                    "pbr": pbr,
+                    "eps": eps,
+                    "bps": bps
                 }
             except (ValueError, AttributeError) as e:
                 print(f"종목 {stock_code} 파싱 에러: {e}")
@@ -90,13 +104,71 @@ class MarketCrawler:
             info = self.get_stock_info(code)
             if info:
                 result[code] = info
-
-            # API 요청 제한 준수
-            time.sleep(self.REQUEST_INTERVAL)
+            if self.progress:
+                self.progress(i + 1, total)
 
         print(f"시장 데이터 크롤링 완료: {len(result)}개 종목")
         return result
 
+    @classmethod
+    def derive_market_data(cls, close: int, base: Dict) -> Optional[Dict]:
+        """
+        당일 종가 + 기준 정보로 시장 데이터 계산 (TR 요청 없음)
+
+        Args:
+            close: 당일 종가
+            base: 이전 시장 데이터 {"shares": ..., "eps": ..., "bps": ...}
+
+        Returns:
+            시장 데이터, 기준 정보(EPS/BPS)가 없으면 None
+        """
+        if not base or "eps" not in base or "bps" not in base:
+            return None
+
+        shares, eps, bps = base.get("shares", 0), base["eps"], base["bps"]
+        return {
+            "market_cap": close * shares * cls.SHARES_UNIT,
+            "shares": shares,
+            "per": round(close / eps, 2) if eps > 0 else 0.0,
+            "pbr": round(close / bps, 2) if bps > 0 else 0.0,
+            "eps": eps,
+            "bps": bps
+        }
+
+    def crawl_from_prices(self, prices: Dict[str, Dict], base_market: Dict[str, Dict]) -> Dict[str, Dict]:
+        """
+        일별 시장 데이터 수집 (종목당 TR 0회)
+        - 기준 정보가 있는 종목: 당일 종가로 계산
+        - 기준 정보가 없는 종목(신규 등)만 OPT10001 조회
+
+        Args:
+            prices: {"005930": {"close": 71000, ...}, ...} (당일 일봉)
+            base_market: 이전 market.json 의 data
+
+        Returns:
+            {"005930": {"market_cap": ..., "shares": ..., "per": ..., "pbr": ..., "eps": ..., "bps": ...}, ...}
+        """
+        result = {}
+        missing = []
+
+        for code, price in prices.items():
+            derived = self.derive_market_data(price["close"], base_market.get(code))
+            if derived:
+                result[code] = derived
+            else:
+                missing.append(code)
+
+        print(f"시장 데이터 계산: {len(result)}개 종목 (기준 정보 조회 필요: {len(missing)}개)")
+        if missing:
+            result.update(self.crawl_stocks(missing))
+
+        # 오늘 가격이 없는 종목은 이전 값 유지
+        for code, data in base_market.items():
+            if code not in result:
+                result[code] = data
+
+        return result
+
 
 if __name__ == "__main__":
     # 테스트
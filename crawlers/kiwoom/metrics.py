@@ -0,0 +1,160 @@
+"""
+TR 요청 계측
+- TR 코드별 응답 지연 히스토그램, 결과(정상/빈 응답/파싱 실패/타임아웃) 횟수
+- 핸들러 파싱 시간, 요청 제한 대기 시간 누적
+- JSON 스냅샷 / Prometheus 텍스트로 내보내기 (server.py: GET /api/metrics)
+- 프로세스 전체에서 TR_METRICS 하나를 공유 (서버 스레드에서 실행 중인 크롤링도 조회 가능)
+"""
+import threading
+import time
+from typing import Callable, Dict, List
+
+# 응답 지연 히스토그램 구간 상한 (초), 마지막 +Inf 는 자동 추가
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# 요청 결과 (error = 응답은 왔지만 핸들러에서 예외 발생)
+OUTCOMES = ("ok", "empty", "error", "timeout")
+
+
+class TRMetrics:
+    """TR 코드별 요청 계측 (스레드 안전)"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS, clock: Callable[[], float] = time.perf_counter):
+        """
+        Args:
+            buckets: 응답 지연 히스토그램 구간 상한 (초)
+            clock: 시간 측정 함수 (초)
+        """
+        self.buckets = tuple(sorted(buckets))
+        self.clock = clock
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """계측값 초기화"""
+        with self._lock:
+            self.started_at = time.time()
+            self._trs: Dict[str, Dict] = {}
+
+    def _tr(self, tr_code: str) -> Dict:
+        tr = self._trs.get(tr_code)
+        if tr is None:
+            tr = self._trs[tr_code] = {
+                "requests": 0,
+                **{outcome: 0 for outcome in OUTCOMES},
+                # 구간별 개수 (누적 아님, 마지막 = +Inf)
+                "latency_buckets": [0] * (len(self.buckets) + 1),
+                "latency_sum": 0.0,
+                "timeout_wait": 0.0,
+                "parse_time": 0.0,
+                "rate_limit_wait": 0.0,
+            }
+        return tr
+
+    def record(
+        self,
+        tr_code: str,
+        outcome: str,
+        latency: float,
+        parse_time: float = 0.0,
+        rate_limit_wait: float = 0.0
+    ):
+        """
+        TR 요청 1회 기록
+
+        Args:
+            tr_code: "OPT10081" 등
+            outcome: "ok" | "empty" | "error" | "timeout"
+            latency: 요청 ~ 응답 수신 시간 (타임아웃이면 대기한 시간)
+            parse_time: 응답 핸들러 실행 시간
+            rate_limit_wait: 요청 전 요청 제한기 대기 시간
+        """
+        with self._lock:
+            tr = self._tr(tr_code)
+            tr["requests"] += 1
+            tr[outcome] += 1
+            tr["parse_time"] += parse_time
+            tr["rate_limit_wait"] += rate_limit_wait
+
+            if outcome == "timeout":
+                tr["timeout_wait"] += latency
+                return
+
+            tr["latency_sum"] += latency
+            slot = next((i for i, bound in enumerate(self.buckets) if latency <= bound), len(self.buckets))
+            tr["latency_buckets"][slot] += 1
+
+    def snapshot(self) -> Dict:
+        """
+        JSON 스냅샷
+
+        Returns:
+            {
+                "started_at": 1737350000.0,
+                "buckets": [0.05, ..., 10.0],
+                "trs": {"OPT10081": {"requests", "ok", "empty", "error", "timeout", "latency_buckets",
+                                     "latency_sum", "latency_avg", "timeout_wait", "parse_time", "rate_limit_wait"}},
+                "total": {"requests", "ok", "empty", "error", "timeout", "timeout_wait", "rate_limit_wait"}
+            }
+        """
+        with self._lock:
+            trs = {code: dict(tr, latency_buckets=list(tr["latency_buckets"])) for code, tr in self._trs.items()}
+            started_at = self.started_at
+
+        for tr in trs.values():
+            responded = tr["ok"] + tr["empty"] + tr["error"]
+            tr["latency_avg"] = tr["latency_sum"] / responded if responded else 0.0
+
+        total_keys = ("requests",) + OUTCOMES + ("timeout_wait", "rate_limit_wait")
+        return {
+            "started_at": started_at,
+            "buckets": list(self.buckets),
+            "trs": trs,
+            "total": {key: sum(tr[key] for tr in trs.values()) for key in total_keys},
+        }
+
+    def to_prometheus(self) -> str:
+        """Prometheus 텍스트 형식 (text/plain; version=0.0.4)"""
+        trs = self.snapshot()["trs"]
+        lines: List[str] = []
+
+        def metric(name: str, kind: str, help_text: str):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        metric("kiwoom_tr_requests_total", "counter", "TR requests by outcome")
+        for code, tr in trs.items():
+            for outcome in OUTCOMES:
+                lines.append(f'kiwoom_tr_requests_total{{tr="{code}",outcome="{outcome}"}} {tr[outcome]}')
+
+        metric("kiwoom_tr_latency_seconds", "histogram", "TR response latency (timeouts excluded)")
+        for code, tr in trs.items():
+            cumulative = 0
+            for bound, count in zip(list(self.buckets) + ["+Inf"], tr["latency_buckets"]):
+                cumulative += count
+                lines.append(f'kiwoom_tr_latency_seconds_bucket{{tr="{code}",le="{bound}"}} {cumulative}')
+            lines.append(f'kiwoom_tr_latency_seconds_sum{{tr="{code}"}} {tr["latency_sum"]:.6f}')
+            lines.append(f'kiwoom_tr_latency_seconds_count{{tr="{code}"}} {cumulative}')
+
+        for name, key, help_text in (
+            ("kiwoom_tr_timeout_wait_seconds_total", "timeout_wait", "Time spent waiting on timed-out TRs"),
+            ("kiwoom_tr_parse_seconds_total", "parse_time", "Time spent in TR response handlers"),
+            ("kiwoom_tr_rate_limit_wait_seconds_total", "rate_limit_wait", "Time spent waiting on the rate limiter"),
+        ):
+            metric(name, "counter", help_text)
+            for code, tr in trs.items():
+                lines.append(f'{name}{{tr="{code}"}} {tr[key]:.6f}')
+
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> str:
+        """한 줄 요약 (크롤러 종료 시 출력)"""
+        total = self.snapshot()["total"]
+        return (
+            f"TR {total['requests']}회 (정상 {total['ok']}, 빈 응답 {total['empty']}, 파싱 실패 {total['error']}, 타임아웃 {total['timeout']}), "
+            f"타임아웃 대기 {total['timeout_wait']:.1f}초, 요청 제한 대기 {total['rate_limit_wait']:.1f}초"
+        )
+
+
+# 프로세스 공유 계측 (KiwoomAPI 기본값)
+TR_METRICS = TRMetrics()
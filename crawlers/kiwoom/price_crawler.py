@@ -1,22 +1,34 @@
 """
 일봉 데이터 크롤러
 - 종목별 일봉 조회 (OPT10081)
+- 오늘 종가 일괄 조회 (CommKwRqData, 100종목씩)
 - 매일 장 마감 후 실행
 """
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional, Tuple
 from datetime import datetime, timedelta
 from .api import KiwoomAPI
-import time
 
 
 class PriceCrawler:
     """일봉 데이터 크롤러"""
 
-    # TR 요청 간 대기 시간 (초) - 키움 API 제한: 조회TR 3.6초/1회
-    REQUEST_INTERVAL = 3.7
+    # OPT10081 1회 응답 최대 행 수
+    MAX_ROWS = 600
 
-    def __init__(self, api: KiwoomAPI):
+    # 거래일 확인용 기준 종목 (거래정지 가능성이 낮은 대형주: 삼성전자, SK하이닉스, NAVER)
+    REFERENCE_CODES = ("005930", "000660", "035420")
+
+    # 휴장일 판정에 필요한 기준 종목 수 (마지막 일봉이 오늘이 아닌 종목이 이만큼 있어야 휴장일)
+    HOLIDAY_AGREEMENT = 2
+
+    def __init__(self, api: KiwoomAPI, progress: Callable[[int, int], None] = None):
+        """
+        Args:
+            api: 키움 API
+            progress: 진행 알림 함수 (완료 종목 수, 전체 종목 수), 서버 작업 진행률용
+        """
         self.api = api
+        self.progress = progress
 
     def get_daily_price(
         self,
@@ -106,13 +118,37 @@ class PriceCrawler:
 
             prices = self.get_daily_price(code, count=days)
             result[code] = prices
-
-            # API 요청 제한 준수
-            time.sleep(self.REQUEST_INTERVAL)
+            if self.progress:
+                self.progress(i + 1, total)
 
         print(f"일봉 크롤링 완료: {total}개 종목")
         return result
 
+    def crawl_ranges(self, requests: List[Tuple[str, str, int]]) -> Dict[str, List[Dict]]:
+        """
+        종목별 기간 일봉 크롤링 (누락 구간 보충용, 요청당 OPT10081 1회)
+
+        Args:
+            requests: [(종목코드, 기준일자 "2025-01-20", 조회할 일수), ...]
+
+        Returns:
+            {"종목코드": [일봉 데이터 리스트], ...}
+        """
+        result = {}
+        total = len(requests)
+
+        for i, (code, end_date, count) in enumerate(requests):
+            if (i + 1) % 100 == 0:
+                print(f"[{i + 1}/{total}] 누락 구간 조회 중...")
+
+            prices = self.get_daily_price(code, start_date=end_date.replace("-", ""), count=count)
+            result.setdefault(code, []).extend(prices)
+            if self.progress:
+                self.progress(i + 1, total)
+
+        print(f"누락 구간 크롤링 완료: {total}건 요청, {len(result)}개 종목")
+        return result
+
     def crawl_today(self, stock_codes: List[str]) -> Dict[str, Dict]:
         """
         오늘 데이터만 크롤링 (일일 갱신용)
@@ -134,11 +170,80 @@ class PriceCrawler:
             if prices:
                 result[code] = prices[0]
 
-            time.sleep(self.REQUEST_INTERVAL)
-
         print(f"오늘 일봉 크롤링 완료: {len(result)}개 종목")
         return result
 
+    def crawl_today_batch(self, stock_codes: List[str]) -> Dict[str, Dict]:
+        """
+        오늘 종가/거래대금 일괄 조회 (CommKwRqData, 100종목당 TR 1회)
+        - 장 마감 후 현재가 = 종가
+        - 거래일 확인: 기준 종목(대형주 + 요청 앞 종목)을 OPT10081로 조회
+          - 하나라도 마지막 일봉이 오늘이면 거래일
+          - HOLIDAY_AGREEMENT 개 이상이 오늘이 아니면 휴장일 (빈 결과)
+          - 판단할 수 없으면 (응답 없음 등) 일괄 조회 결과에 거래량이 하나도 없을 때만 휴장일
+
+        Args:
+            stock_codes: 종목코드 리스트
+
+        Returns:
+            {"종목코드": {"date", "close", "volume", "trading_value"}, ...}
+        """
+        if not stock_codes:
+            return {}
+
+        today = datetime.now().strftime("%Y-%m-%d")
+        trading_day = self._is_trading_day(today, stock_codes)
+        if trading_day is False:
+            print(f"오늘({today}) 거래 데이터 없음 - 휴장일")
+            return {}
+
+        quotes = self.api.get_multi_quotes(stock_codes, ["현재가", "거래량", "거래대금"])
+
+        result = {}
+        for code, quote in quotes.items():
+            try:
+                result[code] = {
+                    "date": today,
+                    "close": abs(int(quote["현재가"] or 0)),
+                    "volume": abs(int(quote["거래량"] or 0)),
+                    "trading_value": abs(int(quote["거래대금"] or 0)) * 1000000,  # 백만원 단위 -> 원
+                }
+            except ValueError as e:
+                print(f"종목 {code} 파싱 에러: {e}")
+
+        # 기준 종목으로 판단하지 못했으면 일괄 조회 결과로 판단 (휴장일이면 거래량이 모두 0)
+        if trading_day is None and not any(row["volume"] for row in result.values()):
+            print(f"오늘({today}) 거래량 없음 - 휴장일")
+            return {}
+
+        print(f"오늘 종가 일괄 조회 완료: {len(result)}/{len(stock_codes)}개 종목")
+        return result
+
+    def _is_trading_day(self, today: str, stock_codes: List[str]) -> Optional[bool]:
+        """
+        기준 종목 마지막 일봉으로 오늘이 거래일인지 확인
+        - 거래정지/상장폐지 종목 1개 때문에 휴장일로 판정하지 않도록 여러 종목이 일치해야 휴장일
+
+        Args:
+            today: 오늘 (YYYY-MM-DD)
+            stock_codes: 수집 대상 종목코드 (기준 종목 뒤에 앞 2개 추가 확인)
+
+        Returns:
+            True: 거래일, False: 휴장일, None: 판단 불가 (기준 종목 응답 없음)
+        """
+        references = list(dict.fromkeys(list(self.REFERENCE_CODES) + stock_codes[:2]))
+        stale = 0
+        for code in references:
+            prices = self.get_daily_price(code, count=1)
+            if not prices:
+                continue
+            if prices[0]["date"] == today:
+                return True
+            stale += 1
+            if stale >= self.HOLIDAY_AGREEMENT:
+                return False
+        return None
+
 
 if __name__ == "__main__":
     # 테스트
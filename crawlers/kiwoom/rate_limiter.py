@@ -0,0 +1,117 @@
+"""
+TR 요청 제한기
+- 키움 API 조회 제한: 1초 5회, 1분 100회, 1시간 1000회 (≈ 3.6초/1회)
+- 실제 요청 시각을 기록하여 모든 구간 제한을 만족할 때까지만 대기
+- clock / sleep 주입으로 가짜 시계 테스트 가능 (PyQt 불필요)
+"""
+import time
+from collections import deque
+from typing import Callable, List, Tuple
+
+
+class RateLimiter:
+    """슬라이딩 윈도우 방식 TR 요청 제한기"""
+
+    # (허용 횟수, 구간 초)
+    DEFAULT_LIMITS = [
+        (5, 1.0),
+        (100, 60.0),
+        (1000, 3600.0),
+    ]
+
+    def __init__(
+        self,
+        limits: List[Tuple[int, float]] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        """
+        Args:
+            limits: [(허용 횟수, 구간 초), ...], 기본값 키움 제한
+            clock: 현재 시각 함수 (초)
+            sleep: 대기 함수
+        """
+        self.limits = sorted(limits or self.DEFAULT_LIMITS, key=lambda limit: limit[1])
+        self.clock = clock
+        self.sleep = sleep
+
+        # 가장 긴 구간 안의 요청 시각만 보관
+        self._window = max(period for _, period in self.limits)
+        self._history = deque()
+
+        self.request_count = 0
+        self.total_wait = 0.0
+
+    def _prune(self, now: float):
+        """가장 긴 구간을 벗어난 기록 삭제"""
+        while self._history and self._history[0] <= now - self._window:
+            self._history.popleft()
+
+    def wait_time(self, now: float = None) -> float:
+        """
+        다음 요청까지 기다려야 하는 시간 (초)
+
+        Args:
+            now: 기준 시각, 기본값 현재
+        """
+        if now is None:
+            now = self.clock()
+        self._prune(now)
+
+        wait = 0.0
+        count = len(self._history)
+        for max_count, period in self.limits:
+            if count < max_count:
+                continue
+            # 구간 안 요청이 max_count 미만이 되는 시점 = 뒤에서 max_count번째 요청 + period
+            oldest = self._history[count - max_count]
+            wait = max(wait, oldest + period - now)
+        return wait
+
+    def acquire(self) -> float:
+        """
+        요청 가능할 때까지 대기 후 요청 시각 기록
+
+        Returns:
+            실제 대기 시간 (초)
+        """
+        waited = 0.0
+        while True:
+            wait = self.wait_time()
+            if wait <= 0:
+                break
+            self.sleep(wait)
+            waited += wait
+
+        self._history.append(self.clock())
+        self.request_count += 1
+        self.total_wait += waited
+        return waited
+
+
+class VirtualClock:
+    """
+    가상 시계 (시뮬레이터/테스트용)
+    - sleep 하면 실제로 기다리지 않고 시각만 이동
+    """
+
+    def __init__(self, start: float = 0.0):
+        self.now = start
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.now += seconds
+
+
+if __name__ == "__main__":
+    # 가짜 시계 테스트
+    clock = VirtualClock()
+    limiter = RateLimiter(clock=clock, sleep=clock.sleep)
+
+    for _ in range(1000):
+        limiter.acquire()
+        clock.now += 0.2  # 요청 처리 시간
+
+    print(f"1000회 요청: {clock.now:.1f}초 (대기 {limiter.total_wait:.1f}초)")
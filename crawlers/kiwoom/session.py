@@ -0,0 +1,118 @@
+"""
+키움 세션 관리
+- 로그인된 KiwoomAPI 1개를 유지하며 작업마다 빌려줌 (작업이 끝나도 연결 해제 안 함)
+- 빌려줄 때마다 연결 상태 확인 (GetConnectState)
+- 첫 로그인 실패 시 재시도
+- 로그인 후 연결이 끊기면 재접속하지 않고 "재시작 필요" 상태로 전환
+  (끊긴 Open API+ 컨트롤은 같은 프로세스에서 CommConnect 를 다시 호출해도 정상 복구되지 않음 -> 프로세스 재시작)
+- QAxWidget 은 만든 스레드에서만 사용 가능 -> 세션도 한 스레드에서만 사용 (server.py 작업 스레드, start_scheduler)
+"""
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+from .api import KiwoomAPI, create_api
+
+# 로그인 시도 횟수 / 재시도 간격 (초)
+LOGIN_ATTEMPTS = 3
+LOGIN_RETRY_DELAY = 10
+
+
+class KiwoomSession:
+    """로그인 유지되는 키움 API 세션"""
+
+    def __init__(
+        self,
+        factory: Callable[[], KiwoomAPI] = None,
+        login_attempts: int = LOGIN_ATTEMPTS,
+        retry_delay: float = LOGIN_RETRY_DELAY,
+        login_timeout: int = 60,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        """
+        Args:
+            factory: KiwoomAPI 생성 함수, 기본값 create_api (KIWOOM_BACKEND)
+            login_attempts: 로그인 시도 횟수
+            retry_delay: 로그인 재시도 간격 (초)
+            login_timeout: 로그인 1회 타임아웃 (초)
+            sleep: 대기 함수
+        """
+        self.factory = factory or create_api
+        self.login_attempts = login_attempts
+        self.retry_delay = retry_delay
+        self.login_timeout = login_timeout
+        self.sleep = sleep
+        self._lock = threading.Lock()
+        self.api: Optional[KiwoomAPI] = None
+        self.logins = 0          # 로그인 성공 횟수
+        self.logged_in_at: Optional[str] = None
+        self.restart_required = False  # 로그인 후 연결 끊김 -> 이후 작업은 모두 실패 (프로세스 재시작 필요)
+        self.disconnected_at: Optional[str] = None
+
+    def is_connected(self) -> bool:
+        """로그인된 API 가 있고 서버와 연결되어 있는지 확인"""
+        if self.api is None or not self.api.connected:
+            return False
+        try:
+            return self.api.get_connect_state()
+        except Exception as e:
+            print(f"키움 연결 상태 확인 에러: {e}")
+            return False
+
+    def acquire(self) -> Optional[KiwoomAPI]:
+        """
+        작업용 API 반환 (연결 확인, 처음이면 로그인)
+
+        Returns:
+            로그인된 KiwoomAPI (로그인 실패 또는 재시작 필요 시 None)
+        """
+        with self._lock:
+            if self.restart_required:
+                print("키움 연결 끊김 상태 - 프로세스 재시작 필요")
+                return None
+
+            if self.is_connected():
+                return self.api
+
+            if self.api is not None and self.api.connected:
+                print("키움 연결 끊김 - 같은 프로세스에서 재접속 불가, 프로세스 재시작 필요")
+                self.restart_required = True
+                self.disconnected_at = datetime.now().isoformat(timespec="seconds")
+                self.api.connected = False
+                return None
+
+            # QApplication / OCX 는 1번만 생성
+            if self.api is None:
+                self.api = self.factory()
+
+            for attempt in range(1, self.login_attempts + 1):
+                try:
+                    if self.api.login(timeout=self.login_timeout):
+                        self.logins += 1
+                        self.logged_in_at = datetime.now().isoformat(timespec="seconds")
+                        return self.api
+                except Exception as e:
+                    print(f"로그인 에러: {e}")
+
+                print(f"로그인 실패 ({attempt}/{self.login_attempts})")
+                if attempt < self.login_attempts:
+                    self.sleep(self.retry_delay)
+
+            return None
+
+    def close(self):
+        """연결 해제 (프로세스 종료 시)"""
+        with self._lock:
+            if self.api is not None and self.api.connected:
+                self.api.disconnect()
+
+    def status(self) -> Dict:
+        """세션 상태 {"connected", "logins", "logged_in_at", "restart_required", "disconnected_at"}"""
+        return {
+            "connected": self.api is not None and self.api.connected,
+            "logins": self.logins,
+            "logged_in_at": self.logged_in_at,
+            "restart_required": self.restart_required,
+            "disconnected_at": self.disconnected_at,
+        }
@@ -0,0 +1,212 @@
+"""
+키움 OCX 시뮬레이터
+- web/data 파일(themes/stocks/market/prices)을 기록된 응답으로 사용
+- GetThemeGroupList / GetThemeGroupCode / GetMasterCodeName / GetCodeListByMarket
+- OPT10081 (일봉), OPT10001 (기본정보), CommKwRqData (복수종목 시세)
+- 응답 지연(latency) 설정으로 리눅스에서 수집 파이프라인 벤치마크 가능
+
+사용법:
+    KIWOOM_BACKEND=sim KIWOOM_SIM_LATENCY=0.05 THEMA_DATA_PATH=/tmp/thema python scheduler.py init
+"""
+import glob
+import json
+import os
+import time
+from typing import Callable, Dict, List
+
+from .fake_ocx import FakeOCX
+
+# 기본 데이터 경로 (web/data)
+DEFAULT_DATA_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "web", "data"
+)
+
+# OPT10081 1회 응답 최대 행 수
+DAILY_MAX_ROWS = 600
+
+
+class SimulatedOCX(FakeOCX):
+    """기록된 데이터로 응답하는 가짜 키움 OCX"""
+
+    def __init__(
+        self,
+        data_path: str = DEFAULT_DATA_PATH,
+        latency: float = 0.0,
+        call_latency: float = 0.0,
+        sleep: Callable[[float], None] = time.sleep,
+        fixtures: Dict = None
+    ):
+        """
+        Args:
+            data_path: 기록 데이터 디렉토리 (web/data 구조)
+            latency: TR 요청 1회당 응답 지연 (초)
+            call_latency: 기타 호출(GetMasterCodeName 등) 1회당 지연 (초)
+            sleep: 대기 함수
+            fixtures: 파일 대신 사용할 데이터 (벤치마크 합성 데이터 등)
+                {"themes": [...], "stocks": {...}, "market": {...}, "prices": {"005930": {"2025-01-20": {...}}}}
+        """
+        self.data_path = data_path
+        self.latency = latency
+        self.call_latency = call_latency
+        self.sleep = sleep
+
+        if fixtures is not None:
+            self.themes: List[Dict] = fixtures["themes"]
+            self.stocks: Dict[str, Dict] = fixtures["stocks"]
+            self.market: Dict[str, Dict] = fixtures["market"]
+            self.prices = self._sort_prices(fixtures["prices"])
+        else:
+            self.themes = self._load("themes.json", {"themes": []})["themes"]
+            self.stocks = self._load("stocks.json", {})
+            self.market = self._load("market.json", {"data": {}})["data"]
+            self.prices = self._load_prices()
+
+        super().__init__(quotes=self._build_quotes())
+
+        self.theme_index = {theme["id"]: theme for theme in self.themes}
+
+    def _load(self, filename: str, default):
+        filepath = os.path.join(self.data_path, filename)
+        if not os.path.exists(filepath):
+            return default
+        with open(filepath, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _load_prices(self) -> Dict[str, List]:
+        """
+        월별 가격 파일 병합
+
+        Returns:
+            {"005930": [("2025-01-20", {"close": 71000, "value": ...}), ...]} (최신순)
+        """
+        merged: Dict[str, Dict] = {}
+        pattern = os.path.join(self.data_path, "prices", "[0-9][0-9][0-9][0-9]-[0-9][0-9].json")
+        for filepath in sorted(glob.glob(pattern)):
+            with open(filepath, "r", encoding="utf-8") as f:
+                for code, daily in json.load(f).items():
+                    merged.setdefault(code, {}).update(daily)
+
+        return self._sort_prices(merged)
+
+    @staticmethod
+    def _sort_prices(prices: Dict[str, Dict]) -> Dict[str, List]:
+        """{code: {date: price}} -> {code: [(date, price), ...]} (최신순)"""
+        return {
+            code: sorted(daily.items(), reverse=True)
+            for code, daily in prices.items()
+            if daily
+        }
+
+    def _build_quotes(self) -> Dict[str, Dict[str, str]]:
+        """CommKwRqData 응답 (종목별 마지막 거래일 시세)"""
+        quotes = {}
+        for code, daily in self.prices.items():
+            _, price = daily[0]
+            quotes[code] = {
+                "현재가": str(price["close"]),
+                "거래량": str(price["value"] // price["close"] if price["close"] else 0),
+                "거래대금": str(price["value"] // 1000000),  # 원 -> 백만원
+            }
+        return quotes
+
+    def dynamicCall(self, signature: str, *args):
+        name = signature.split("(", 1)[0]
+        if name in ("CommRqData", "CommKwRqData"):
+            delay = self.latency
+        else:
+            delay = self.call_latency
+        if delay > 0:
+            self.sleep(delay)
+        return super().dynamicCall(signature, *args)
+
+    # ============================================
+    # 테마 / 종목 마스터
+    # ============================================
+    def GetThemeGroupList(self, type_: int) -> str:
+        return ";".join(f"{theme['id']}|{theme['name']}" for theme in self.themes)
+
+    def GetThemeGroupCode(self, theme_code: str) -> str:
+        theme = self.theme_index.get(theme_code)
+        if not theme:
+            return ""
+        return ";".join(f"A{code}" for code in theme["stocks"])
+
+    def GetMasterCodeName(self, code: str) -> str:
+        return self.stocks.get(code, {}).get("name", "")
+
+    def GetCodeListByMarket(self, market: str) -> str:
+        # 0: 코스피, 10: 코스닥 (ETF 등 기타 시장은 기록 없음)
+        names = {"0": "KOSPI", "10": "KOSDAQ"}
+        if market not in names:
+            return ""
+        codes = [code for code, stock in self.stocks.items() if stock.get("market") == names[market]]
+        return ";".join(codes) + ";" if codes else ""
+
+    # ============================================
+    # TR 응답
+    # ============================================
+    def handle_tr(self, tr_code: str, inputs: Dict[str, str]) -> List[Dict]:
+        if tr_code == "OPT10081":
+            return self._daily_rows(inputs.get("종목코드", ""), inputs.get("기준일자", ""))
+        if tr_code == "OPT10001":
+            return self._basic_info_rows(inputs.get("종목코드", ""))
+        return []
+
+    def _daily_rows(self, code: str, base_date: str) -> List[Dict]:
+        """OPT10081: 기준일자 이전 일봉 (최신순)"""
+        if len(base_date) == 8:
+            base_date = f"{base_date[:4]}-{base_date[4:6]}-{base_date[6:8]}"
+
+        rows = []
+        for date, price in self.prices.get(code, []):
+            if base_date and date > base_date:
+                continue
+            close = str(price["close"])
+            rows.append({
+                "일자": date.replace("-", ""),
+                "시가": close,
+                "고가": close,
+                "저가": close,
+                "현재가": close,
+                "거래량": str(price["value"] // price["close"] if price["close"] else 0),
+                "거래대금": str(price["value"] // 1000000),  # 원 -> 백만원
+            })
+            if len(rows) >= DAILY_MAX_ROWS:
+                break
+        return rows
+
+    def _basic_info_rows(self, code: str) -> List[Dict]:
+        """OPT10001: 시총(억원), 상장주식(천주), PER, PBR, EPS, BPS"""
+        info = self.market.get(code)
+        if info is None:
+            return []
+
+        daily = self.prices.get(code)
+        close = daily[0][1]["close"] if daily else 0
+        per = info.get("per") or 0
+        pbr = info.get("pbr") or 0
+
+        return [{
+            "현재가": str(close),
+            "시가총액": str(info.get("market_cap", 0) // 100000000),  # 원 -> 억원
+            "상장주식": str(info.get("shares", 0)),
+            "PER": str(per),
+            "PBR": str(pbr),
+            "EPS": str(round(close / per) if per > 0 else 0),
+            "BPS": str(round(close / pbr) if pbr > 0 else 0),
+        }]
+
+
+if __name__ == "__main__":
+    # 테스트
+    from .api import KiwoomAPI
+    from .price_crawler import PriceCrawler
+
+    ocx = SimulatedOCX()
+    api = KiwoomAPI(ocx=ocx)
+    api.login()
+
+    codes = list(ocx.stocks)[:3]
+    for code in codes:
+        prices = PriceCrawler(api).get_daily_price(code, count=3)
+        print(code, ocx.GetMasterCodeName(code), prices)
@@ -5,15 +5,11 @@
 """
 from typing import List, Dict
 from .api import KiwoomAPI
-import time
 
 
 class ThemeCrawler:
     """테마/종목 데이터 크롤러"""
 
-    # TR 요청 간 대기 시간 (초) - 키움 API 제한
-    REQUEST_INTERVAL = 0.5
-
     def __init__(self, api: KiwoomAPI):
         self.api = api
         self._kosdaq_codes = None  # 코스닥 종목 캐시
@@ -144,9 +140,6 @@ class ThemeCrawler:
             stocks = self.get_theme_stocks(theme_code)
             data["theme_stocks"][theme_code] = stocks
 
-            # API 요청 제한 준수
-            time.sleep(self.REQUEST_INTERVAL)
-
         print(f"크롤링 완료: 테마 {len(themes)}개")
         return data
 
@@ -181,8 +174,6 @@ class ThemeCrawler:
                 total_kosdaq += len(kosdaq_stocks)
                 print(f"  -> 코스닥 {len(kosdaq_stocks)}개")
 
-            time.sleep(self.REQUEST_INTERVAL)
-
         print(f"\n완료: 테마 {len(themes)}개, 코스닥 종목 {total_kosdaq}개")
         return data
 
@@ -0,0 +1,154 @@
+"""
+TR 요청 분배기
+- 요청마다 (화면번호, 요청명) 키로 대기 중인 요청(TRRequest) 등록 -> 응답 이벤트를 키로 찾아 전달
+- 요청명에 일련번호를 붙여 (예: "일봉조회#12") 같은 화면/요청명을 반복해도 키가 겹치지 않음
+- 타임아웃된 요청은 목록에서 빠지므로 늦게 도착한 응답은 다음 요청에 섞이지 않고 버림
+- 여러 TR 을 동시에 보내고 응답 순서와 무관하게 각 요청으로 결과 전달 (응답 순서가 바뀌어도 됨)
+"""
+import itertools
+from typing import Callable, Dict, List, Optional, Tuple
+
+# 요청명 일련번호 구분자
+RQ_NAME_SEP = "#"
+
+
+class TRRequest:
+    """TR 요청 1건 (응답이 오면 완료, 타임아웃이면 data=None 으로 완료)"""
+
+    def __init__(
+        self,
+        screen_no: str,
+        rq_name: str,
+        tr_code: str,
+        handler: Optional[Callable[[str, str], object]],
+        timeout: float,
+        rate_limit_wait: float = 0.0
+    ):
+        """
+        Args:
+            screen_no: 화면번호
+            rq_name: 일련번호가 붙은 요청명
+            tr_code: TR 코드 (계측용)
+            handler: 데이터 처리 핸들러 (응답 이벤트 안에서 호출)
+            timeout: 응답 대기 시간 (초)
+            rate_limit_wait: 요청 전 요청 제한기 대기 시간
+        """
+        self.screen_no = screen_no
+        self.rq_name = rq_name
+        self.tr_code = tr_code
+        self.handler = handler
+        self.timeout = timeout
+        self.timer_started = False  # 타임아웃 타이머 시작 여부 (KiwoomAPI.wait)
+        self.rate_limit_wait = rate_limit_wait
+        self.sent_at: Optional[float] = None
+        self.received_at: Optional[float] = None
+        self.parse_time = 0.0
+        self.state = "pending"  # "pending" | "done" | "timeout"
+        self.data: Optional[dict] = None
+        self.error: Optional[Exception] = None
+        self._callbacks: List[Callable[["TRRequest"], None]] = []
+
+    @property
+    def key(self) -> Tuple[str, str]:
+        return (self.screen_no, self.rq_name)
+
+    def done(self) -> bool:
+        """응답 수신 또는 타임아웃"""
+        return self.state != "pending"
+
+    def add_done_callback(self, callback: Callable[["TRRequest"], None]):
+        """완료 시 호출 (이미 완료면 바로 호출)"""
+        if self.done():
+            callback(self)
+        else:
+            self._callbacks.append(callback)
+
+    def result(self) -> Optional[dict]:
+        """
+        응답 데이터 (타임아웃이면 None)
+        - 핸들러에서 발생한 예외는 여기서 다시 발생
+        """
+        if self.error is not None:
+            raise self.error
+        return self.data
+
+    def _finish(self, state: str):
+        self.state = state
+        callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback(self)
+
+
+class TRDispatcher:
+    """대기 중인 TR 요청 목록 + 응답 분배"""
+
+    def __init__(self, clock: Callable[[], float]):
+        """
+        Args:
+            clock: 시간 측정 함수 (초), 응답 지연 / 파싱 시간 계산
+        """
+        self.clock = clock
+        self.pending: Dict[Tuple[str, str], TRRequest] = {}
+        self.dropped = 0  # 버린 응답 수 (타임아웃 후 도착, 요청하지 않은 응답)
+        self._seq = itertools.count(1)
+
+    def new_request(
+        self,
+        screen_no: str,
+        rq_name: str,
+        tr_code: str,
+        handler,
+        timeout: float,
+        rate_limit_wait: float = 0.0
+    ) -> TRRequest:
+        """
+        요청 등록 (요청명에 일련번호를 붙여 키 중복 방지)
+
+        Returns:
+            TRRequest (실제 요청은 request.rq_name 으로 보내야 함)
+        """
+        tagged = f"{rq_name}{RQ_NAME_SEP}{next(self._seq)}"
+        request = TRRequest(screen_no, tagged, tr_code, handler, timeout, rate_limit_wait)
+        request.sent_at = self.clock()
+        self.pending[request.key] = request
+        return request
+
+    def dispatch(self, screen_no: str, rq_name: str, tr_code: str, record_name: str, prev_next: str) -> Optional[TRRequest]:
+        """
+        OnReceiveTrData 응답을 해당 요청으로 전달 (핸들러는 여기서 실행 - 이벤트 안에서만 데이터 조회 가능)
+
+        Returns:
+            완료된 요청 (대기 중인 요청이 없으면 None - 타임아웃 후 도착한 응답)
+        """
+        received_at = self.clock()
+        request = self.pending.pop((screen_no, rq_name), None)
+        if request is None:
+            self.dropped += 1
+            return None
+
+        request.received_at = received_at
+        request.data = {
+            "screen_no": screen_no,
+            "rq_name": rq_name,
+            "tr_code": tr_code,
+            "record_name": record_name,
+            "prev_next": prev_next,
+        }
+
+        # TR 핸들러가 있으면 실행 (이벤트 안에서 데이터 읽기)
+        if request.handler:
+            try:
+                request.data["result"] = request.handler(tr_code, rq_name)
+            except Exception as e:
+                request.error = e
+            request.parse_time = self.clock() - received_at
+
+        request._finish("done")
+        return request
+
+    def expire(self, request: TRRequest):
+        """타임아웃 처리 (이후 도착하는 응답은 버림), 이미 완료면 무시"""
+        if request.done():
+            return
+        self.pending.pop(request.key, None)
+        request._finish("timeout")
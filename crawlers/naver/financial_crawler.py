@@ -1,20 +1,278 @@
 """
 재무 데이터 크롤러 (네이버 금융)
-- 매출, 영업이익 조회
-- 분기 1회 실행
+- 매출, 영업이익 조회 (최근 실적 분기 + 테이블의 전체 분기/연간 실적)
+- 분기 1회 실행, 종목별 지문(fingerprint)으로 변경된 종목만 갱신 (refresh_stocks)
+- 세션 연결 재사용 + 동시 요청 (동시 요청 수 제한, 호스트별 요청 간격, 재시도)
+- 파싱: 페이지에서 재무정보(cop_analysis) 테이블만 잘라 파싱 (lxml 설치 시 lxml 사용)
+  페이지당 수 ms 이므로 기본은 요청 스레드에서 파싱, 필요 시 프로세스 풀 사용
 """
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Callable, List, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
-from typing import List, Dict, Optional
-import time
-import re
+
+try:
+    import lxml.html
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+# 재무정보 영역 시작 (<div class="section cop_analysis">)
+COP_ANALYSIS_PATTERN = re.compile(r"<div[^>]+class=[\"'][^\"']*\bcop_analysis\b", re.IGNORECASE)
+
+# 테이블 열 제목 ("2025.09", "2025.12(E)")
+PERIOD_PATTERN = re.compile(r"(\d{4})\.(\d{2})")
+
+
+def parse_value(text: str) -> int:
+    """
+    금액 문자열 파싱 (억원 단위 -> 원 단위)
+
+    Args:
+        text: "79,000" (억원)
+
+    Returns:
+        79000000000000 (원)
+    """
+    try:
+        # 쉼표 제거, 숫자만 추출
+        cleaned = re.sub(r"[^\d\-.]", "", text)
+        if not cleaned or cleaned == "-":
+            return 0
+
+        # 억원 단위를 원 단위로 변환
+        value = float(cleaned) * 100000000
+        return int(value)
+    except ValueError:
+        return 0
+
+
+def extract_cop_analysis_table(html: str) -> Optional[str]:
+    """
+    페이지에서 재무정보 테이블 HTML만 잘라냄 (전체 페이지 파싱 없이 문자열 검색)
+
+    Returns:
+        "<table ...>...</table>", 없으면 None
+    """
+    match = COP_ANALYSIS_PATTERN.search(html)
+    if not match:
+        return None
+    start = html.find("<table", match.end())
+    if start < 0:
+        return None
+    end = html.find("</table>", start)
+    if end < 0:
+        return None
+    return html[start:end + len("</table>")]
+
+
+def to_quarter(period_text: str) -> Optional[str]:
+    """열 제목 -> 분기 ("2025.09" -> "2025-Q3")"""
+    match = PERIOD_PATTERN.search(period_text)
+    if not match:
+        return None
+    year, month = int(match.group(1)), int(match.group(2))
+    return f"{year}-Q{(month + 2) // 3}"
+
+
+def _cells_lxml(table) -> List[List[Tuple[str, str, int]]]:
+    """행별 셀 [(태그, 텍스트, colspan), ...] (lxml)"""
+    rows = []
+    for tr in table.iter("tr"):
+        rows.append([
+            (cell.tag, "".join(text.strip() for text in cell.itertext()), int(cell.get("colspan") or 1))
+            for cell in tr
+            if cell.tag in ("th", "td")
+        ])
+    return rows
+
+
+def _cells_bs4(table) -> List[List[Tuple[str, str, int]]]:
+    """행별 셀 [(태그, 텍스트, colspan), ...] (BeautifulSoup)"""
+    rows = []
+    for tr in table.find_all("tr"):
+        rows.append([
+            (cell.name, cell.get_text(strip=True), int(cell.get("colspan") or 1))
+            for cell in tr.find_all(["th", "td"], recursive=False)
+        ])
+    return rows
+
+
+def _table_cells(table_html: str) -> List[List[Tuple[str, str, int]]]:
+    """테이블 HTML 조각 -> 행별 셀 (lxml 설치 시 lxml)"""
+    if HAS_LXML:
+        return _cells_lxml(lxml.html.fragment_fromstring(table_html))
+    return _cells_bs4(BeautifulSoup(table_html, "html.parser"))
+
+
+def _read_table(rows: List[List[Tuple[str, str, int]]]) -> Optional[Dict]:
+    """
+    재무정보 테이블 해석
+
+    Returns:
+        {
+            "period": "2025-Q3",           # 최근 실적 분기 (추정치 제외)
+            "revenue": ..., "operating_profit": ...,   # 값이 없으면 None
+            "history": {                   # 테이블의 전체 실적 열 (추정치 제외)
+                "quarterly": {"2025-Q3": {"revenue": ..., "operating_profit": ...}, ...},
+                "annual": {"2024": {"revenue": ..., "operating_profit": ...}, ...}
+            },
+            "fingerprint": "..."           # 테이블 전체 내용 해시 (변경 감지용)
+        }
+        매출액/영업이익이 없으면 None
+    """
+    # 열 제목: 연간 실적 N열 + 분기 실적 M열
+    annual_count = 0
+    periods = []
+    for row in rows:
+        for tag, text, colspan in row:
+            if tag == "th" and "연간" in text:
+                annual_count = colspan
+        row_periods = [text for tag, text, _ in row if tag == "th" and PERIOD_PATTERN.search(text)]
+        if len(row_periods) > len(periods):
+            periods = row_periods
+
+    # 항목별 값 (정확히 일치하는 행만 사용 - "영업이익률" 행 제외)
+    values: Dict[str, List[str]] = {}
+    for row in rows:
+        if not row or row[0][0] != "th":
+            continue
+        tds = [text for tag, text, _ in row if tag == "td"]
+        if tds:
+            values[row[0][1]] = tds
+
+    revenue_row = values.get("매출액")
+    profit_row = values.get("영업이익")
+    if revenue_row is None and profit_row is None:
+        return None
+
+    # 행이 없거나 빈 칸("", "-")이면 None (은행/증권 등 매출액 행이 비어 있는 종목 - 0 과 구분)
+    def value_at(row, i):
+        return parse_value(row[i]) if row and i < len(row) and re.search(r"\d", row[i]) else None
+
+    def has_value(i):
+        return any(row and i < len(row) and re.search(r"\d", row[i]) for row in (revenue_row, profit_row))
+
+    # 최근 실적 열: 분기 열 중 추정치(E)가 아니고 값이 있는 마지막 열 (열 제목이 없으면 첫 열)
+    column = None if periods else 0
+    for i in range(len(periods) - 1, annual_count - 1, -1):
+        if "(E)" in periods[i]:
+            continue
+        if has_value(i):
+            column = i
+            break
+    if column is None:
+        return None
+
+    # 전체 실적 열 (추정치 제외): 분기 "2025-Q3", 연간 "2024"
+    history = {"quarterly": {}, "annual": {}}
+    for i, period_text in enumerate(periods):
+        if "(E)" in period_text or not has_value(i):
+            continue
+        if i < annual_count:
+            key, period = "annual", PERIOD_PATTERN.search(period_text).group(1)
+        else:
+            key, period = "quarterly", to_quarter(period_text)
+        history[key][period] = {"revenue": value_at(revenue_row, i), "operating_profit": value_at(profit_row, i)}
+
+    content = json.dumps([periods, sorted(values.items())], ensure_ascii=False)
+    return {
+        "period": to_quarter(periods[column]) if column < len(periods) else None,
+        "revenue": value_at(revenue_row, column),
+        "operating_profit": value_at(profit_row, column),
+        "history": history,
+        "fingerprint": hashlib.sha1(content.encode("utf-8")).hexdigest()[:16],
+    }
+
+
+def parse_financial_html(html: str) -> Optional[Dict]:
+    """
+    네이버 금융 메인 페이지에서 재무 데이터 추출 (프로세스 풀에서 실행 가능)
+    - 재무정보 테이블만 잘라 파싱, 잘라내기 실패 시 전체 페이지 파싱
+
+    Returns:
+        {"period": "2025-Q3", "revenue": ..., "operating_profit": ..., "history": {...}, "fingerprint": "..."},
+        재무정보 없으면 None
+    """
+    table_html = extract_cop_analysis_table(html)
+    if table_html is None:
+        return parse_financial_html_full(html)
+    return _read_table(_table_cells(table_html))
+
+
+def parse_financial_html_full(html: str) -> Optional[Dict]:
+    """전체 페이지 파싱 (BeautifulSoup html.parser, 기존 방식)"""
+    soup = BeautifulSoup(html, "html.parser")
+
+    # 재무정보 테이블 찾기
+    # 네이버 금융 메인 페이지의 주요 재무정보 영역
+    table = soup.select_one("div.section.cop_analysis table")
+
+    if not table:
+        return None
+
+    return _read_table(_cells_bs4(table))
+
+
+class HostThrottle:
+    """호스트별 최소 요청 간격 (스레드 안전)"""
+
+    def __init__(self, interval: float):
+        """
+        Args:
+            interval: 같은 호스트 요청 시작 간 최소 간격 (초)
+        """
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._next_time: Dict[str, float] = {}
+
+    def wait(self, host: str) -> float:
+        """
+        요청 차례까지 대기
+
+        Returns:
+            대기 시간 (초)
+        """
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_time.get(host, now))
+            self._next_time[host] = start + self.interval
+        delay = start - now
+        if delay > 0:
+            time.sleep(delay)
+        return delay
 
 
 class FinancialCrawler:
     """재무 데이터 크롤러 (네이버 금융)"""
 
-    # 요청 간 대기 시간 (초)
-    REQUEST_INTERVAL = 0.3
+    # 같은 호스트 요청 간 최소 간격 (초)
+    REQUEST_INTERVAL = 0.2
+
+    # 동시 요청 수
+    MAX_WORKERS = 4
+
+    # 파싱 프로세스 수 (0: 요청 스레드에서 파싱 - 테이블만 파싱하므로 전달 비용이 더 큼)
+    PARSE_WORKERS = 0
+
+    # 재시도 (횟수, 기본 대기 초 - 2배씩 증가)
+    MAX_RETRIES = 3
+    RETRY_BACKOFF = 0.5
+    RETRY_STATUS = (429, 500, 502, 503, 504)
+
+    # 최근 실적 분기가 최신이어도 이 기간(일)이 지나면 재조회 (정정 공시 반영)
+    STALE_DAYS = 90
 
     # 네이버 금융 재무정보 URL
     BASE_URL = "https://finance.naver.com/item/main.naver?code={code}"
@@ -23,6 +281,81 @@ class FinancialCrawler:
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
     }
 
+    def __init__(
+        self,
+        base_url: str = None,
+        max_workers: int = None,
+        parse_workers: int = None,
+        request_interval: float = None,
+        progress: Callable[[int, int], None] = None
+    ):
+        """
+        Args:
+            base_url: 페이지 URL 형식 ("...?code={code}"), 로컬 대역 서버 테스트용
+            max_workers: 동시 요청 수
+            parse_workers: 파싱 프로세스 수 (0: 요청 스레드에서 파싱)
+            request_interval: 같은 호스트 요청 간 최소 간격 (초)
+            progress: 진행 알림 함수 (완료 종목 수, 전체 종목 수), 서버 작업 진행률용
+        """
+        self.progress = progress
+        self.base_url = base_url or self.BASE_URL
+        self.max_workers = max_workers or self.MAX_WORKERS
+        self.parse_workers = self.PARSE_WORKERS if parse_workers is None else parse_workers
+        self.throttle = HostThrottle(self.REQUEST_INTERVAL if request_interval is None else request_interval)
+
+        # 연결 재사용 (동시 요청 수만큼 연결 유지)
+        self.session = requests.Session()
+        self.session.headers.update(self.HEADERS)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self.request_count = 0
+        self.retry_count = 0
+        self._count_lock = threading.Lock()
+
+    def fetch_page(self, stock_code: str) -> Optional[str]:
+        """
+        종목 페이지 조회 (호스트별 간격 유지, 일시 오류는 재시도)
+
+        Args:
+            stock_code: 종목코드 (6자리)
+
+        Returns:
+            HTML, 실패 시 None
+        """
+        url = self.base_url.format(code=stock_code)
+        host = urlsplit(url).netloc
+
+        for attempt in range(self.MAX_RETRIES + 1):
+            if attempt > 0:
+                with self._count_lock:
+                    self.retry_count += 1
+                time.sleep(self.RETRY_BACKOFF * (2 ** (attempt - 1)) * (1 + random.random()))
+
+            self.throttle.wait(host)
+            with self._count_lock:
+                self.request_count += 1
+            try:
+                response = self.session.get(url, timeout=10)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+                continue
+
+            if response.status_code in self.RETRY_STATUS:
+                error = f"HTTP {response.status_code}"
+                continue
+
+            try:
+                response.raise_for_status()
+            except requests.HTTPError as e:
+                print(f"종목 {stock_code} 재무 조회 에러: {e}")
+                return None
+            return response.text
+
+        print(f"종목 {stock_code} 재무 조회 에러 (재시도 {self.MAX_RETRIES}회 초과): {error}")
+        return None
+
     def get_financial_data(self, stock_code: str) -> Optional[Dict]:
         """
         종목 재무 데이터 조회
@@ -32,112 +365,136 @@ class FinancialCrawler:
 
         Returns:
             {
+                "period": "2024-Q3",               # 최근 실적 분기
                 "revenue": 79000000000000,        # 매출액 (원)
-                "operating_profit": 9180000000000  # 영업이익 (원)
+                "operating_profit": 9180000000000, # 영업이익 (원)
+                "history": {"quarterly": {...}, "annual": {...}},  # 전체 실적 열
+                "fingerprint": "3f2a..."          # 재무정보 테이블 해시
             }
         """
-        url = self.BASE_URL.format(code=stock_code)
+        html = self.fetch_page(stock_code)
+        if html is None:
+            return None
 
         try:
-            response = requests.get(url, headers=self.HEADERS, timeout=10)
-            response.raise_for_status()
-
-            soup = BeautifulSoup(response.text, "html.parser")
-
-            # 재무정보 테이블 찾기
-            # 네이버 금융 메인 페이지의 주요 재무정보 영역
-            table = soup.select_one("div.section.cop_analysis table")
-
-            if not table:
-                return None
+            return parse_financial_html(html)
+        except Exception as e:
+            print(f"종목 {stock_code} 재무 파싱 에러: {e}")
+            return None
 
-            # 매출액, 영업이익 행 찾기
-            revenue = None
-            operating_profit = None
+    def _fetch_and_parse(self, stock_code: str, parse_pool: Optional[ProcessPoolExecutor]) -> Optional[Dict]:
+        """요청 스레드 작업: 페이지 조회 후 파싱 (프로세스 풀이 있으면 위임)"""
+        html = self.fetch_page(stock_code)
+        if html is None:
+            return None
 
-            rows = table.select("tr")
-            for row in rows:
-                th = row.select_one("th")
-                if not th:
-                    continue
+        try:
+            if parse_pool is None:
+                return parse_financial_html(html)
+            return parse_pool.submit(parse_financial_html, html).result()
+        except Exception as e:
+            print(f"종목 {stock_code} 재무 파싱 에러: {e}")
+            return None
 
-                label = th.get_text(strip=True)
-                tds = row.select("td")
+    def crawl_stocks(self, stock_codes: List[str]) -> Dict[str, Dict]:
+        """
+        여러 종목 재무 데이터 크롤링 (동시 요청)
 
-                if not tds:
-                    continue
+        Args:
+            stock_codes: 종목코드 리스트
 
-                # 최근 분기 데이터 (첫 번째 td)
-                value_text = tds[0].get_text(strip=True)
-                value = self._parse_value(value_text)
+        Returns:
+            {
+                "005930": {"period": ..., "revenue": ..., "operating_profit": ..., "fingerprint": ...},
+                ...
+            }
+        """
+        result = {}
+        total = len(stock_codes)
 
-                if "매출액" in label:
-                    revenue = value
-                elif "영업이익" in label:
-                    operating_profit = value
+        parse_pool = None
+        if self.parse_workers > 0 and total > 1:
+            parse_pool = ProcessPoolExecutor(max_workers=min(self.parse_workers, os.cpu_count() or 1))
 
-            if revenue is not None or operating_profit is not None:
-                return {
-                    "revenue": revenue or 0,
-                    "operating_profit": operating_profit or 0
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as fetch_pool:
+                futures = {
+                    fetch_pool.submit(self._fetch_and_parse, code, parse_pool): code
+                    for code in stock_codes
                 }
+                for i, future in enumerate(as_completed(futures)):
+                    if (i + 1) % 100 == 0:
+                        print(f"[{i + 1}/{total}] 재무 데이터 조회 중...")
 
-            return None
+                    data = future.result()
+                    if data:
+                        result[futures[future]] = data
+                    if self.progress:
+                        self.progress(i + 1, total)
+        finally:
+            if parse_pool is not None:
+                parse_pool.shutdown()
 
-        except Exception as e:
-            print(f"종목 {stock_code} 재무 조회 에러: {e}")
-            return None
+        print(f"재무 데이터 크롤링 완료: {len(result)}개 종목 (요청 {self.request_count}회, 재시도 {self.retry_count}회)")
+
+        # 입력 순서 유지
+        return {code: result[code] for code in stock_codes if code in result}
 
-    def _parse_value(self, text: str) -> int:
+    def needs_refresh(self, fingerprint: Optional[Dict], expected_quarter: str, today: str) -> bool:
         """
-        금액 문자열 파싱 (억원 단위 -> 원 단위)
+        재조회 필요 여부
 
         Args:
-            text: "79,000" (억원)
+            fingerprint: 저장된 지문 {"period": "2025-Q3", "hash": "...", "checked": "2025-11-20"}
+            expected_quarter: 발표되었어야 할 분기 (get_current_quarter)
+            today: "2025-11-20"
 
         Returns:
-            79000000000000 (원)
+            지문 없음 / 최근 실적 분기가 지남 / 마지막 확인 후 STALE_DAYS 경과 시 True
         """
-        try:
-            # 쉼표 제거, 숫자만 추출
-            cleaned = re.sub(r"[^\d\-.]", "", text)
-            if not cleaned or cleaned == "-":
-                return 0
-
-            # 억원 단위를 원 단위로 변환
-            value = float(cleaned) * 100000000
-            return int(value)
-        except ValueError:
-            return 0
-
-    def crawl_stocks(self, stock_codes: List[str]) -> Dict[str, Dict]:
+        if not fingerprint or not fingerprint.get("period"):
+            return True
+        if fingerprint["period"] < expected_quarter:
+            return True
+        checked = fingerprint.get("checked")
+        if not checked:
+            return True
+        age = datetime.strptime(today, "%Y-%m-%d") - datetime.strptime(checked, "%Y-%m-%d")
+        return age.days >= self.STALE_DAYS
+
+    def refresh_stocks(self, stock_codes: List[str], fingerprints: Dict[str, Dict]) -> Dict[str, Dict]:
         """
-        여러 종목 재무 데이터 크롤링
+        변경 분 재무 데이터 갱신
+        - 재조회 필요 종목만 요청 (needs_refresh)
+        - 조회 결과의 지문이 저장된 지문과 같으면 확인일만 갱신
 
         Args:
             stock_codes: 종목코드 리스트
+            fingerprints: 저장된 지문 {"005930": {"period", "hash", "checked"}} (확인일 갱신됨)
 
         Returns:
-            {
-                "005930": {"revenue": ..., "operating_profit": ...},
-                ...
-            }
+            내용이 바뀐 종목의 재무 데이터 (crawl_stocks 형식)
         """
-        result = {}
-        total = len(stock_codes)
+        today = datetime.now().strftime("%Y-%m-%d")
+        expected_quarter = self.get_current_quarter()
 
-        for i, code in enumerate(stock_codes):
-            if (i + 1) % 100 == 0:
-                print(f"[{i + 1}/{total}] 재무 데이터 조회 중...")
+        stale = [code for code in stock_codes if self.needs_refresh(fingerprints.get(code), expected_quarter, today)]
+        print(f"재조회 대상: {len(stale)}/{len(stock_codes)}개 종목 (기준 분기 {expected_quarter})")
+        if not stale:
+            return {}
 
-            data = self.get_financial_data(code)
-            if data:
-                result[code] = data
+        fetched = self.crawl_stocks(stale)
 
-            time.sleep(self.REQUEST_INTERVAL)
+        changed = {}
+        for code, data in fetched.items():
+            old = fingerprints.get(code)
+            if old and old.get("hash") == data.get("fingerprint"):
+                old["checked"] = today
+            else:
+                changed[code] = data
 
-        print(f"재무 데이터 크롤링 완료: {len(result)}개 종목")
-        return result
+        print(f"변경된 종목: {len(changed)}개 (변경 없음 {len(fetched) - len(changed)}개)")
+        return changed
 
     def get_current_quarter(self) -> str:
         """현재 분기 반환 (예: "2024-Q3")"""
@@ -159,8 +516,8 @@ if __name__ == "__main__":
     data = crawler.get_financial_data("005930")
     if data:
         print("\n삼성전자 재무 데이터:")
-        print(f"  매출액: {data['revenue']:,}원")
-        print(f"  영업이익: {data['operating_profit']:,}원")
+        for label, key in (("매출액", "revenue"), ("영업이익", "operating_profit")):
+            print(f"  {label}: {data[key]:,}원" if data[key] is not None else f"  {label}: 없음")
     else:
         print("데이터 조회 실패")
 
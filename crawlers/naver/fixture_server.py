@@ -0,0 +1,361 @@
+"""
+네이버 금융 로컬 대역 서버 (테스트/벤치마크용)
+- GET /item/main.naver?code=005930 -> 기록된 페이지 반환 (EUC-KR)
+- 페이지: pages_dir/{code}.html (실제 저장 페이지) 또는 재무 데이터로 생성한 페이지
+- 생성 페이지: 최근 실적 분기 열 = 재무 데이터 값, 이전 열은 분기마다 다른 값, 이후 열(미발표)은 빈 칸
+  (값이 null 인 항목도 빈 칸 -> 빈 칸 처리 / 최근 열 선택 / 전체 실적 파싱 확인용)
+- 응답 지연, 일시 오류(503) 비율 설정 가능 (재시도 확인용)
+
+사용법:
+    python -m naver.fixture_server serve                      # web/data/financial.json 으로 페이지 생성
+    python -m naver.fixture_server serve --pages pages/       # 저장된 페이지 사용
+    python -m naver.fixture_server record pages/ 005930 000660
+
+    FinancialCrawler(base_url="http://127.0.0.1:8800/item/main.naver?code={code}")
+"""
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+# 페이지 인코딩 (네이버 금융과 동일)
+ENCODING = "euc-kr"
+
+# 기본 재무 데이터 (web/data/financial.json)
+DEFAULT_FINANCIAL_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "web", "data", "financial.json"
+)
+
+# 재무정보 테이블 열 (최근 연간 실적 4 + 최근 분기 실적 6)
+PERIODS = [
+    "2022.12", "2023.12", "2024.12", "2025.12(E)",
+    "2024.12", "2025.03", "2025.06", "2025.09", "2025.12", "2026.03(E)",
+]
+
+# 연간 실적 열 수 (PERIODS 앞부분)
+ANNUAL_COLUMNS = 4
+
+# 최근 실적 분기에서 한 분기 멀어질 때마다 줄어드는 값 비율 (열마다 다른 값)
+QUARTER_STEP = 0.03
+
+# 추정치(E) 열 = 최근 실적 × 비율
+ESTIMATE_RATIO = 1.05
+
+# 재무정보 외 영역 반복 수 (실제 페이지 크기 약 200KB 에 맞춤)
+FILLER_SECTIONS = 60
+
+
+def _to_eok(value: Optional[int]) -> str:
+    """원 -> 억원 표기 ("79,000"), 값이 없으면 빈 칸"""
+    if value is None:
+        return ""
+    return f"{round(value / 100000000):,}"
+
+
+def _quarter_index(year: int, quarter: int) -> int:
+    return year * 4 + quarter - 1
+
+
+def _column_values(data: Dict) -> List[Dict]:
+    """
+    PERIODS 열별 {"revenue", "operating_profit"} (없는 값 None)
+
+    - 재무 데이터 history 에 있는 열은 그 값 사용
+    - 최근 실적 분기(data["period"], 기본값 마지막 실적 분기 열) 열 = data 값
+    - 이전 분기 열은 한 분기마다 QUARTER_STEP 씩 작은 값, 연간 열은 분기 값 × 4
+    - 최근 실적 분기 이후 열은 빈 칸 (미발표), 추정치(E) 열은 최근 값 × ESTIMATE_RATIO
+    """
+    history = data.get("history") or {}
+    period = data.get("period")
+    if period:
+        latest = _quarter_index(int(period[:4]), int(period[-1]))
+    else:
+        last = [p for p in PERIODS[ANNUAL_COLUMNS:] if "(E)" not in p][-1]
+        latest = _quarter_index(int(last[:4]), (int(last[5:7]) + 2) // 3)
+
+    def scaled(ratio: float) -> Dict:
+        return {
+            field: None if data.get(field) is None else int(data[field] * ratio)
+            for field in ("revenue", "operating_profit")
+        }
+
+    columns = []
+    for i, period_text in enumerate(PERIODS):
+        year, month = int(period_text[:4]), int(period_text[5:7])
+        index = _quarter_index(year, (month + 2) // 3)
+        annual = i < ANNUAL_COLUMNS
+        recorded = history.get("annual" if annual else "quarterly", {}).get(
+            str(year) if annual else f"{year}-Q{(month + 2) // 3}"
+        )
+
+        if recorded is not None:
+            values = {field: recorded.get(field) for field in ("revenue", "operating_profit")}
+        elif "(E)" in period_text:
+            values = scaled(ESTIMATE_RATIO * (4 if annual else 1))
+        elif index > latest:
+            values = {"revenue": None, "operating_profit": None}
+        else:
+            values = scaled((1 - QUARTER_STEP * (latest - index)) * (4 if annual else 1))
+        columns.append(values)
+    return columns
+
+
+def _filler_section(index: int) -> str:
+    """재무정보 외 영역 (시세/동종업종/뉴스 등 흉내)"""
+    rows = "".join(
+        f'<tr><th scope="row">항목{index}-{i}</th>'
+        f'<td class="num">{(index * 37 + i * 11) % 9973:,}</td>'
+        f'<td class="num"><em class="up">+{(index + i) % 30}.{i % 10}%</em></td>'
+        f'<td><a href="/item/main.naver?code={index:06d}">관련 종목 {i}</a></td></tr>'
+        for i in range(12)
+    )
+    return (
+        f'<div class="section trade_compare" id="section{index}">'
+        f'<h4 class="h_sub sub_tit{index % 7}"><em>참고 영역 {index}</em></h4>'
+        f'<table class="tb_type1"><tbody>{rows}</tbody></table>'
+        f'<script type="text/javascript">var chartData{index} = [{",".join(str(i * index % 997) for i in range(80))}];</script>'
+        f'</div>'
+    )
+
+
+def render_page(code: str, name: str, data: Dict) -> str:
+    """
+    네이버 금융 메인 페이지 형식으로 재무 데이터 렌더링
+
+    Args:
+        code: 종목코드
+        name: 종목명
+        data: {"period": "2025-Q3", "revenue": 원, "operating_profit": 원, "history": {...}}
+              (period/history 생략 가능, 값 None = 빈 칸)
+    """
+    columns = _column_values(data)
+
+    def margin(values: Dict) -> str:
+        if not values["revenue"] or values["operating_profit"] is None:
+            return "-"
+        return f"{values['operating_profit'] / values['revenue'] * 100:.2f}"
+
+    def metric_row(label: str, cells_text: List[str]) -> str:
+        cells = "".join(
+            f'<td class="{"t_line cell_strong" if i == 0 else ""}">{text}</td>' for i, text in enumerate(cells_text)
+        )
+        return f'<tr><th scope="row" class="h_th2 th_cop_anal"><strong>{label}</strong></th>{cells}</tr>'
+
+    header = "".join(f'<th scope="col" class="">{period}</th>' for period in PERIODS)
+    cop_analysis = (
+        '<div class="section cop_analysis"><div class="sub_section">'
+        '<table class="tb_type1 tb_num tb_type1_ifrs" summary="기업실적분석에 관한표이며 주요재무정보를 제공합니다.">'
+        '<caption>기업실적분석 테이블</caption>'
+        '<thead><tr><th scope="col" rowspan="2">주요재무정보</th>'
+        '<th scope="col" colspan="4">최근 연간 실적</th><th scope="col" colspan="6">최근 분기 실적</th></tr>'
+        f'<tr>{header}</tr></thead><tbody>'
+        + metric_row("매출액", [_to_eok(values["revenue"]) for values in columns])
+        + metric_row("영업이익", [_to_eok(values["operating_profit"]) for values in columns])
+        + metric_row("영업이익률", [margin(values) for values in columns])
+        + '</tbody></table></div></div>'
+    )
+
+    before = "".join(_filler_section(i) for i in range(FILLER_SECTIONS // 2))
+    after = "".join(_filler_section(i) for i in range(FILLER_SECTIONS // 2, FILLER_SECTIONS))
+    return (
+        '<!DOCTYPE html><html lang="ko"><head>'
+        f'<meta http-equiv="Content-Type" content="text/html; charset={ENCODING}">'
+        f'<title>{name} : 네이버 금융</title></head><body>'
+        f'<div id="wrap"><div id="middle"><div class="h_company"><h2>{name}</h2><span class="code">{code}</span></div>'
+        f'{before}{cop_analysis}{after}'
+        '</div></div></body></html>'
+    )
+
+
+class FixtureServer:
+    """네이버 금융 로컬 대역 서버"""
+
+    PAGE_PATH = "/item/main.naver"
+
+    def __init__(
+        self,
+        pages_dir: str = None,
+        financial: Dict[str, Dict] = None,
+        names: Dict[str, str] = None,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        port: int = 0,
+        seed: int = 0
+    ):
+        """
+        Args:
+            pages_dir: 저장된 페이지 디렉토리 ({code}.html, EUC-KR)
+            financial: 페이지 생성용 재무 데이터 {"005930": {"period", "revenue", "operating_profit"}}
+            names: 종목명 {"005930": "삼성전자"}
+            latency: 응답 지연 (초)
+            error_rate: 503 응답 비율 (0~1)
+            port: 포트 (0: 자동 할당)
+        """
+        self.pages_dir = pages_dir
+        self.financial = financial or {}
+        self.names = names or {}
+        self.latency = latency
+        self.error_rate = error_rate
+        self.port = port
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+        self.request_count = 0
+        self.error_count = 0
+
+    @property
+    def base_url(self) -> str:
+        """FinancialCrawler base_url 형식"""
+        return f"http://127.0.0.1:{self.port}{self.PAGE_PATH}?code={{code}}"
+
+    def get_page(self, code: str) -> bytes:
+        """종목 페이지 (없으면 None)"""
+        if self.pages_dir:
+            filepath = os.path.join(self.pages_dir, f"{code}.html")
+            if os.path.exists(filepath):
+                with open(filepath, "rb") as f:
+                    return f.read()
+
+        if code in self.financial:
+            html = render_page(code, self.names.get(code, code), self.financial[code])
+            return html.encode(ENCODING, errors="xmlcharrefreplace")
+        return None
+
+    def _should_fail(self) -> bool:
+        with self._lock:
+            self.request_count += 1
+            if self.error_rate > 0 and self._random.random() < self.error_rate:
+                self.error_count += 1
+                return True
+        return False
+
+    def start(self) -> str:
+        """
+        백그라운드 스레드에서 서버 시작
+
+        Returns:
+            base_url
+        """
+        fixture = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # 연결 재사용 (keep-alive)
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                code = parse_qs(url.query).get("code", [""])[0]
+
+                if fixture.latency > 0:
+                    time.sleep(fixture.latency)
+
+                if fixture._should_fail():
+                    self._send(503, b"Service Unavailable")
+                    return
+
+                page = fixture.get_page(code) if url.path == fixture.PAGE_PATH else None
+                if page is None:
+                    self._send(404, b"Not Found")
+                    return
+                self._send(200, page)
+
+            def _send(self, status: int, body: bytes):
+                self.send_response(status)
+                self.send_header("Content-Type", f"text/html;charset={ENCODING.upper()}")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        """서버 종료"""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def record_pages(stock_codes: List[str], pages_dir: str) -> int:
+    """
+    실제 네이버 금융 페이지 저장 (대역 서버용)
+
+    Returns:
+        저장한 페이지 수
+    """
+    from .financial_crawler import FinancialCrawler
+
+    os.makedirs(pages_dir, exist_ok=True)
+    crawler = FinancialCrawler()
+    saved = 0
+    for code in stock_codes:
+        html = crawler.fetch_page(code)
+        if html is None:
+            continue
+        with open(os.path.join(pages_dir, f"{code}.html"), "wb") as f:
+            f.write(html.encode(ENCODING, errors="xmlcharrefreplace"))
+        saved += 1
+    print(f"페이지 {saved}개 저장: {pages_dir}")
+    return saved
+
+
+def _load_default_financial() -> Dict[str, Dict]:
+    if not os.path.exists(DEFAULT_FINANCIAL_PATH):
+        return {}
+    with open(DEFAULT_FINANCIAL_PATH, "r", encoding="utf-8") as f:
+        return json.load(f).get("data", {})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="네이버 금융 로컬 대역 서버")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    serve = sub.add_parser("serve", help="대역 서버 실행")
+    serve.add_argument("--pages", help="저장된 페이지 디렉토리")
+    serve.add_argument("--port", type=int, default=8800)
+    serve.add_argument("--latency", type=float, default=0.0)
+    serve.add_argument("--error-rate", type=float, default=0.0)
+
+    record = sub.add_parser("record", help="실제 페이지 저장")
+    record.add_argument("pages")
+    record.add_argument("codes", nargs="+")
+
+    args = parser.parse_args()
+
+    if args.cmd == "record":
+        record_pages(args.codes, args.pages)
+    else:
+        server = FixtureServer(
+            pages_dir=args.pages,
+            financial=_load_default_financial(),
+            latency=args.latency,
+            error_rate=args.error_rate,
+            port=args.port
+        )
+        print(f"대역 서버 시작: {server.start()}")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            server.stop()
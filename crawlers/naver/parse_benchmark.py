@@ -0,0 +1,108 @@
+"""
+재무 페이지 파싱 마이크로 벤치마크
+- 저장된 페이지(naver/fixture_server.py record)로 파싱 방식별 시간 비교
+  full: 전체 페이지 BeautifulSoup html.parser (기존 방식)
+  fragment-bs4: 재무정보 테이블만 잘라 BeautifulSoup
+  fragment-lxml: 재무정보 테이블만 잘라 lxml (설치된 경우)
+- 모든 방식의 결과가 같은지 함께 확인
+
+사용법:
+    python -m naver.parse_benchmark                  # web/data/financial.json 으로 페이지 생성 후 측정
+    python -m naver.parse_benchmark --pages pages/   # 저장된 페이지로 측정
+"""
+import argparse
+import glob
+import json
+import os
+import time
+from typing import Callable, Dict, List, Tuple
+
+from . import financial_crawler
+from .financial_crawler import parse_financial_html, parse_financial_html_full
+from .fixture_server import ENCODING, FixtureServer, _load_default_financial
+
+
+def load_pages(pages_dir: str = None, limit: int = 200) -> List[Tuple[str, str]]:
+    """
+    측정용 페이지 로드
+
+    Returns:
+        [(종목코드, HTML), ...]
+    """
+    if pages_dir:
+        pages = []
+        for filepath in sorted(glob.glob(os.path.join(pages_dir, "*.html")))[:limit]:
+            with open(filepath, "rb") as f:
+                pages.append((os.path.basename(filepath)[:-5], f.read().decode(ENCODING, errors="replace")))
+        return pages
+
+    server = FixtureServer(financial=_load_default_financial())
+    codes = list(server.financial)[:limit]
+    return [(code, server.get_page(code).decode(ENCODING)) for code in codes]
+
+
+def _measure(parse: Callable[[str], Dict], pages: List[Tuple[str, str]], repeat: int) -> Tuple[float, Dict]:
+    """페이지당 평균 파싱 시간 (가장 빠른 회차 기준)"""
+    best = None
+    results = {}
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = {code: parse(html) for code, html in pages}
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / len(pages), results
+
+
+def run(pages_dir: str = None, limit: int = 200, repeat: int = 3) -> Dict:
+    """
+    방식별 측정
+
+    Returns:
+        {"pages": N, "avg_page_bytes": ..., "methods": {"full": {"ms_per_page": ...}, ...}}
+    """
+    pages = load_pages(pages_dir, limit)
+    if not pages:
+        raise ValueError("측정할 페이지 없음")
+
+    methods = {"full": parse_financial_html_full}
+
+    has_lxml = financial_crawler.HAS_LXML
+
+    def fragment_bs4(html):
+        financial_crawler.HAS_LXML = False
+        try:
+            return parse_financial_html(html)
+        finally:
+            financial_crawler.HAS_LXML = has_lxml
+
+    methods["fragment-bs4"] = fragment_bs4
+    if has_lxml:
+        methods["fragment-lxml"] = parse_financial_html
+
+    report = {
+        "pages": len(pages),
+        "avg_page_bytes": sum(len(html.encode(ENCODING, errors="replace")) for _, html in pages) // len(pages),
+        "methods": {},
+    }
+
+    baseline = None
+    for name, parse in methods.items():
+        seconds, results = _measure(parse, pages, repeat)
+        if baseline is None:
+            baseline = (seconds, results)
+        report["methods"][name] = {
+            "ms_per_page": round(seconds * 1000, 3),
+            "speedup": round(baseline[0] / seconds, 1),
+            "same_result": results == baseline[1],
+        }
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="재무 페이지 파싱 마이크로 벤치마크")
+    parser.add_argument("--pages", help="저장된 페이지 디렉토리 ({code}.html)")
+    parser.add_argument("--limit", type=int, default=200, help="측정 페이지 수")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.pages, args.limit, args.repeat), ensure_ascii=False, indent=2))
@@ -0,0 +1,407 @@
+"""
+컬럼형 가격 저장소 (메모리 맵 바이너리)
+- meta.json: 날짜 인덱스 + 종목코드 인덱스
+- close.<세대>.bin / value.<세대>.bin: 고정폭 int64 행렬 (거래일 × 종목 슬롯)
+- 하루 추가 = 파일 끝에 한 행 기록 (월 파일 전체 재작성 없음)
+- 전체 재작성은 새 세대 파일에 기록 후 meta.json 교체로 커밋 (meta.json 이 유일한 커밋 지점)
+- 조회는 np.memmap 기반 zero-copy view 반환
+- 다른 프로세스가 meta.json 을 갱신하면 (mtime, 크기 변경) 기록 전에 다시 로드 (refresh)
+"""
+import bisect
+import glob
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from io_metrics import STORAGE_IO
+
+
+class PriceStore:
+    """컬럼형 가격 저장소"""
+
+    # 데이터 없는 칸 표시값
+    MISSING = -1
+
+    # 기본 종목 슬롯 수 (초과 시 2배로 재배치)
+    DEFAULT_CAPACITY = 4096
+
+    DTYPE = np.int64
+    FIELDS = ("close", "value")
+
+    def __init__(self, path: str):
+        self.path = path
+        self.meta_path = os.path.join(path, "meta.json")
+        self.capacity = self.DEFAULT_CAPACITY
+        self.generation = 0  # 데이터 파일 세대 (전체 재작성마다 증가)
+        self.codes: List[str] = []
+        self.dates: List[str] = []
+        self.code_index: Dict[str, int] = {}
+        self.date_index: Dict[str, int] = {}
+        self._meta_stat = None  # 마지막으로 로드/저장한 meta.json (mtime, 크기)
+        self._load_meta()
+
+    # ============================================
+    # 메타데이터 (날짜/종목 인덱스)
+    # ============================================
+    def _stat_meta(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.meta_path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _load_meta(self):
+        """meta.json 로드"""
+        self._meta_stat = self._stat_meta()
+        if self._meta_stat is None:
+            return
+        with open(self.meta_path, "rb") as f:
+            content = f.read()
+        STORAGE_IO.add_read(len(content))
+        meta = json.loads(content)
+        self.capacity = meta["capacity"]
+        self.generation = meta.get("generation", 0)
+        self.codes = meta["codes"]
+        self.dates = meta["dates"]
+        self.code_index = {code: i for i, code in enumerate(self.codes)}
+        self.date_index = {date: i for i, date in enumerate(self.dates)}
+
+    def _save_meta(self):
+        """
+        meta.json 저장 (임시 파일 + rename)
+        - 행 데이터를 먼저 기록하고 메타를 마지막에 갱신하므로
+          중간에 죽어도 메타에 없는 행은 무시됨
+        """
+        os.makedirs(self.path, exist_ok=True)
+        tmp_path = self.meta_path + ".tmp"
+        content = json.dumps({
+            "version": 1,
+            "generation": self.generation,
+            "capacity": self.capacity,
+            "codes": self.codes,
+            "dates": self.dates
+        }, ensure_ascii=False).encode("utf-8")
+        with open(tmp_path, "wb") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        STORAGE_IO.add_write(len(content))
+        os.replace(tmp_path, self.meta_path)
+        self._meta_stat = self._stat_meta()
+
+    def refresh(self) -> bool:
+        """
+        meta.json 이 다른 프로세스에서 갱신되었으면 다시 로드
+        - 오래 실행되는 서버가 이전 날짜/슬롯 수로 기록하여 다른 프로세스가 추가한 행을 덮어쓰지 않도록
+
+        Returns:
+            다시 로드 여부
+        """
+        if self._stat_meta() == self._meta_stat:
+            return False
+        self._load_meta()
+        return True
+
+    def exists(self) -> bool:
+        """저장소 생성 여부"""
+        return os.path.exists(self.meta_path)
+
+    def _field_path(self, field: str, generation: Optional[int] = None) -> str:
+        """
+        필드 데이터 파일 경로
+
+        Args:
+            generation: 세대, 기본값 meta.json 의 현재 세대 (0 = 세대 없는 이전 형식 close.bin)
+        """
+        if generation is None:
+            generation = self.generation
+        if generation == 0:
+            return os.path.join(self.path, f"{field}.bin")
+        return os.path.join(self.path, f"{field}.{generation}.bin")
+
+    def _remove_stale_generations(self):
+        """
+        현재 세대가 아닌 데이터 파일 삭제 (재작성 이전 세대, 중단된 재작성 잔여물)
+        - 다른 프로세스가 아직 열고 있으면 (Windows) 삭제 실패 -> 다음 재작성 때 다시 시도
+        """
+        current = {self._field_path(field) for field in self.FIELDS}
+        for field in self.FIELDS:
+            for filepath in glob.glob(os.path.join(self.path, f"{field}.*bin")):
+                if filepath in current:
+                    continue
+                try:
+                    os.remove(filepath)
+                except OSError:
+                    pass
+
+    @property
+    def row_bytes(self) -> int:
+        """한 거래일 행의 바이트 수"""
+        return self.capacity * np.dtype(self.DTYPE).itemsize
+
+    # ============================================
+    # 읽기
+    # ============================================
+    def _memmap(self, field: str, mode: str = "r") -> Optional[np.memmap]:
+        """(거래일 × 종목 슬롯) 메모리 맵"""
+        if not self.dates:
+            return None
+        return np.memmap(
+            self._field_path(field), dtype=self.DTYPE, mode=mode,
+            shape=(len(self.dates), self.capacity)
+        )
+
+    def load_range(
+        self,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None
+    ) -> Tuple[List[str], List[str], np.ndarray, np.ndarray]:
+        """
+        기간 조회 (zero-copy view)
+
+        Args:
+            start_date: 시작일 (포함), 기본값 처음
+            end_date: 종료일 (포함), 기본값 마지막
+
+        Returns:
+            (dates, codes, close, value)
+            - close/value: (거래일 × 종목) int64 view, 데이터 없으면 MISSING
+        """
+        lo = 0 if start_date is None else bisect.bisect_left(self.dates, start_date)
+        hi = len(self.dates) if end_date is None else bisect.bisect_right(self.dates, end_date)
+
+        n_codes = len(self.codes)
+        if lo >= hi:
+            empty = np.empty((0, n_codes), dtype=self.DTYPE)
+            return [], list(self.codes), empty, empty
+
+        close = self._memmap("close")[lo:hi, :n_codes]
+        value = self._memmap("value")[lo:hi, :n_codes]
+        STORAGE_IO.add_read(close.nbytes + value.nbytes)
+        return self.dates[lo:hi], list(self.codes), close, value
+
+    def presence(
+        self,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None
+    ) -> Tuple[List[str], List[str], np.ndarray]:
+        """
+        종목 × 거래일 데이터 존재 비트맵
+
+        Returns:
+            (dates, codes, present)
+            - present: (거래일 × 종목) bool, 종가가 기록된 칸만 True
+        """
+        dates, codes, close, _ = self.load_range(start_date, end_date)
+        return dates, codes, np.asarray(close != self.MISSING)
+
+    def to_nested(self, dates: List[str]) -> Dict[str, Dict]:
+        """
+        지정 날짜들을 월별 JSON 형식으로 변환
+
+        Returns:
+            {"005930": {"2025-01-20": {"close": 71000, "value": ...}, ...}, ...}
+        """
+        rows = sorted((self.date_index[d] for d in dates if d in self.date_index), reverse=True)
+        if not rows:
+            return {}
+
+        close = np.asarray(self._memmap("close")[rows, :len(self.codes)])
+        value = np.asarray(self._memmap("value")[rows, :len(self.codes)])
+        STORAGE_IO.add_read(close.nbytes + value.nbytes)
+        row_dates = [self.dates[r] for r in rows]
+
+        result = {}
+        for i, code in enumerate(self.codes):
+            present = np.flatnonzero(close[:, i] != self.MISSING)
+            if len(present) == 0:
+                continue
+            result[code] = {
+                row_dates[j]: {"close": int(close[j, i]), "value": int(value[j, i])}
+                for j in present
+            }
+        return result
+
+    def dates_in_month(self, year_month: str) -> List[str]:
+        """해당 월의 저장된 거래일 목록"""
+        return [d for d in self.dates if d.startswith(year_month)]
+
+    # ============================================
+    # 쓰기
+    # ============================================
+    def _ensure_codes(self, codes) -> bool:
+        """
+        신규 종목 슬롯 할당
+
+        Returns:
+            슬롯 재배치(파일 재작성) 필요 여부
+        """
+        for code in codes:
+            if code not in self.code_index:
+                self.code_index[code] = len(self.codes)
+                self.codes.append(code)
+
+        if len(self.codes) <= self.capacity:
+            return False
+
+        while self.capacity < len(self.codes):
+            self.capacity *= 2
+        return True
+
+    def write_prices(self, data: Dict[str, Dict]):
+        """
+        가격 데이터 병합 기록
+
+        - 기존 날짜: 해당 칸만 제자리 수정
+        - 마지막 날짜 이후: 행 추가 (append)
+        - 중간 날짜 삽입/슬롯 초과: 전체 재작성 (초기 수집 등 드문 경우)
+
+        Args:
+            data: {"005930": {"2025-01-20": {"close": 71000, "value": ...}, ...}, ...}
+        """
+        # 날짜별로 재구성: {date: {code: price}}
+        by_date: Dict[str, Dict[str, Dict]] = {}
+        for code, daily in data.items():
+            for date, price in daily.items():
+                by_date.setdefault(date, {})[code] = price
+
+        if not by_date:
+            return
+
+        self.refresh()
+        old_capacity = self.capacity
+        resized = self._ensure_codes(data.keys())
+
+        last_date = self.dates[-1] if self.dates else ""
+        new_dates = sorted(d for d in by_date if d not in self.date_index)
+        needs_insert = any(d < last_date for d in new_dates)
+
+        if resized or needs_insert:
+            self._rewrite(by_date, old_capacity)
+            return
+
+        # 1) 기존 날짜 제자리 수정
+        existing = [d for d in by_date if d in self.date_index]
+        if existing:
+            maps = {field: self._memmap(field, mode="r+") for field in self.FIELDS}
+            for date in existing:
+                self._fill_row(maps, self.date_index[date], by_date[date])
+                STORAGE_IO.add_write(len(by_date[date]) * len(self.FIELDS) * np.dtype(self.DTYPE).itemsize)
+            for mm in maps.values():
+                mm.flush()
+            del maps
+
+        # 2) 새 날짜 행 추가
+        if new_dates:
+            self._append_rows(new_dates, by_date)
+
+        self._save_meta()
+
+    def append_day(self, date: str, prices: Dict[str, Dict]):
+        """
+        하루치 가격 추가 (한 행 기록)
+
+        Args:
+            date: "2025-01-20"
+            prices: {"005930": {"close": 71000, "value": ...}, ...}
+        """
+        self.write_prices({code: {date: price} for code, price in prices.items()})
+
+    def _row_arrays(self, prices: Dict[str, Dict]) -> Dict[str, np.ndarray]:
+        """한 거래일 행 배열 생성"""
+        rows = {field: np.full(self.capacity, self.MISSING, dtype=self.DTYPE) for field in self.FIELDS}
+        for code, price in prices.items():
+            col = self.code_index[code]
+            for field in self.FIELDS:
+                rows[field][col] = int((price or {}).get(field) or 0)
+        return rows
+
+    def _fill_row(self, maps: Dict[str, np.memmap], row: int, prices: Dict[str, Dict]):
+        """기존 행의 칸 수정"""
+        for code, price in prices.items():
+            col = self.code_index[code]
+            for field in self.FIELDS:
+                maps[field][row, col] = int((price or {}).get(field) or 0)
+
+    def _append_rows(self, dates: List[str], by_date: Dict[str, Dict[str, Dict]]):
+        """메타에 기록된 마지막 행 뒤에 새 행 기록"""
+        os.makedirs(self.path, exist_ok=True)
+        offset = len(self.dates) * self.row_bytes
+
+        for field in self.FIELDS:
+            filepath = self._field_path(field)
+            mode = "r+b" if os.path.exists(filepath) else "wb"
+            with open(filepath, mode) as f:
+                # 메타에 없는 꼬리(중단된 쓰기 잔여물)는 덮어씀
+                f.seek(offset)
+                for date in dates:
+                    f.write(self._row_arrays(by_date[date])[field].tobytes())
+                f.truncate()
+                STORAGE_IO.add_write(len(dates) * self.row_bytes)
+                f.flush()
+                os.fsync(f.fileno())
+
+        for date in dates:
+            self.date_index[date] = len(self.dates)
+            self.dates.append(date)
+
+    def _rewrite(self, by_date: Dict[str, Dict[str, Dict]], old_capacity: int):
+        """
+        전체 재작성 (날짜 정렬 유지 + 슬롯 재배치)
+        - 모든 필드를 새 세대 파일에 기록/fsync 한 뒤 meta.json 을 교체해야 새 세대가 보임
+          (중간에 죽으면 이전 meta.json + 이전 세대 파일 그대로 -> 행/슬롯 배치가 어긋나지 않음)
+        """
+        old = {}
+        if self.dates:
+            for field in self.FIELDS:
+                mm = np.memmap(
+                    self._field_path(field), dtype=self.DTYPE, mode="r",
+                    shape=(len(self.dates), old_capacity)
+                )
+                old[field] = np.array(mm)
+                STORAGE_IO.add_read(old[field].nbytes)
+                del mm
+
+        all_dates = sorted(set(self.dates) | set(by_date))
+        new_index = {date: i for i, date in enumerate(all_dates)}
+
+        os.makedirs(self.path, exist_ok=True)
+        generation = self.generation + 1
+        for field in self.FIELDS:
+            matrix = np.full((len(all_dates), self.capacity), self.MISSING, dtype=self.DTYPE)
+            if self.dates:
+                rows = [new_index[d] for d in self.dates]
+                matrix[rows, :old_capacity] = old[field]
+            for date, prices in by_date.items():
+                row = matrix[new_index[date]]
+                for code, price in prices.items():
+                    row[self.code_index[code]] = int((price or {}).get(field) or 0)
+
+            with open(self._field_path(field, generation), "wb") as f:
+                f.write(matrix.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            STORAGE_IO.add_write(matrix.nbytes)
+
+        # 커밋: meta.json 교체 후 이전 세대 삭제
+        self.generation = generation
+        self.dates = all_dates
+        self.date_index = new_index
+        self._save_meta()
+        self._remove_stale_generations()
+
+
+if __name__ == "__main__":
+    # 테스트
+    import tempfile
+
+    store = PriceStore(os.path.join(tempfile.mkdtemp(), "store"))
+    store.append_day("2025-01-17", {"005930": {"close": 71500, "value": 920000000000}})
+    store.append_day("2025-01-20", {"005930": {"close": 71000, "value": 850000000000},
+                                    "000660": {"close": 185000, "value": 620000000000}})
+    dates, codes, close, value = store.load_range()
+    print(dates, codes)
+    print(close)
+    print(store.to_nested(store.dates_in_month("2025-01")))
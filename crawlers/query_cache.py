@@ -0,0 +1,200 @@
+"""
+조회 API 캐시 (server.py 읽기 전용 엔드포인트)
+- 계산된 테마 지표 / 종목 / 역색인을 메모리에 올려두고 기간별 정렬, 검색 색인을 미리 생성
+- 저장 파일의 (mtime, 크기)가 바뀌면 다시 로드 (크롤러가 다른 프로세스에서 갱신해도 반영)
+- 파일 상태 해시 = 세대(generation) -> ETag 에 사용 (서버 재시작 후에도 같은 데이터면 같은 ETag)
+"""
+import hashlib
+import os
+import threading
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+import storage
+from price_store import PriceStore
+
+PERIODS = ("3w", "6w", "9w")
+
+# 변경 감시 파일 (BASE_PATH 기준)
+WATCHED_FILES = (
+    "theme_metrics.json",
+    "stocks.json",
+    "theme_index.json",
+    "calendar.json",
+    os.path.join("prices", "store", "meta.json"),
+)
+
+# 조회 결과 캐시 최대 개수 (세대가 바뀌면 비움)
+MAX_RESPONSES = 256
+
+
+class QueryCache:
+    """읽기 전용 조회용 메모리 캐시"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.signature = None
+        self.generation = None
+        self.date: Optional[str] = None
+        self.themes: List[Dict] = []
+        self.theme_by_id: Dict[str, Dict] = {}
+        self.ranked: Dict[str, List[Dict]] = {}
+        self.stocks: Dict[str, Dict] = {}
+        self.stock_themes: Dict[str, List[str]] = {}
+        self.stock_metrics: Dict[str, Dict] = {}
+        self.price_store: Optional[PriceStore] = None
+        self._responses: Dict[str, Dict] = {}
+
+    # ============================================
+    # 갱신 확인
+    # ============================================
+    def _file_signature(self) -> tuple:
+        signature = []
+        for name in WATCHED_FILES:
+            try:
+                stat = os.stat(os.path.join(storage.BASE_PATH, name))
+                signature.append((name, stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                signature.append((name, None, None))
+        return (storage.BASE_PATH, tuple(signature))
+
+    def refresh(self) -> str:
+        """
+        저장 파일이 바뀌었으면 다시 로드
+
+        Returns:
+            현재 세대 (ETag 용)
+        """
+        signature = self._file_signature()
+        if signature == self.signature:
+            return self.generation
+
+        with self._lock:
+            if signature != self.signature:
+                self._load()
+                self.signature = signature
+                self.generation = hashlib.sha1(repr(signature).encode("utf-8")).hexdigest()[:16]
+        return self.generation
+
+    def _load(self):
+        """테마 지표 / 종목 / 역색인 로드 후 조회용 구조 생성"""
+        metrics = storage.load_theme_metrics() or {}
+        self.date = metrics.get("date")
+        self.themes = metrics.get("themes", [])
+        self.theme_by_id = {theme["id"]: theme for theme in self.themes}
+
+        # 기간별 순위 정렬 (요약만, 종목별 지표 제외)
+        summaries = [
+            {"id": theme["id"], "name": theme["name"], "stocks": len(theme["stocks"]), "metrics": theme["metrics"]}
+            for theme in self.themes
+        ]
+        self.ranked = {
+            period: sorted(summaries, key=lambda summary: summary["metrics"][f"rank_{period}"])
+            for period in PERIODS
+        }
+
+        self.stocks = storage.load_stocks()
+        self.stock_themes = storage.load_stock_themes()
+
+        # 종목별 지표는 테마와 무관하게 같음 (종목당 1개)
+        self.stock_metrics = {}
+        for theme in self.themes:
+            self.stock_metrics.update(theme.get("stockMetrics", {}))
+
+        self.price_store = PriceStore(storage.PRICE_STORE_PATH)
+        self._responses = {}
+        print(f"조회 캐시 갱신: {len(self.themes)}개 테마, {len(self.stocks)}개 종목 ({self.date} 기준)")
+
+    def response(self, key: str, build: Callable[[], Dict]) -> Dict:
+        """세대 안에서 같은 요청의 결과 재사용"""
+        cached = self._responses.get(key)
+        if cached is None:
+            if len(self._responses) >= MAX_RESPONSES:
+                self._responses.clear()
+            cached = self._responses[key] = build()
+        return cached
+
+    # ============================================
+    # 조회
+    # ============================================
+    def list_themes(self, period: str = "3w", stage: str = None) -> List[Dict]:
+        """
+        기간별 순위순 테마 목록
+
+        Args:
+            period: "3w" | "6w" | "9w"
+            stage: "2" / "2단계" / "정리" / "소멸" (없으면 전체)
+        """
+        themes = self.ranked.get(period, [])
+        if stage:
+            stage = f"{stage}단계" if stage.isdigit() else stage
+            themes = [theme for theme in themes if theme["metrics"]["stage"] == stage]
+        return themes
+
+    def get_theme(self, theme_id: str) -> Optional[Dict]:
+        """테마 상세 (종목 이름 포함)"""
+        theme = self.theme_by_id.get(theme_id)
+        if theme is None:
+            return None
+        return {
+            **theme,
+            "stockNames": {code: self.stocks.get(code, {}).get("name", code) for code in theme["stocks"]},
+        }
+
+    def stock_history(self, code: str, sessions: int) -> Optional[Dict]:
+        """
+        종목 가격 기록 + 포함 테마 + 지표
+
+        Args:
+            code: 종목코드
+            sessions: 최근 N거래일
+        """
+        store = self.price_store
+        if code not in self.stocks and (store is None or code not in store.code_index):
+            return None
+
+        prices = []
+        if store is not None and code in store.code_index and store.dates:
+            start_date = store.dates[max(len(store.dates) - sessions, 0)]
+            dates, _, close, value = store.load_range(start_date)
+            col = store.code_index[code]
+            closes = np.asarray(close[:, col])
+            values = np.asarray(value[:, col])
+            prices = [
+                {"date": date, "close": int(closes[i]), "value": int(values[i])}
+                for i, date in enumerate(dates)
+                if closes[i] != PriceStore.MISSING
+            ]
+
+        return {
+            "code": code,
+            **self.stocks.get(code, {"name": code}),
+            "themes": [
+                {"id": theme_id, "name": self.theme_by_id[theme_id]["name"]}
+                for theme_id in self.stock_themes.get(code, [])
+                if theme_id in self.theme_by_id
+            ],
+            "metrics": self.stock_metrics.get(code),
+            "prices": prices,
+        }
+
+    def search(self, query: str, limit: int = 20) -> Dict:
+        """종목(이름/코드) + 테마(이름) 검색"""
+        query = query.strip().lower()
+        if not query:
+            return {"stocks": [], "themes": []}
+
+        stocks = []
+        for code, stock in self.stocks.items():
+            if code.startswith(query) or query in stock.get("name", "").lower():
+                stocks.append({"code": code, **stock, "themes": len(self.stock_themes.get(code, []))})
+                if len(stocks) >= limit:
+                    break
+
+        themes = [
+            {"id": theme["id"], "name": theme["name"], "stage": theme["metrics"]["stage"]}
+            for theme in self.themes
+            if query in theme["name"].lower()
+        ][:limit]
+        return {"stocks": stocks, "themes": themes}
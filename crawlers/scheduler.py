@@ -1,19 +1,85 @@
 """
 크롤러 스케줄러
-- 매일 15:40: 일봉 데이터 + 시장 데이터 수집
-- 매주 토요일 10:00: 테마/종목 매핑 갱신
+- 매일 15:40: 종가 일괄 수집 (100종목당 TR 1회) + 시장 데이터 계산
+- 매주 토요일 10:00: 테마/종목 매핑 + 시장 기준 정보 갱신
 - 분기 1회: 재무 데이터 갱신
 """
 import schedule
 import time
+import sys
+import os
 from datetime import datetime
-from kiwoom.api import KiwoomAPI
+from typing import Optional
+from kiwoom.api import create_api
+from kiwoom.session import KiwoomSession
 from kiwoom.theme_crawler import ThemeCrawler
 from kiwoom.price_crawler import PriceCrawler
 from kiwoom.market_crawler import MarketCrawler
 from naver.financial_crawler import FinancialCrawler
+from job_manager import report_error, report_progress, report_stage
 import storage
 
+# 프로젝트 루트를 path에 추가 (backend 모듈)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.calculator import run_calculation
+
+
+# ============================================
+# 키움 세션
+# ============================================
+# 공유 세션 (server.py / start_scheduler: 작업이 끝나도 로그인 유지)
+_kiwoom_session: Optional[KiwoomSession] = None
+
+
+def keep_kiwoom_session() -> KiwoomSession:
+    """
+    이후 작업들이 로그인된 키움 세션 1개를 공유 (로그인은 첫 작업에서 1번)
+    - 세션은 처음 사용하는 스레드에서 생성되므로 작업은 같은 스레드에서 실행
+    """
+    global _kiwoom_session
+    if _kiwoom_session is None:
+        _kiwoom_session = KiwoomSession(lambda: create_api())
+    return _kiwoom_session
+
+
+def open_api():
+    """
+    작업용 KiwoomAPI
+    - 공유 세션이 있으면 연결 확인 후 재사용 (끊겼으면 재접속하지 않고 실패 - 프로세스 재시작 필요)
+    - 없으면 (CLI 1회 실행) 새로 로그인
+
+    Returns:
+        로그인된 KiwoomAPI (로그인 실패 / 재시작 필요 시 None)
+    """
+    session = _kiwoom_session or KiwoomSession(lambda: create_api())
+    return session.acquire()
+
+
+def release_api(api):
+    """작업 종료: 공유 세션이면 연결 유지, 아니면 연결 해제"""
+    if _kiwoom_session is not None and _kiwoom_session.api is api:
+        print(api.metrics.summary())
+        return
+    api.disconnect()
+
+
+def report_crawl_error(name: str, e: Exception):
+    """
+    수집 에러 출력 + 서버 작업 실패 사유 기록
+    - 저장 파일 손상이면 파일 경로와 복구 방법 안내 (storage.RECOVERY_HINTS)
+
+    Args:
+        name: 작업 이름 ("일별 크롤러")
+        e: 발생한 예외
+    """
+    if isinstance(e, storage.CorruptedFileError):
+        message = f"저장 파일 손상: {e.filepath} - 복구: {e.recovery}"
+    else:
+        message = str(e)
+    print(f"{name} 에러: {message}")
+    report_error(message)
+
 
 def get_all_stock_codes() -> list:
     """저장된 종목 코드 목록 반환"""
@@ -44,27 +110,128 @@ def is_excluded_stock(name: str) -> bool:
     return False
 
 
+# 체크포인트 단위 (종목 수) - 청크마다 저장 후 진행 상황 기록
+CHECKPOINT_CHUNK = 200
+
+
+def new_crawl_progress(job: str, stock_codes: list) -> dict:
+    """장시간 수집 진행 상황 생성 (재개 시에도 같은 기준일/분기 사용)"""
+    return {
+        "job": job,
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "today": datetime.now().strftime("%Y-%m-%d"),
+        "quarter": FinancialCrawler().get_current_quarter(),
+        "codes": stock_codes,
+        "done": {}
+    }
+
+
+def run_checkpointed(job: str, progress: dict, stage: str, crawl_chunk):
+    """
+    단계별 청크 수집 (완료 종목은 건너뜀)
+    - 청크 수집 + 저장 후 진행 상황 기록 -> 중단되어도 청크 단위로 재개
+    - 메모리에는 한 청크 결과만 유지
+
+    Args:
+        job: "init", "all"
+        progress: 진행 상황 (new_crawl_progress)
+        stage: "prices", "market", "financial"
+        crawl_chunk: 청크 수집 + 저장 함수 (종목코드 리스트)
+    """
+    done = progress["done"].setdefault(stage, [])
+    done_set = set(done)
+    pending = [code for code in progress["codes"] if code not in done_set]
+    total = len(progress["codes"])
+
+    if not pending:
+        print(f"  이미 완료 ({total}개 종목)")
+        return
+    if done:
+        print(f"  이어서 수집: 완료 {len(done)}개, 남은 종목 {len(pending)}개")
+
+    report_progress(len(done), total)
+    for start in range(0, len(pending), CHECKPOINT_CHUNK):
+        chunk = pending[start:start + CHECKPOINT_CHUNK]
+        crawl_chunk(chunk)
+        done.extend(chunk)
+        storage.save_crawl_progress(job, progress)
+        report_progress(len(done), total)
+        print(f"  [{len(done)}/{total}] 저장 완료")
+
+
+def save_price_chunk(api, stock_codes: list, days: int = 70):
+    """일봉 수집 후 기존 데이터에 병합 (컬럼형 저장소 + 일별 변경분 로그)"""
+    price_crawler = PriceCrawler(api)
+    price_data = price_crawler.crawl_stocks(stock_codes, days=days)
+
+    monthly_prices = {}  # {"2025-01": {"005930": {"2025-01-20": {...}}}}
+    for code, daily_list in price_data.items():
+        for day in daily_list:
+            date = day["date"]
+            year_month = date[:7]
+            if year_month not in monthly_prices:
+                monthly_prices[year_month] = {}
+            if code not in monthly_prices[year_month]:
+                monthly_prices[year_month][code] = {}
+            monthly_prices[year_month][code][date] = {
+                "close": day["close"],
+                "value": day["trading_value"]
+            }
+
+    storage.merge_monthly_prices(monthly_prices)
+
+
+def save_market_chunk(api, stock_codes: list, date: str):
+    """시장 데이터 수집 후 market.json 에 병합"""
+    market_crawler = MarketCrawler(api)
+    market_data = market_crawler.crawl_stocks(stock_codes)
+
+    existing_market = storage.load_market()
+    existing_market["data"].update(market_data)
+    storage.save_market(date, existing_market["data"])
+
+
+def save_financial_chunk(stock_codes: list, quarter: str):
+    """재무 데이터 수집 후 financial.json 에 병합"""
+    financial_crawler = FinancialCrawler()
+    financial_data = financial_crawler.crawl_stocks(stock_codes)
+
+    # 기존 financial.json 에 병합
+    storage.save_financial(quarter, financial_data)
+
+
 def run_daily_crawler():
-    """매일 실행: 일봉 + 시장 데이터 수집"""
+    """
+    매일 실행: 일봉 + 시장 데이터 수집
+
+    Returns:
+        성공 여부 (서버 작업 상태: False 이면 실패로 기록)
+    """
     print(f"\n[{datetime.now()}] 일별 크롤러 시작")
     today = datetime.now().strftime("%Y-%m-%d")
 
-    api = KiwoomAPI()
-    if not api.login():
+    api = open_api()
+    if api is None:
         print("로그인 실패 - 크롤러 종료")
-        return
+        return False
 
+    success = True
     try:
         stock_codes = get_all_stock_codes()
 
         if not stock_codes:
             print("조회할 종목 없음 - 먼저 init 실행 필요")
-            return
+            return False
 
-        # 1. 일봉 데이터 수집
-        print(f"\n[1/2] 일봉 데이터 수집 ({len(stock_codes)}개 종목)")
+        # 1. 오늘 종가 수집 (100종목당 TR 1회)
+        print(f"\n[1/2] 오늘 종가 수집 ({len(stock_codes)}개 종목)")
+        report_stage("오늘 종가 수집", len(stock_codes))
         price_crawler = PriceCrawler(api)
-        price_result = price_crawler.crawl_today(stock_codes)
+        price_result = price_crawler.crawl_today_batch(stock_codes)
+
+        if not price_result:
+            print("수집된 가격 없음 - 일별 크롤러 종료")
+            return True
 
         # 종가 + 거래대금만 추출하여 저장
         prices_to_save = {}
@@ -75,24 +242,39 @@ def run_daily_crawler():
             }
         storage.add_daily_prices(today, prices_to_save)
 
-        # 2. 시장 데이터 수집 (시총, 주식수, PER, PBR)
-        print(f"\n[2/2] 시장 데이터 수집 ({len(stock_codes)}개 종목)")
+        # 지난 달 변경분은 월별 파일로 압축 (월말 정리)
+        storage.compact_price_deltas(before_month=today[:7])
+
+        # 2. 시장 데이터 계산 (시총, PER, PBR = 당일 종가 × 주간 기준 정보)
+        print(f"\n[2/2] 시장 데이터 계산 ({len(price_result)}개 종목)")
+        report_stage("시장 데이터 계산", len(price_result))
         market_crawler = MarketCrawler(api)
-        market_result = market_crawler.crawl_stocks(stock_codes)
+        market_result = market_crawler.crawl_from_prices(price_result, storage.load_market()["data"])
         storage.save_market(today, market_result)
 
         print(f"\n일별 크롤링 완료: 가격 {len(prices_to_save)}개, 시장 {len(market_result)}개")
 
+        # 3. 테마 지표 계산 + 히스토리 기록 (theme_metrics.json, history/)
+        report_stage("테마 지표 계산")
+        run_calculation(record_history=True)
+
     except Exception as e:
-        print(f"일별 크롤러 에러: {e}")
+        report_crawl_error("일별 크롤러", e)
+        success = False
     finally:
-        api.disconnect()
+        release_api(api)
 
     print(f"[{datetime.now()}] 일별 크롤러 종료")
+    return success
 
 
 def run_update_crawler():
-    """수동 실행: 마지막 저장 날짜 이후 ~ 오늘까지 데이터 수집"""
+    """
+    수동 실행: 마지막 저장 날짜 이후 ~ 오늘까지 데이터 수집
+
+    Returns:
+        성공 여부 (서버 작업 상태: False 이면 실패로 기록)
+    """
     print(f"\n[{datetime.now()}] 업데이트 크롤러 시작")
 
     # 마지막 저장 날짜 확인
@@ -101,41 +283,44 @@ def run_update_crawler():
 
     if last_date is None:
         print("저장된 가격 데이터 없음 - init 먼저 실행 필요")
-        return
+        return False
 
     if last_date >= today:
         print(f"이미 최신 데이터 ({last_date})까지 저장됨")
-        return
+        return True
 
-    # 거래일 수 계산 (주말 제외 대략 계산)
-    from datetime import datetime as dt
-    last_dt = dt.strptime(last_date, "%Y-%m-%d")
-    today_dt = dt.strptime(today, "%Y-%m-%d")
-    calendar_days = (today_dt - last_dt).days
-    trading_days = int(calendar_days * 5 / 7) + 5  # 여유 있게
+    # 누락 거래일 수 (마지막 거래일 이후 평일 - KRX 휴장일, 휴장일 목록에 없는 연도는 평일 기준)
+    trading_days = storage.get_trading_calendar().missing_sessions(today)
 
     print(f"마지막 저장: {last_date}, 오늘: {today}")
-    print(f"가져올 일수: 약 {trading_days}일")
+    print(f"가져올 일수: {trading_days}일")
 
-    api = KiwoomAPI()
-    if not api.login():
+    if trading_days == 0:
+        print("주말/휴일 - 새 거래일 없음")
+        return True
+
+    api = open_api()
+    if api is None:
         print("로그인 실패 - 크롤러 종료")
-        return
+        return False
 
+    success = True
     try:
         stock_codes = get_all_stock_codes()
 
         if not stock_codes:
             print("조회할 종목 없음 - 먼저 init 실행 필요")
-            return
+            return False
 
         # 1. 일봉 데이터 수집
         print(f"\n[1/2] 일봉 데이터 수집 ({len(stock_codes)}개 종목, {trading_days}일)")
-        price_crawler = PriceCrawler(api)
+        report_stage("일봉 데이터 수집", len(stock_codes))
+        price_crawler = PriceCrawler(api, progress=report_progress)
         price_data = price_crawler.crawl_stocks(stock_codes, days=trading_days)
 
         # 월별로 모아서 저장
         monthly_prices = {}
+        latest_prices = {}  # 종목별 가장 최근 일봉 (시장 데이터 계산용)
         new_count = 0
         for code, daily_list in price_data.items():
             for day in daily_list:
@@ -143,6 +328,8 @@ def run_update_crawler():
                 # 마지막 저장 날짜 이후 데이터만 저장
                 if date <= last_date:
                     continue
+                if code not in latest_prices or date > latest_prices[code]["date"]:
+                    latest_prices[code] = day
                 year_month = date[:7]
                 if year_month not in monthly_prices:
                     monthly_prices[year_month] = {}
@@ -154,44 +341,155 @@ def run_update_crawler():
                 }
                 new_count += 1
 
-        # 월별로 기존 데이터와 병합 후 저장
-        for year_month, new_data in monthly_prices.items():
-            existing = storage.load_prices(year_month)
-            for code, dates in new_data.items():
-                if code not in existing:
-                    existing[code] = {}
-                existing[code].update(dates)
-            storage.save_prices(year_month, existing)
-            print(f"  {year_month} 저장 완료")
-
-        # 2. 시장 데이터 수집
-        print(f"\n[2/2] 시장 데이터 수집")
-        market_crawler = MarketCrawler(api)
-        market_result = market_crawler.crawl_stocks(stock_codes)
+        # 기존 데이터에 병합 (컬럼형 저장소 + 일별 변경분 로그)
+        storage.merge_monthly_prices(monthly_prices)
+
+        # 2. 시장 데이터 계산 (최근 종가 × 주간 기준 정보, 기준 정보 없는 종목만 조회)
+        print(f"\n[2/2] 시장 데이터 계산 ({len(latest_prices)}개 종목)")
+        report_stage("시장 데이터 계산", len(latest_prices))
+        market_crawler = MarketCrawler(api, progress=report_progress)
+        market_result = market_crawler.crawl_from_prices(latest_prices, storage.load_market()["data"])
         storage.save_market(today, market_result)
 
         print(f"\n업데이트 완료: 새 가격 데이터 {new_count}건")
 
+        # 3. 테마 지표 계산 + 히스토리 기록 (마지막 거래일 기준)
+        report_stage("테마 지표 계산")
+        run_calculation(record_history=True)
+
     except Exception as e:
-        print(f"업데이트 크롤러 에러: {e}")
+        report_crawl_error("업데이트 크롤러", e)
+        success = False
         import traceback
         traceback.print_exc()
     finally:
-        api.disconnect()
+        release_api(api)
 
     print(f"[{datetime.now()}] 업데이트 크롤러 종료")
+    return success
+
+
+def plan_backfill_requests(gaps: dict, calendar, max_rows: int = PriceCrawler.MAX_ROWS) -> list:
+    """
+    누락 구간을 OPT10081 요청으로 묶기
+    - 한 종목의 여러 구간은 응답 한 번(최대 max_rows 거래일)에 들어가면 요청 1회로 합침
+
+    Args:
+        gaps: storage.find_price_gaps 결과 {"005930": [(시작일, 종료일), ...]}
+        calendar: 거래일 달력 (TradingCalendar)
+
+    Returns:
+        [(종목코드, 기준일자, 조회할 일수), ...]
+    """
+    requests = []
+    for code, ranges in gaps.items():
+        group_start = group_end = None
+        for start, end in ranges:
+            if group_start is not None and calendar.position(end) - calendar.position(group_start) + 1 <= max_rows:
+                group_end = end
+                continue
+            if group_start is not None:
+                requests.append((code, group_end, calendar.position(group_end) - calendar.position(group_start) + 1))
+            group_start, group_end = start, end
+        if group_start is not None:
+            requests.append((code, group_end, calendar.position(group_end) - calendar.position(group_start) + 1))
+    return requests
+
+
+def run_backfill(dry_run: bool = False):
+    """
+    수동 실행: 누락된 종목/날짜 칸만 다시 수집 (TR 타임아웃 등으로 빠진 일봉)
+
+    Returns:
+        성공 여부 (서버 작업 상태: False 이면 실패로 기록)
+    """
+    print(f"\n[{datetime.now()}] 누락 구간 보충 시작")
+
+    stock_codes = get_all_stock_codes()
+    gaps = storage.find_price_gaps(stock_codes or None)
+    calendar = storage.get_trading_calendar()
+    requests = plan_backfill_requests(gaps, calendar)
+
+    missing_cells = sum(
+        calendar.position(end) - calendar.position(start) + 1
+        for ranges in gaps.values() for start, end in ranges
+    )
+    print(f"누락: {len(gaps)}개 종목, {missing_cells}칸 -> OPT10081 {len(requests)}회")
+
+    if dry_run:
+        for code, ranges in sorted(gaps.items()):
+            print(f"  {code}: " + ", ".join(start if start == end else f"{start}~{end}" for start, end in ranges))
+        return True
+
+    if not requests:
+        print("누락 구간 없음")
+        return True
+
+    api = open_api()
+    if api is None:
+        print("로그인 실패 - 크롤러 종료")
+        return False
+
+    success = True
+    try:
+        report_stage("누락 구간 수집", len(requests))
+        price_crawler = PriceCrawler(api, progress=report_progress)
+        price_data = price_crawler.crawl_ranges(requests)
+
+        # 누락 칸에 해당하는 날짜만 저장
+        monthly_prices = {}
+        filled = 0
+        for code, daily_list in price_data.items():
+            wanted = set()
+            for start, end in gaps[code]:
+                wanted.update(calendar.dates[calendar.position(start):calendar.position(end) + 1])
+            for day in daily_list:
+                date = day["date"]
+                if date not in wanted:
+                    continue
+                monthly_prices.setdefault(date[:7], {}).setdefault(code, {})[date] = {
+                    "close": day["close"],
+                    "value": day["trading_value"]
+                }
+                wanted.discard(date)
+                filled += 1
+
+        storage.merge_monthly_prices(monthly_prices)
+        print(f"\n보충 완료: {filled}/{missing_cells}칸 (나머지는 거래정지 등 데이터 없음)")
+
+        if filled:
+            report_stage("테마 지표 계산")
+            run_calculation()
+
+    except Exception as e:
+        report_crawl_error("누락 구간 보충", e)
+        success = False
+        import traceback
+        traceback.print_exc()
+    finally:
+        release_api(api)
+
+    print(f"[{datetime.now()}] 누락 구간 보충 종료")
+    return success
 
 
 def run_weekly_crawler():
-    """주 1회 실행: 테마/종목 매핑 갱신"""
+    """
+    주 1회 실행: 테마/종목 매핑 + 시장 기준 정보 갱신
+
+    Returns:
+        성공 여부 (서버 작업 상태: False 이면 실패로 기록)
+    """
     print(f"\n[{datetime.now()}] 주간 크롤러 시작")
 
-    api = KiwoomAPI()
-    if not api.login():
+    api = open_api()
+    if api is None:
         print("로그인 실패 - 크롤러 종료")
-        return
+        return False
 
+    success = True
     try:
+        report_stage("테마/종목 수집")
         crawler = ThemeCrawler(api)
         data = crawler.crawl_all()
 
@@ -217,199 +515,250 @@ def run_weekly_crawler():
             })
         storage.save_themes(themes)
 
+        # 3. 시장 기준 정보 갱신 (주식수, EPS, BPS - 일별 시총/PER/PBR 계산용)
+        print(f"\n시장 기준 정보 갱신 ({len(stocks)}개 종목)")
+        report_stage("시장 기준 정보 갱신", len(stocks))
+        market_crawler = MarketCrawler(api, progress=report_progress)
+        market_result = market_crawler.crawl_stocks(list(stocks.keys()))
+        storage.save_market(datetime.now().strftime("%Y-%m-%d"), market_result)
+
         print(f"주간 크롤링 완료: 종목 {len(stocks)}개, 테마 {len(themes)}개")
 
+        # 테마 구성 변경 반영 (theme_metrics.json)
+        report_stage("테마 지표 계산")
+        run_calculation()
+
     except Exception as e:
-        print(f"주간 크롤러 에러: {e}")
+        report_crawl_error("주간 크롤러", e)
+        success = False
     finally:
-        api.disconnect()
+        release_api(api)
 
     print(f"[{datetime.now()}] 주간 크롤러 종료")
+    return success
+
 
+def run_quarterly_crawler(full: bool = False):
+    """
+    분기 1회 실행: 재무 데이터 갱신
+    - 기본: 지문 비교로 새 실적이 반영된 종목만 갱신
+    - full: 전체 종목 재수집
 
-def run_quarterly_crawler():
-    """분기 1회 실행: 재무 데이터 갱신"""
+    Returns:
+        성공 여부 (서버 작업 상태: False 이면 실패로 기록)
+    """
     print(f"\n[{datetime.now()}] 분기 크롤러 시작")
 
+    success = True
     try:
         stock_codes = get_all_stock_codes()
 
         if not stock_codes:
             print("조회할 종목 없음")
-            return
+            return False
 
-        crawler = FinancialCrawler()
+        report_stage("재무 데이터 수집")
+        crawler = FinancialCrawler(progress=report_progress)
         quarter = crawler.get_current_quarter()
-        result = crawler.crawl_stocks(stock_codes)
+
+        if full:
+            result = crawler.crawl_stocks(stock_codes)
+        else:
+            fingerprints = storage.load_financial_fingerprints()
+            result = crawler.refresh_stocks(stock_codes, fingerprints)
+            # 변경 없는 종목 확인일 저장 (변경 종목 지문은 save_financial 에서 갱신)
+            storage.save_financial_fingerprints(fingerprints)
 
         storage.save_financial(quarter, result)
-        print(f"분기 크롤링 완료: {quarter}, {len(result)}개 종목")
+        print(f"분기 크롤링 완료: {quarter}, {len(result)}개 종목 갱신")
+
+        # 웹 데이터 묶음에 새 재무 데이터 반영
+        storage.export_web_bundle()
 
     except Exception as e:
-        print(f"분기 크롤러 에러: {e}")
+        report_crawl_error("분기 크롤러", e)
+        success = False
 
     print(f"[{datetime.now()}] 분기 크롤러 종료")
+    return success
 
 
-def run_initial_crawl():
-    """초기 데이터 수집 (최초 1회)"""
-    print(f"\n[{datetime.now()}] 초기 데이터 수집 시작")
+def run_initial_crawl(resume: bool = False):
+    """
+    초기 데이터 수집 (최초 1회)
+    - 종목 청크 단위로 저장 + 진행 상황 기록 (progress/init.json)
+    - 중단 시 resume=True (python scheduler.py resume) 로 이어서 실행
 
-    # 데이터 디렉토리 초기화
-    storage.init_data_directory()
+    Returns:
+        성공 여부 (서버 작업 상태: False 이면 실패로 기록)
+    """
+    print(f"\n[{datetime.now()}] 초기 데이터 수집 {'재개' if resume else '시작'}")
 
-    api = KiwoomAPI()
-    if not api.login():
+    progress = storage.load_crawl_progress("init") if resume else None
+    if resume and progress is None:
+        print("재개할 초기 수집 없음")
+        return False
+
+    if progress is None:
+        # 데이터 디렉토리 초기화
+        storage.init_data_directory()
+
+    api = open_api()
+    if api is None:
         print("로그인 실패")
-        return
+        return False
 
+    success = True
     try:
-        # 1. 테마/종목 수집
-        print("\n[1/5] 테마/종목 데이터 수집")
-        theme_crawler = ThemeCrawler(api)
-        theme_data = theme_crawler.crawl_all()
-
-        # 종목 기본정보 저장 (stocks.json) - ETF/스팩/우선주 필터링
-        stocks = {}
-        filtered_count = 0
-        for theme_stocks in theme_data["theme_stocks"].values():
-            for stock in theme_stocks:
-                name = stock["name"]
+        if progress is None:
+            # 1. 테마/종목 수집
+            print("\n[1/5] 테마/종목 데이터 수집")
+            report_stage("테마/종목 수집")
+            theme_crawler = ThemeCrawler(api)
+            theme_data = theme_crawler.crawl_all()
+
+            # 종목 기본정보 저장 (stocks.json) - ETF/스팩/우선주 필터링
+            stocks = {}
+            filtered_count = 0
+            for theme_stocks in theme_data["theme_stocks"].values():
+                for stock in theme_stocks:
+                    name = stock["name"]
+                    if is_excluded_stock(name):
+                        filtered_count += 1
+                        continue
+                    stocks[stock["code"]] = {
+                        "name": name,
+                        "market": stock["market"]
+                    }
+            print(f"  테마 종목: {len(stocks)}개 (필터링 제외: {filtered_count}개)")
+
+            # 전체 시장 종목 추가 (테마 없는 종목 포함)
+            print("\n  전체 시장 종목 조회 중...")
+            kospi_raw = api.ocx.dynamicCall("GetCodeListByMarket(QString)", "0")
+            kospi_codes = set(kospi_raw.split(";")) if kospi_raw else set()
+            kospi_codes.discard("")
+
+            kosdaq_raw = api.ocx.dynamicCall("GetCodeListByMarket(QString)", "10")
+            kosdaq_codes = set(kosdaq_raw.split(";")) if kosdaq_raw else set()
+            kosdaq_codes.discard("")
+
+            # ETF 제외
+            etf_raw = api.ocx.dynamicCall("GetCodeListByMarket(QString)", "8")
+            etf_codes = set(etf_raw.split(";")) if etf_raw else set()
+            kospi_codes = kospi_codes - etf_codes
+            kosdaq_codes = kosdaq_codes - etf_codes
+
+            all_market_codes = kospi_codes | kosdaq_codes
+            new_codes = all_market_codes - set(stocks.keys())
+
+            print(f"  KOSPI: {len(kospi_codes)}개, KOSDAQ: {len(kosdaq_codes)}개")
+            print(f"  테마 외 종목: {len(new_codes)}개 추가 조회 중...")
+
+            added_count = 0
+            market_filtered = 0
+            for code in new_codes:
+                name = api.ocx.dynamicCall("GetMasterCodeName(QString)", code)
+                if not name:
+                    continue
+                name = name.strip()
                 if is_excluded_stock(name):
-                    filtered_count += 1
+                    market_filtered += 1
                     continue
-                stocks[stock["code"]] = {
-                    "name": name,
-                    "market": stock["market"]
-                }
-        print(f"  테마 종목: {len(stocks)}개 (필터링 제외: {filtered_count}개)")
-
-        # 전체 시장 종목 추가 (테마 없는 종목 포함)
-        print("\n  전체 시장 종목 조회 중...")
-        kospi_raw = api.ocx.dynamicCall("GetCodeListByMarket(QString)", "0")
-        kospi_codes = set(kospi_raw.split(";")) if kospi_raw else set()
-        kospi_codes.discard("")
-
-        kosdaq_raw = api.ocx.dynamicCall("GetCodeListByMarket(QString)", "10")
-        kosdaq_codes = set(kosdaq_raw.split(";")) if kosdaq_raw else set()
-        kosdaq_codes.discard("")
-
-        # ETF 제외
-        etf_raw = api.ocx.dynamicCall("GetCodeListByMarket(QString)", "8")
-        etf_codes = set(etf_raw.split(";")) if etf_raw else set()
-        kospi_codes = kospi_codes - etf_codes
-        kosdaq_codes = kosdaq_codes - etf_codes
-
-        all_market_codes = kospi_codes | kosdaq_codes
-        new_codes = all_market_codes - set(stocks.keys())
-
-        print(f"  KOSPI: {len(kospi_codes)}개, KOSDAQ: {len(kosdaq_codes)}개")
-        print(f"  테마 외 종목: {len(new_codes)}개 추가 조회 중...")
-
-        added_count = 0
-        market_filtered = 0
-        for code in new_codes:
-            name = api.ocx.dynamicCall("GetMasterCodeName(QString)", code)
-            if not name:
-                continue
-            name = name.strip()
-            if is_excluded_stock(name):
-                market_filtered += 1
-                continue
-            market = "KOSDAQ" if code in kosdaq_codes else "KOSPI"
-            stocks[code] = {"name": name, "market": market}
-            added_count += 1
-
-        storage.save_stocks(stocks)
-        print(f"  추가됨: {added_count}개 (필터링 제외: {market_filtered}개)")
-        print(f"  총 종목: {len(stocks)}개")
-
-        # 테마 매핑 저장 (themes.json) - 필터링된 종목만 포함
-        themes = []
-        for theme in theme_data["themes"]:
-            theme_code = theme["code"]
-            # 필터링된 종목만 포함
-            stock_codes = [
-                s["code"] for s in theme_data["theme_stocks"].get(theme_code, [])
-                if not is_excluded_stock(s["name"])
-            ]
-            themes.append({
-                "id": theme_code,
-                "name": theme["name"],
-                "stocks": stock_codes
-            })
-        storage.save_themes(themes)
+                market = "KOSDAQ" if code in kosdaq_codes else "KOSPI"
+                stocks[code] = {"name": name, "market": market}
+                added_count += 1
+
+            storage.save_stocks(stocks)
+            print(f"  추가됨: {added_count}개 (필터링 제외: {market_filtered}개)")
+            print(f"  총 종목: {len(stocks)}개")
+
+            # 테마 매핑 저장 (themes.json) - 필터링된 종목만 포함
+            themes = []
+            for theme in theme_data["themes"]:
+                theme_code = theme["code"]
+                # 필터링된 종목만 포함
+                stock_codes = [
+                    s["code"] for s in theme_data["theme_stocks"].get(theme_code, [])
+                    if not is_excluded_stock(s["name"])
+                ]
+                themes.append({
+                    "id": theme_code,
+                    "name": theme["name"],
+                    "stocks": stock_codes
+                })
+            storage.save_themes(themes)
+
+            # 진행 상황 기록 시작 (이후 단계는 재개 가능)
+            progress = new_crawl_progress("init", list(stocks.keys()))
+            storage.save_crawl_progress("init", progress)
+        else:
+            print(f"\n[1/5] 테마/종목 데이터 - 저장된 목록 사용 ({progress['started_at']} 시작)")
 
-        # 2. 전체 종목 코드 추출
-        stock_codes = list(stocks.keys())
+        # 2. 전체 종목 코드
+        stock_codes = progress["codes"]
         print(f"\n총 {len(stock_codes)}개 종목")
 
-        # 3. 일봉 데이터 수집 (9주 + 여유 = 70일)
+        # 3. 일봉 데이터 수집 (9주 + 여유 = 70일, 청크 단위 저장)
         print("\n[2/5] 일봉 데이터 수집 (70일)")
-        price_crawler = PriceCrawler(api)
-        price_data = price_crawler.crawl_stocks(stock_codes, days=70)
-
-        # 월별로 분리하여 저장
-        monthly_prices = {}  # {"2025-01": {"005930": {"2025-01-20": {...}}}}
-        for code, daily_list in price_data.items():
-            for day in daily_list:
-                date = day["date"]
-                year_month = date[:7]
-
-                if year_month not in monthly_prices:
-                    monthly_prices[year_month] = {}
-                if code not in monthly_prices[year_month]:
-                    monthly_prices[year_month][code] = {}
-
-                monthly_prices[year_month][code][date] = {
-                    "close": day["close"],
-                    "value": day["trading_value"]
-                }
-
-        for year_month, data in monthly_prices.items():
-            storage.save_prices(year_month, data)
+        report_stage("일봉 데이터 수집", len(stock_codes))
+        run_checkpointed("init", progress, "prices", lambda codes: save_price_chunk(api, codes, days=70))
+        storage.compact_price_deltas()
 
         # 4. 시장 데이터 수집
         print("\n[3/5] 시장 데이터 수집")
-        today = datetime.now().strftime("%Y-%m-%d")
-        market_crawler = MarketCrawler(api)
-        market_data = market_crawler.crawl_stocks(stock_codes)
-        storage.save_market(today, market_data)
+        report_stage("시장 데이터 수집", len(stock_codes))
+        run_checkpointed("init", progress, "market", lambda codes: save_market_chunk(api, codes, progress["today"]))
 
-        api.disconnect()
+        release_api(api)
+        api = None
 
         # 5. 재무 데이터 수집 (네이버 - API 불필요)
         print("\n[4/5] 재무 데이터 수집")
-        financial_crawler = FinancialCrawler()
-        quarter = financial_crawler.get_current_quarter()
-        financial_data = financial_crawler.crawl_stocks(stock_codes)
-        storage.save_financial(quarter, financial_data)
+        report_stage("재무 데이터 수집", len(stock_codes))
+        run_checkpointed("init", progress, "financial", lambda codes: save_financial_chunk(codes, progress["quarter"]))
+
+        # 테마 지표 계산 (theme_metrics.json)
+        report_stage("테마 지표 계산")
+        run_calculation()
+
+        storage.clear_crawl_progress("init")
 
         print("\n[5/5] 초기 데이터 수집 완료!")
-        print(f"  - 종목: {len(stocks)}개")
-        print(f"  - 테마: {len(themes)}개")
-        print(f"  - 가격: {len(monthly_prices)}개월")
-        print(f"  - 시장: {len(market_data)}개")
-        print(f"  - 재무: {len(financial_data)}개")
+        print(f"  - 종목: {len(stock_codes)}개")
+        print(f"  - 테마: {len(storage.load_themes())}개")
+        print(f"  - 가격: {len(storage.list_price_months())}개월")
+        print(f"  - 시장: {len(storage.load_market()['data'])}개")
+        print(f"  - 재무: {len(storage.load_financial()['data'])}개")
 
     except Exception as e:
-        print(f"초기 수집 에러: {e}")
+        report_crawl_error("초기 수집", e)
+        success = False
         import traceback
         traceback.print_exc()
+        if progress is not None:
+            print("이어서 실행: python scheduler.py resume")
     finally:
         if api:
-            api.disconnect()
+            release_api(api)
+
+    return success
 
 
 def run_kosdaq_crawl():
-    """코스닥 종목만 크롤링하여 기존 데이터에 추가"""
+    """
+    코스닥 종목만 크롤링하여 기존 데이터에 추가
+
+    Returns:
+        성공 여부 (서버 작업 상태: False 이면 실패로 기록)
+    """
     print(f"\n[{datetime.now()}] 코스닥 크롤링 시작")
 
-    api = KiwoomAPI()
-    if not api.login():
+    api = open_api()
+    if api is None:
         print("로그인 실패")
-        return
+        return False
 
+    success = True
     try:
         # 1. 코스닥 테마/종목 수집
         print("\n[1/4] 코스닥 테마/종목 수집")
@@ -473,15 +822,8 @@ def run_kosdaq_crawl():
                     "value": day["trading_value"]
                 }
 
-        # 월별로 기존 데이터와 병합 후 저장
-        for year_month, new_data in monthly_prices.items():
-            existing = storage.load_prices(year_month)
-            for code, dates in new_data.items():
-                if code not in existing:
-                    existing[code] = {}
-                existing[code].update(dates)
-            storage.save_prices(year_month, existing)
-            print(f"  {year_month} 저장 완료")
+        # 기존 데이터에 병합 (컬럼형 저장소 + 일별 변경분 로그)
+        storage.merge_monthly_prices(monthly_prices)
 
         # 3. 시장 데이터 수집
         print("\n[3/4] 시장 데이터 수집")
@@ -494,7 +836,8 @@ def run_kosdaq_crawl():
         existing_market["data"].update(market_data)
         storage.save_market(today, existing_market["data"])
 
-        api.disconnect()
+        release_api(api)
+        api = None
 
         # 4. 재무 데이터 수집 (네이버)
         print("\n[4/4] 재무 데이터 수집")
@@ -503,9 +846,7 @@ def run_kosdaq_crawl():
         financial_data = financial_crawler.crawl_stocks(kosdaq_codes)
 
         # 기존 financial.json에 병합
-        existing_financial = storage.load_financial()
-        existing_financial["data"].update(financial_data)
-        storage.save_financial(quarter, existing_financial["data"])
+        storage.save_financial(quarter, financial_data)
 
         print(f"\n코스닥 크롤링 완료!")
         print(f"  - 종목: {len(kosdaq_codes)}개 추가")
@@ -514,30 +855,38 @@ def run_kosdaq_crawl():
         print(f"  - 재무: {len(financial_data)}개")
 
     except Exception as e:
-        print(f"코스닥 크롤러 에러: {e}")
+        report_crawl_error("코스닥 크롤러", e)
+        success = False
         import traceback
         traceback.print_exc()
     finally:
         if api:
-            api.disconnect()
+            release_api(api)
 
     print(f"[{datetime.now()}] 코스닥 크롤링 종료")
+    return success
 
 
 def run_add_stocks(stock_codes: list):
-    """개별 종목 추가: 테마 없이 종목 데이터만 수집"""
+    """
+    개별 종목 추가: 테마 없이 종목 데이터만 수집
+
+    Returns:
+        성공 여부 (서버 작업 상태: False 이면 실패로 기록)
+    """
     print(f"\n[{datetime.now()}] 종목 추가 시작: {stock_codes}")
 
     if not stock_codes:
         print("추가할 종목코드를 입력하세요")
         print("사용법: python scheduler.py add 005930 000660 ...")
-        return
+        return False
 
-    api = KiwoomAPI()
-    if not api.login():
+    api = open_api()
+    if api is None:
         print("로그인 실패 - 크롤러 종료")
-        return
+        return False
 
+    success = True
     try:
         # 1. 종목 기본정보 조회 및 저장
         print("\n[1/4] 종목 기본정보 조회")
@@ -572,8 +921,9 @@ def run_add_stocks(stock_codes: list):
 
         if not new_stocks:
             print("추가할 새 종목이 없습니다")
-            api.disconnect()
-            return
+            release_api(api)
+            api = None
+            return True
 
         # stocks.json에 저장
         existing_stocks.update(new_stocks)
@@ -602,14 +952,8 @@ def run_add_stocks(stock_codes: list):
                     "value": day["trading_value"]
                 }
 
-        for year_month, new_data in monthly_prices.items():
-            existing = storage.load_prices(year_month)
-            for code, dates in new_data.items():
-                if code not in existing:
-                    existing[code] = {}
-                existing[code].update(dates)
-            storage.save_prices(year_month, existing)
-            print(f"  {year_month} 저장 완료")
+        # 기존 데이터에 병합 (컬럼형 저장소 + 일별 변경분 로그)
+        storage.merge_monthly_prices(monthly_prices)
 
         # 3. 시장 데이터 수집
         print(f"\n[3/4] 시장 데이터 수집")
@@ -621,7 +965,8 @@ def run_add_stocks(stock_codes: list):
         existing_market["data"].update(market_data)
         storage.save_market(today, existing_market["data"])
 
-        api.disconnect()
+        release_api(api)
+        api = None
 
         # 4. 재무 데이터 수집 (네이버)
         print(f"\n[4/4] 재무 데이터 수집")
@@ -629,9 +974,8 @@ def run_add_stocks(stock_codes: list):
         quarter = financial_crawler.get_current_quarter()
         financial_data = financial_crawler.crawl_stocks(new_codes)
 
-        existing_financial = storage.load_financial()
-        existing_financial["data"].update(financial_data)
-        storage.save_financial(quarter, existing_financial["data"])
+        # 기존 financial.json에 병합
+        storage.save_financial(quarter, financial_data)
 
         print(f"\n종목 추가 완료!")
         print(f"  - 종목: {len(new_codes)}개")
@@ -640,162 +984,166 @@ def run_add_stocks(stock_codes: list):
         print(f"  - 재무: {len(financial_data)}개")
 
     except Exception as e:
-        print(f"종목 추가 에러: {e}")
+        report_crawl_error("종목 추가", e)
+        success = False
         import traceback
         traceback.print_exc()
     finally:
         if api:
-            api.disconnect()
+            release_api(api)
 
     print(f"[{datetime.now()}] 종목 추가 종료")
+    return success
 
 
-def run_all_stocks():
-    """전체 시장 종목 수집 (KOSPI + KOSDAQ, 기존 종목 제외)"""
-    print(f"\n[{datetime.now()}] 전체 종목 수집 시작")
-
-    api = KiwoomAPI()
-    if not api.login():
-        print("로그인 실패 - 크롤러 종료")
-        return
-
-    try:
-        # 기존 종목 로드
-        existing_stocks = storage.load_stocks()
-        existing_codes = set(existing_stocks.keys())
-        print(f"기존 종목: {len(existing_codes)}개")
-
-        # 1. 전체 종목 코드 조회
-        print("\n[1/5] 전체 종목 코드 조회")
-
-        # KOSPI (시장코드 0)
-        kospi_raw = api.ocx.dynamicCall("GetCodeListByMarket(QString)", "0")
-        kospi_codes = set(kospi_raw.split(";")) if kospi_raw else set()
-        kospi_codes.discard("")
-
-        # KOSDAQ (시장코드 10)
-        kosdaq_raw = api.ocx.dynamicCall("GetCodeListByMarket(QString)", "10")
-        kosdaq_codes = set(kosdaq_raw.split(";")) if kosdaq_raw else set()
-        kosdaq_codes.discard("")
+def run_all_stocks(resume: bool = False):
+    """
+    전체 시장 종목 수집 (KOSPI + KOSDAQ, 기존 종목 제외)
+    - 종목 청크 단위로 저장 + 진행 상황 기록 (progress/all.json)
+    - 중단 시 resume=True (python scheduler.py resume) 로 이어서 실행
 
-        # ETF 제외 (시장코드 8)
-        etf_raw = api.ocx.dynamicCall("GetCodeListByMarket(QString)", "8")
-        etf_codes = set(etf_raw.split(";")) if etf_raw else set()
+    Returns:
+        성공 여부 (서버 작업 상태: False 이면 실패로 기록)
+    """
+    print(f"\n[{datetime.now()}] 전체 종목 수집 {'재개' if resume else '시작'}")
 
-        kospi_codes = kospi_codes - etf_codes
-        kosdaq_codes = kosdaq_codes - etf_codes
+    progress = storage.load_crawl_progress("all") if resume else None
+    if resume and progress is None:
+        print("재개할 전체 종목 수집 없음")
+        return False
 
-        all_codes = kospi_codes | kosdaq_codes
-        new_codes = all_codes - existing_codes
+    api = open_api()
+    if api is None:
+        print("로그인 실패 - 크롤러 종료")
+        return False
 
-        print(f"  KOSPI: {len(kospi_codes)}개")
-        print(f"  KOSDAQ: {len(kosdaq_codes)}개")
-        print(f"  전체: {len(all_codes)}개")
-        print(f"  신규 (추가 대상): {len(new_codes)}개")
+    success = True
+    try:
+        if progress is None:
+            # 기존 종목 로드
+            existing_stocks = storage.load_stocks()
+            existing_codes = set(existing_stocks.keys())
+            print(f"기존 종목: {len(existing_codes)}개")
+
+            # 1. 전체 종목 코드 조회
+            print("\n[1/5] 전체 종목 코드 조회")
+
+            # KOSPI (시장코드 0)
+            kospi_raw = api.ocx.dynamicCall("GetCodeListByMarket(QString)", "0")
+            kospi_codes = set(kospi_raw.split(";")) if kospi_raw else set()
+            kospi_codes.discard("")
+
+            # KOSDAQ (시장코드 10)
+            kosdaq_raw = api.ocx.dynamicCall("GetCodeListByMarket(QString)", "10")
+            kosdaq_codes = set(kosdaq_raw.split(";")) if kosdaq_raw else set()
+            kosdaq_codes.discard("")
+
+            # ETF 제외 (시장코드 8)
+            etf_raw = api.ocx.dynamicCall("GetCodeListByMarket(QString)", "8")
+            etf_codes = set(etf_raw.split(";")) if etf_raw else set()
+
+            kospi_codes = kospi_codes - etf_codes
+            kosdaq_codes = kosdaq_codes - etf_codes
+
+            all_codes = kospi_codes | kosdaq_codes
+            new_codes = all_codes - existing_codes
+
+            print(f"  KOSPI: {len(kospi_codes)}개")
+            print(f"  KOSDAQ: {len(kosdaq_codes)}개")
+            print(f"  전체: {len(all_codes)}개")
+            print(f"  신규 (추가 대상): {len(new_codes)}개")
+
+            if not new_codes:
+                print("추가할 새 종목이 없습니다")
+                return True
+
+            # 2. 종목 기본정보 조회 (보통주만 필터링)
+            print(f"\n[2/5] 종목 기본정보 조회 및 필터링")
+            new_stocks = {}
+            filtered_count = 0
+
+            for i, code in enumerate(new_codes):
+                if (i + 1) % 500 == 0:
+                    print(f"  [{i + 1}/{len(new_codes)}] 조회 중...")
+
+                name = api.ocx.dynamicCall("GetMasterCodeName(QString)", code)
+                if not name:
+                    continue
 
-        if not new_codes:
-            print("추가할 새 종목이 없습니다")
-            api.disconnect()
-            return
+                name = name.strip()
 
-        # 2. 종목 기본정보 조회 (보통주만 필터링)
-        print(f"\n[2/5] 종목 기본정보 조회 및 필터링")
-        new_stocks = {}
-        filtered_count = 0
+                # 필터링: ETF/ETN/스팩/우선주 등 제외
+                if is_excluded_stock(name):
+                    filtered_count += 1
+                    continue
 
-        for i, code in enumerate(new_codes):
-            if (i + 1) % 500 == 0:
-                print(f"  [{i + 1}/{len(new_codes)}] 조회 중...")
+                market = "KOSDAQ" if code in kosdaq_codes else "KOSPI"
+                new_stocks[code] = {"name": name, "market": market}
 
-            name = api.ocx.dynamicCall("GetMasterCodeName(QString)", code)
-            if not name:
-                continue
+            print(f"  필터링 제외: {filtered_count}개 (ETF/ETN/스팩/우선주 등)")
 
-            name = name.strip()
+            # stocks.json에 저장
+            existing_stocks.update(new_stocks)
+            storage.save_stocks(existing_stocks)
+            print(f"종목 {len(new_stocks)}개 추가됨")
 
-            # 필터링: ETF/ETN/스팩/우선주 등 제외
-            if is_excluded_stock(name):
-                filtered_count += 1
-                continue
+            new_code_list = list(new_stocks.keys())
 
-            market = "KOSDAQ" if code in kosdaq_codes else "KOSPI"
-            new_stocks[code] = {"name": name, "market": market}
-
-        print(f"  필터링 제외: {filtered_count}개 (ETF/ETN/스팩/우선주 등)")
-
-        # stocks.json에 저장
-        existing_stocks.update(new_stocks)
-        storage.save_stocks(existing_stocks)
-        print(f"종목 {len(new_stocks)}개 추가됨")
+            # 진행 상황 기록 시작 (이후 단계는 재개 가능)
+            progress = new_crawl_progress("all", list(new_stocks.keys()))
+            storage.save_crawl_progress("all", progress)
+        else:
+            print(f"\n[1-2/5] 신규 종목 - 저장된 목록 사용 ({progress['started_at']} 시작)")
 
-        new_code_list = list(new_stocks.keys())
+        new_code_list = progress["codes"]
 
-        # 3. 일봉 데이터 수집 (70일)
+        # 3. 일봉 데이터 수집 (70일, 청크 단위 저장)
         print(f"\n[3/5] 일봉 데이터 수집 ({len(new_code_list)}개 종목)")
-        price_crawler = PriceCrawler(api)
-        price_data = price_crawler.crawl_stocks(new_code_list, days=70)
-
-        # 월별로 저장
-        monthly_prices = {}
-        for code, daily_list in price_data.items():
-            for day in daily_list:
-                date = day["date"]
-                year_month = date[:7]
-                if year_month not in monthly_prices:
-                    monthly_prices[year_month] = {}
-                if code not in monthly_prices[year_month]:
-                    monthly_prices[year_month][code] = {}
-                monthly_prices[year_month][code][date] = {
-                    "close": day["close"],
-                    "value": day["trading_value"]
-                }
-
-        for year_month, new_data in monthly_prices.items():
-            existing = storage.load_prices(year_month)
-            for code, dates in new_data.items():
-                if code not in existing:
-                    existing[code] = {}
-                existing[code].update(dates)
-            storage.save_prices(year_month, existing)
-            print(f"  {year_month} 저장 완료")
+        run_checkpointed("all", progress, "prices", lambda codes: save_price_chunk(api, codes, days=70))
+        storage.compact_price_deltas()
 
         # 4. 시장 데이터 수집
         print(f"\n[4/5] 시장 데이터 수집")
-        today = datetime.now().strftime("%Y-%m-%d")
-        market_crawler = MarketCrawler(api)
-        market_data = market_crawler.crawl_stocks(new_code_list)
+        run_checkpointed("all", progress, "market", lambda codes: save_market_chunk(api, codes, progress["today"]))
 
-        existing_market = storage.load_market()
-        existing_market["data"].update(market_data)
-        storage.save_market(today, existing_market["data"])
-
-        api.disconnect()
+        release_api(api)
+        api = None
 
         # 5. 재무 데이터 수집 (네이버)
         print(f"\n[5/5] 재무 데이터 수집")
-        financial_crawler = FinancialCrawler()
-        quarter = financial_crawler.get_current_quarter()
-        financial_data = financial_crawler.crawl_stocks(new_code_list)
+        run_checkpointed("all", progress, "financial", lambda codes: save_financial_chunk(codes, progress["quarter"]))
 
-        existing_financial = storage.load_financial()
-        existing_financial["data"].update(financial_data)
-        storage.save_financial(quarter, existing_financial["data"])
+        storage.clear_crawl_progress("all")
 
         print(f"\n전체 종목 수집 완료!")
-        print(f"  - 신규 종목: {len(new_stocks)}개")
-        print(f"  - 가격 데이터: {len(price_data)}개")
-        print(f"  - 시장 데이터: {len(market_data)}개")
-        print(f"  - 재무 데이터: {len(financial_data)}개")
+        print(f"  - 신규 종목: {len(new_code_list)}개")
 
     except Exception as e:
-        print(f"전체 종목 수집 에러: {e}")
+        report_crawl_error("전체 종목 수집", e)
+        success = False
         import traceback
         traceback.print_exc()
+        if progress is not None:
+            print("이어서 실행: python scheduler.py resume")
     finally:
         if api:
-            api.disconnect()
+            release_api(api)
 
     print(f"[{datetime.now()}] 전체 종목 수집 종료")
+    return success
+
+
+def run_resume():
+    """중단된 장시간 수집 이어서 실행 (init / all)"""
+    resumed = False
+    if storage.load_crawl_progress("init") is not None:
+        run_initial_crawl(resume=True)
+        resumed = True
+    if storage.load_crawl_progress("all") is not None:
+        run_all_stocks(resume=True)
+        resumed = True
+    if not resumed:
+        print("재개할 수집 작업 없음")
 
 
 def start_scheduler():
@@ -810,18 +1158,25 @@ def start_scheduler():
     # schedule.every().monday.at("09:00").do(run_quarterly_crawler)
 
     print("스케줄러 시작")
-    print("  - 매일 15:40: 일봉 + 시장 데이터 수집")
-    print("  - 매주 토요일 10:00: 테마/종목 갱신")
+    print("  - 매일 15:40: 일봉 수집 + 시장 데이터 계산")
+    print("  - 매주 토요일 10:00: 테마/종목 + 시장 기준 정보 갱신")
     print("  - 분기 1회: 재무 데이터 (수동 실행: python scheduler.py quarterly)")
 
-    while True:
-        schedule.run_pending()
-        time.sleep(60)
+    # 작업 간 키움 로그인 유지 (첫 작업에서 로그인)
+    # 연결이 끊기면 같은 프로세스에서는 복구 불가 -> 종료 코드 1 로 끝내고 외부(작업 스케줄러 등)에서 재시작
+    session = keep_kiwoom_session()
+    try:
+        while not session.restart_required:
+            schedule.run_pending()
+            time.sleep(60)
+    finally:
+        session.close()
+
+    print("키움 연결 끊김 - 스케줄러 종료 (재시작 필요)")
+    sys.exit(1)
 
 
 if __name__ == "__main__":
-    import sys
-
     if len(sys.argv) > 1:
         cmd = sys.argv[1]
         if cmd == "init":
@@ -831,16 +1186,30 @@ if __name__ == "__main__":
         elif cmd == "weekly":
             run_weekly_crawler()
         elif cmd == "quarterly":
-            run_quarterly_crawler()
+            run_quarterly_crawler(full="--full" in sys.argv[2:])
         elif cmd == "kosdaq":
             run_kosdaq_crawl()
         elif cmd == "update":
             run_update_crawler()
+        elif cmd == "backfill":
+            run_backfill(dry_run="--dry-run" in sys.argv[2:])
         elif cmd == "add":
             stock_codes = sys.argv[2:]
             run_add_stocks(stock_codes)
         elif cmd == "all":
             run_all_stocks()
+        elif cmd == "resume":
+            run_resume()
+        elif cmd == "calc":
+            run_calculation()
+        elif cmd == "compact":
+            storage.compact_price_deltas()
+        elif cmd == "bundle":
+            storage.export_web_bundle()
+        elif cmd == "export":
+            # 월별 가격 JSON 을 가격 저장소에서 다시 생성 (손상 파일 복구)
+            for year_month in sys.argv[2:]:
+                storage.export_prices_json(year_month)
         else:
             print("사용법: python scheduler.py [명령어]")
             print("")
@@ -848,14 +1217,23 @@ if __name__ == "__main__":
             print("  init      - 초기 데이터 수집 (최초 1회)")
             print("  daily     - 일별 데이터 수집 (오늘만)")
             print("  weekly    - 주간 데이터 수집 (테마, 종목)")
-            print("  quarterly - 분기 데이터 수집 (재무)")
+            print("  quarterly - 분기 데이터 수집 (재무, 변경 종목만 / --full: 전체)")
             print("  kosdaq    - 코스닥 종목만 수집 (기존 데이터에 추가)")
             print("  update    - 마지막 저장일 이후 ~ 오늘까지 데이터 수집")
+            print("  backfill  - 누락된 종목/날짜 칸만 다시 수집 (--dry-run: 검사만)")
             print("  add       - 개별 종목 추가 (테마 없이)")
             print("  all       - 전체 종목 수집 (KOSPI+KOSDAQ, 기존 제외)")
+            print("  resume    - 중단된 init/all 수집 이어서 실행")
+            print("  calc      - 테마 지표 계산 (theme_metrics.json)")
+            print("  compact   - 일별 가격 변경분을 월별 파일로 압축")
+            print("  bundle    - 웹 데이터 묶음 생성 (bundle.json, calc 시 자동 생성)")
+            print("  export    - 월별 가격 JSON 다시 생성 (가격 저장소 기준, 예: export 2025-01)")
             print("")
             print("예시:")
             print("  python scheduler.py add 005930 000660  # 삼성전자, SK하이닉스 추가")
             print("  python scheduler.py all               # 전체 시장 종목 수집")
+            print("")
+            print("시뮬레이터 (키움 없이 web/data 기록으로 실행):")
+            print("  KIWOOM_BACKEND=sim KIWOOM_SIM_LATENCY=0.05 THEMA_DATA_PATH=/tmp/thema python scheduler.py init")
     else:
         start_scheduler()
\ No newline at end of file
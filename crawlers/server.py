@@ -1,116 +1,236 @@
 """
 크롤링 API 서버
 웹 UI에서 버튼 클릭으로 크롤러 실행
+- 수집 작업은 작업 큐에서 하나씩 실행 (job_manager.py), 진행 상황은 SSE 로 전송
+- 읽기 전용 조회 API (/api/themes, /api/stocks, /api/search): 메모리 캐시 + ETag
 """
-from flask import Flask, jsonify
+from flask import Flask, Response, jsonify, request
 from flask_cors import CORS
-import threading
+import hashlib
+import json
 import sys
 import os
+from datetime import datetime, timedelta
 
 # 현재 디렉토리를 path에 추가
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+# 프로젝트 루트를 path에 추가 (backend 모듈)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from scheduler import (
+    keep_kiwoom_session,
     run_daily_crawler,
     run_weekly_crawler,
     run_quarterly_crawler,
     run_initial_crawl
 )
+from backend import history_recorder
+from job_manager import get_job_manager
+from kiwoom.metrics import TR_METRICS
+from query_cache import PERIODS, QueryCache
+import storage
 
 app = Flask(__name__)
 CORS(app)  # 웹에서 API 호출 허용
 
-# 크롤링 상태 관리
-crawl_status = {
-    "running": False,
-    "type": None,
-    "message": ""
+# 수집 작업 큐 (작업 스레드 1개 - 키움 세션은 한 번에 하나만)
+jobs = get_job_manager()
+
+# 키움 세션 (작업 스레드에서 첫 작업 시 로그인, 이후 작업은 로그인 재사용)
+kiwoom_session = keep_kiwoom_session()
+
+# 작업 종류: (표시 이름, 실행 함수)
+CRAWL_JOBS = {
+    "daily": ("일별", run_daily_crawler),
+    "weekly": ("주간", run_weekly_crawler),
+    "quarterly": ("분기", run_quarterly_crawler),
+    "init": ("초기", run_initial_crawl),
 }
 
+# 조회 API 캐시 (저장 파일이 바뀌면 다시 로드)
+query_cache = QueryCache()
 
-def run_crawler_async(crawler_func, crawler_type):
-    """비동기로 크롤러 실행"""
-    global crawl_status
+# SSE 연결 유지용 주석 간격 (초)
+SSE_KEEPALIVE = 15
 
-    crawl_status["running"] = True
-    crawl_status["type"] = crawler_type
-    crawl_status["message"] = f"{crawler_type} 크롤링 진행 중..."
 
-    try:
-        crawler_func()
-        crawl_status["message"] = f"{crawler_type} 크롤링 완료!"
-    except Exception as e:
-        crawl_status["message"] = f"{crawler_type} 크롤링 실패: {str(e)}"
-    finally:
-        crawl_status["running"] = False
-        crawl_status["type"] = None
+@app.errorhandler(storage.CorruptedFileError)
+def corrupted_file(e):
+    """
+    저장 파일 손상 (체크섬 불일치/JSON 파싱 실패): 503 + 파일 경로와 복구 방법
+    - 복구 후 다음 요청부터 정상 응답 (조회 캐시는 파일 변경 시 다시 로드)
+    """
+    print(f"저장 파일 손상: {e}")
+    return jsonify({
+        "error": f"저장 파일 손상: {os.path.relpath(e.filepath, storage.BASE_PATH)}",
+        "file": e.filepath,
+        "recovery": e.recovery,
+    }), 503
 
 
 @app.route("/api/status", methods=["GET"])
 def get_status():
-    """현재 크롤링 상태 확인"""
-    return jsonify(crawl_status)
-
-
-@app.route("/api/crawl/daily", methods=["POST"])
-def crawl_daily():
-    """일별 크롤링 실행 (가격 + 시장)"""
-    if crawl_status["running"]:
-        return jsonify({"error": "이미 크롤링 진행 중", "status": crawl_status}), 400
-
-    thread = threading.Thread(
-        target=run_crawler_async,
-        args=(run_daily_crawler, "일별")
-    )
-    thread.start()
+    """현재 크롤링 상태 확인 {"running", "type", "message", "job"}"""
+    return jsonify(jobs.status())
 
-    return jsonify({"message": "일별 크롤링 시작", "status": crawl_status})
 
+@app.route("/api/crawl/<job_type>", methods=["POST"])
+def crawl(job_type):
+    """
+    크롤링 작업 등록 (daily: 가격+시장, weekly: 테마+종목, quarterly: 재무, init: 전체)
+    - 실행 중인 작업이 있으면 대기열에 추가, 같은 종류가 대기/실행 중이면 409
+    """
+    if job_type not in CRAWL_JOBS:
+        return jsonify({"error": f"알 수 없는 작업: {job_type}"}), 404
 
-@app.route("/api/crawl/weekly", methods=["POST"])
-def crawl_weekly():
-    """주간 크롤링 실행 (테마 + 종목)"""
-    if crawl_status["running"]:
-        return jsonify({"error": "이미 크롤링 진행 중", "status": crawl_status}), 400
+    label, func = CRAWL_JOBS[job_type]
+    job, created = jobs.submit(job_type, label, func)
+    if not created:
+        return jsonify({"error": f"이미 {label} 크롤링 대기/진행 중", "job": job}), 409
 
-    thread = threading.Thread(
-        target=run_crawler_async,
-        args=(run_weekly_crawler, "주간")
-    )
-    thread.start()
+    return jsonify({"message": f"{label} 크롤링 등록", "job": job}), 202
 
-    return jsonify({"message": "주간 크롤링 시작", "status": crawl_status})
 
+@app.route("/api/jobs", methods=["GET"])
+def list_jobs():
+    """대기/실행 중 + 최근 작업, 작업 로그 (?limit=20)"""
+    try:
+        limit = int(request.args.get("limit", 20))
+    except ValueError:
+        return jsonify({"error": "limit 는 정수"}), 400
+    return jsonify({"jobs": jobs.list(), "log": storage.load_job_log(limit)})
+
+
+@app.route("/api/jobs/<job_id>", methods=["GET"])
+def get_job(job_id):
+    """작업 상태 (단계별 소요 시간, 진행 종목 수)"""
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": f"작업 없음: {job_id}"}), 404
+    return jsonify(job)
+
+
+@app.route("/api/jobs/stream", methods=["GET"])
+def stream_jobs():
+    """
+    작업 상태 스트림 (Server-Sent Events)
+    - 상태가 바뀔 때마다 /api/status 와 같은 형식 전송
+    """
+    def events():
+        version = -1
+        while True:
+            changed = jobs.wait_for_change(version, SSE_KEEPALIVE)
+            if changed == version:
+                yield ": keepalive\n\n"
+                continue
+            version = changed
+            yield f"data: {json.dumps(jobs.status(), ensure_ascii=False)}\n\n"
+
+    return Response(events(), mimetype="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+@app.route("/api/history/<theme_id>", methods=["GET"])
+def get_theme_history(theme_id):
+    """
+    테마 일별 기록 조회 (요청 기간의 월 파일만 읽음)
+    - ?from=2025-01-01&to=2025-01-31 또는 ?days=30 (마지막 기록일 기준, 기본 30일)
+    """
+    end_date = request.args.get("to") or storage.load_history_state().get("date") or datetime.now().strftime("%Y-%m-%d")
+    start_date = request.args.get("from")
+    try:
+        end = datetime.strptime(end_date, "%Y-%m-%d")
+        if start_date:
+            datetime.strptime(start_date, "%Y-%m-%d")
+        else:
+            days = int(request.args.get("days", 30))
+            start_date = (end - timedelta(days=days - 1)).strftime("%Y-%m-%d")
+    except ValueError:
+        return jsonify({"error": "날짜는 YYYY-MM-DD, days 는 정수"}), 400
+
+    return jsonify({
+        "theme": theme_id,
+        "from": start_date,
+        "to": end_date,
+        "rows": history_recorder.load_theme_history(theme_id, start_date, end_date)
+    })
+
+
+def cached_json(build):
+    """
+    조회 응답 (ETag = 데이터 세대 + 요청 경로)
+    - If-None-Match 가 같으면 본문 없이 304
+    - 같은 세대의 같은 요청은 계산 결과 재사용
+    """
+    generation = query_cache.refresh()
+    key = request.full_path
+    etag = f"{generation}-{hashlib.sha1(key.encode('utf-8')).hexdigest()[:8]}"
+
+    if etag in request.if_none_match:
+        response = Response(status=304)
+    else:
+        response = jsonify(query_cache.response(key, build))
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+@app.route("/api/themes", methods=["GET"])
+def list_themes():
+    """
+    테마 순위 (미리 계산된 지표, 순위순)
+    - ?period=3w|6w|9w (기본 3w), ?stage=2 또는 ?stage=정리
+    """
+    period = request.args.get("period", "3w")
+    if period not in PERIODS:
+        return jsonify({"error": f"period 는 {', '.join(PERIODS)} 중 하나"}), 400
+    stage = request.args.get("stage")
+
+    return cached_json(lambda: {
+        "date": query_cache.date,
+        "period": period,
+        "themes": query_cache.list_themes(period, stage),
+    })
+
+
+@app.route("/api/themes/<theme_id>", methods=["GET"])
+def get_theme(theme_id):
+    """테마 상세 (종목별 지표, 단계 변화 이벤트 포함)"""
+    query_cache.refresh()
+    if query_cache.get_theme(theme_id) is None:
+        return jsonify({"error": f"테마 없음: {theme_id}"}), 404
+    return cached_json(lambda: {"date": query_cache.date, "theme": query_cache.get_theme(theme_id)})
+
+
+@app.route("/api/stocks/<code>/history", methods=["GET"])
+def get_stock_history(code):
+    """종목 가격 기록 (?days=70 최근 거래일 수) + 포함 테마 + 지표"""
+    try:
+        days = int(request.args.get("days", storage.GAP_SCAN_SESSIONS))
+    except ValueError:
+        return jsonify({"error": "days 는 정수"}), 400
 
-@app.route("/api/crawl/quarterly", methods=["POST"])
-def crawl_quarterly():
-    """분기 크롤링 실행 (재무)"""
-    if crawl_status["running"]:
-        return jsonify({"error": "이미 크롤링 진행 중", "status": crawl_status}), 400
-
-    thread = threading.Thread(
-        target=run_crawler_async,
-        args=(run_quarterly_crawler, "분기")
-    )
-    thread.start()
-
-    return jsonify({"message": "분기 크롤링 시작", "status": crawl_status})
+    query_cache.refresh()
+    if code not in query_cache.stocks and code not in query_cache.price_store.code_index:
+        return jsonify({"error": f"종목 없음: {code}"}), 404
+    return cached_json(lambda: query_cache.stock_history(code, days))
 
 
-@app.route("/api/crawl/init", methods=["POST"])
-def crawl_init():
-    """초기 크롤링 실행 (전체)"""
-    if crawl_status["running"]:
-        return jsonify({"error": "이미 크롤링 진행 중", "status": crawl_status}), 400
+@app.route("/api/search", methods=["GET"])
+def search():
+    """종목(이름/코드) + 테마(이름) 검색 (?q=)"""
+    query = request.args.get("q", "")
+    return cached_json(lambda: query_cache.search(query))
 
-    thread = threading.Thread(
-        target=run_crawler_async,
-        args=(run_initial_crawl, "초기")
-    )
-    thread.start()
 
-    return jsonify({"message": "초기 크롤링 시작", "status": crawl_status})
+@app.route("/api/metrics", methods=["GET"])
+def get_metrics():
+    """
+    TR 요청 계측 (크롤링 진행 중에도 조회 가능)
+    - 기본 JSON, ?format=prometheus 이면 Prometheus 텍스트
+    """
+    if request.args.get("format") == "prometheus":
+        return Response(TR_METRICS.to_prometheus(), mimetype="text/plain; version=0.0.4")
+    return jsonify({"status": jobs.status(), "session": kiwoom_session.status(), **TR_METRICS.snapshot()})
 
 
 if __name__ == "__main__":
@@ -120,5 +240,15 @@ if __name__ == "__main__":
     print("  - POST /api/crawl/weekly  : 주간 크롤링 (테마, 종목)")
     print("  - POST /api/crawl/quarterly: 분기 크롤링 (재무)")
     print("  - POST /api/crawl/init    : 초기 크롤링 (전체)")
+    print("  - GET  /api/jobs          : 작업 대기열 + 작업 로그")
+    print("  - GET  /api/jobs/<id>     : 작업 상태 (단계별 소요 시간, 진행률)")
+    print("  - GET  /api/jobs/stream   : 작업 상태 스트림 (SSE)")
+    print("  - GET  /api/history/<id>  : 테마 일별 기록 (?from=&to= 또는 ?days=30)")
+    print("  - GET  /api/metrics       : TR 요청 계측 (?format=prometheus)")
+    print("  - GET  /api/themes        : 테마 순위 (?period=3w&stage=2)")
+    print("  - GET  /api/themes/<id>   : 테마 상세")
+    print("  - GET  /api/stocks/<code>/history : 종목 가격 기록 (?days=70)")
+    print("  - GET  /api/search        : 종목/테마 검색 (?q=)")
     print()
-    app.run(host="0.0.0.0", port=5000, debug=True)
+    # 리로더 사용 안 함: 리로더 감시 프로세스도 모듈을 실행해 작업 스레드(job_manager)가 2개 생김
+    app.run(host="0.0.0.0", port=5000, debug=True, use_reloader=False)
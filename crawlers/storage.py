@@ -2,13 +2,88 @@
 JSON 파일 저장 유틸리티
 - 데이터_정의.md 스키마에 맞게 저장
 """
+import gzip
+import hashlib
 import json
 import os
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
 
-# 기본 저장 경로
-BASE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "web", "data")
+import numpy as np
+
+try:
+    import brotli
+    HAS_BROTLI = True
+except ImportError:
+    HAS_BROTLI = False
+
+from io_metrics import STORAGE_IO
+from price_store import PriceStore
+from trading_calendar import TradingCalendar
+
+# 기본 저장 경로 (THEMA_DATA_PATH 환경변수로 변경 가능 - 시뮬레이터 실행 등)
+BASE_PATH = os.environ.get("THEMA_DATA_PATH") or os.path.join(os.path.dirname(os.path.dirname(__file__)), "web", "data")
+
+# 컬럼형 가격 저장소 경로 (크롤러/계산기 전용, 웹은 월별 JSON 사용)
+PRICE_STORE_PATH = os.path.join(BASE_PATH, "prices", "store")
+
+# 일별 가격 변경분 로그 경로 (prices/deltas/YYYY-MM-DD.jsonl)
+PRICE_DELTA_PATH = os.path.join(BASE_PATH, "prices", "deltas")
+
+# 체크섬 파일 확장자 (data.json -> data.json.sha256)
+CHECKSUM_SUFFIX = ".sha256"
+
+_price_store = None
+_trading_calendar = None
+_trading_calendar_stat = None  # 마지막으로 로드/저장한 calendar.json (mtime, 크기)
+
+
+# 손상 파일 복구 방법 (BASE_PATH 기준 경로 앞부분, 안내 - {month}: 월별 파일의 "YYYY-MM")
+# 데이터_정의.md "손상 파일 복구" 참고
+RECOVERY_HINTS = [
+    ("stocks.json", "python scheduler.py weekly (종목/테마 다시 수집)"),
+    ("themes.json", "python scheduler.py weekly (종목/테마 다시 수집)"),
+    ("theme_index.json", "python scheduler.py weekly (종목/테마 다시 수집)"),
+    ("market.json", "python scheduler.py weekly (시장 기준 정보 다시 수집)"),
+    ("financial", "손상 파일과 .sha256 삭제 후 python scheduler.py quarterly --full (재무 데이터 전체 재수집)"),
+    ("theme_metrics.json", "python scheduler.py calc (테마 지표 재계산)"),
+    ("calendar.json", "calendar.json 과 calendar.json.sha256 삭제 (가격 저장소 날짜로 다시 생성)"),
+    ("history/state.json", "history/state.json 과 .sha256 삭제 (다음 일별 작업에서 다시 기록)"),
+    ("prices/", "python scheduler.py export {month} (가격 저장소에서 월별 파일 다시 생성)"),
+    ("bundle.json", "python scheduler.py bundle (웹 데이터 묶음 다시 생성)"),
+    ("progress/", "progress/ 의 해당 파일 삭제 후 처음부터 다시 수집 (이어하기 불가)"),
+]
+DEFAULT_RECOVERY_HINT = "백업(git 에 커밋된 web/data 등)에서 복원"
+
+
+class CorruptedFileError(ValueError):
+    """저장된 파일이 체크섬과 일치하지 않음 (쓰기 도중 중단 등)"""
+
+    def __init__(self, message: str, filepath: str):
+        super().__init__(message)
+        self.filepath = filepath
+
+    @property
+    def recovery(self) -> str:
+        """복구 방법 안내"""
+        return recovery_hint(self.filepath)
+
+
+def recovery_hint(filepath: str) -> str:
+    """
+    손상 파일 복구 방법
+
+    Args:
+        filepath: 손상된 파일 경로
+
+    Returns:
+        "python scheduler.py weekly (종목/테마 다시 수집)" 등
+    """
+    relative = os.path.relpath(filepath, BASE_PATH).replace(os.sep, "/")
+    for prefix, hint in RECOVERY_HINTS:
+        if relative.startswith(prefix):
+            return hint.format(month=os.path.basename(relative)[:7])
+    return DEFAULT_RECOVERY_HINT
 
 
 def ensure_dir(path: str):
@@ -16,23 +91,103 @@ def ensure_dir(path: str):
     os.makedirs(path, exist_ok=True)
 
 
-def save_json(filepath: str, data: Any):
-    """JSON 파일 저장"""
+def _write_file(filepath: str, content: bytes):
+    """파일 기록 + 디스크 동기화"""
+    with open(filepath, "wb") as f:
+        f.write(content)
+        f.flush()
+        os.fsync(f.fileno())
+    STORAGE_IO.add_write(len(content))
+
+
+def save_json(filepath: str, data: Any, compact: bool = False):
+    """
+    JSON 파일 저장 (임시 파일 + 원자적 rename)
+
+    - 쓰기 도중 프로세스가 죽어도 기존 파일은 그대로 유지됨
+    - 체크섬 파일(.sha256)을 함께 기록하여 load_json에서 검증
+
+    Args:
+        filepath: 저장 경로
+        data: 저장할 데이터
+        compact: True면 들여쓰기/공백 없이 저장 (대용량 파일용)
+    """
     ensure_dir(os.path.dirname(filepath))
-    with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+
+    if compact:
+        text = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    else:
+        text = json.dumps(data, ensure_ascii=False, indent=2)
+    content = text.encode("utf-8")
+    checksum = hashlib.sha256(content).hexdigest()
+
+    checksum_path = filepath + CHECKSUM_SUFFIX
+    tmp_path = filepath + ".tmp"
+    tmp_checksum_path = checksum_path + ".tmp"
+
+    # 1) 새 내용과 체크섬을 임시 파일로 기록
+    _write_file(tmp_path, content)
+    _write_file(tmp_checksum_path, checksum.encode("ascii"))
+
+    # 2) 본 파일 -> 체크섬 순서로 교체
+    #    (사이에 중단되면 load_json이 .sha256.tmp 로 검증)
+    os.replace(tmp_path, filepath)
+    os.replace(tmp_checksum_path, checksum_path)
+    _fsync_dir(os.path.dirname(filepath))
+
     print(f"저장 완료: {filepath}")
 
 
+def _fsync_dir(path: str):
+    """rename 결과를 디스크에 반영 (디렉토리 fsync 미지원 OS는 무시)"""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _read_checksums(filepath: str) -> List[str]:
+    """기록된 체크섬 목록 (확정본 + 교체 대기본)"""
+    checksums = []
+    for path in (filepath + CHECKSUM_SUFFIX, filepath + CHECKSUM_SUFFIX + ".tmp"):
+        if os.path.exists(path):
+            with open(path, "r", encoding="ascii") as f:
+                checksum = f.read()
+            STORAGE_IO.add_read(len(checksum))
+            checksums.append(checksum.strip())
+    return checksums
+
+
 def load_json(filepath: str) -> Any:
-    """JSON 파일 로드"""
+    """
+    JSON 파일 로드 (체크섬 파일이 있으면 검증)
+
+    Raises:
+        CorruptedFileError: 체크섬 불일치 또는 JSON 파싱 실패
+    """
     if not os.path.exists(filepath):
         return None
-    with open(filepath, "r", encoding="utf-8") as f:
-        content = f.read().strip()
-        if not content:
-            return None
-        return json.loads(content)
+    with open(filepath, "rb") as f:
+        content = f.read()
+    STORAGE_IO.add_read(len(content))
+
+    checksums = _read_checksums(filepath)
+    if checksums and hashlib.sha256(content).hexdigest() not in checksums:
+        raise CorruptedFileError(f"체크섬 불일치: {filepath}", filepath)
+
+    text = content.decode("utf-8").strip()
+    if not text:
+        return None
+    try:
+        return json.loads(text)
+    except ValueError as e:
+        raise CorruptedFileError(f"JSON 파싱 실패: {filepath} ({e})", filepath)
 
 
 # ============================================
@@ -74,6 +229,9 @@ def save_themes(themes: List[Dict]):
     filepath = os.path.join(BASE_PATH, "themes.json")
     save_json(filepath, {"themes": themes})
 
+    # 테마 구성이 바뀔 때 역색인도 함께 갱신
+    save_theme_index(themes)
+
 
 def load_themes() -> List[Dict]:
     """테마 매핑 로드"""
@@ -82,6 +240,69 @@ def load_themes() -> List[Dict]:
     return data.get("themes", []) if data else []
 
 
+# ============================================
+# theme_index.json - 종목 → 테마 역색인 (정수 ID 인코딩)
+# ============================================
+def build_theme_index(themes: List[Dict]) -> Dict:
+    """
+    테마 매핑으로 역색인 생성
+    - 종목/테마를 정수 ID 로 바꿔 종목코드 중복 없이 저장
+
+    Args:
+        themes: save_themes 형식
+
+    Returns:
+        {
+            "codes": ["000660", "005930", ...],      # 종목 ID -> 종목코드
+            "themes": ["T001", "T002", ...],         # 테마 ID -> 테마 ID(themes.json)
+            "members": [[1, 5, ...], ...],           # 테마 ID -> 종목 ID (themes.json 종목 순서)
+            "stock_themes": [[0, 3], [0], ...]       # 종목 ID -> 테마 ID
+        }
+    """
+    codes = sorted({code for theme in themes for code in theme["stocks"]})
+    code_index = {code: i for i, code in enumerate(codes)}
+
+    members = [[code_index[code] for code in theme["stocks"]] for theme in themes]
+    stock_themes: List[List[int]] = [[] for _ in codes]
+    for t, stock_ids in enumerate(members):
+        for stock_id in stock_ids:
+            if not stock_themes[stock_id] or stock_themes[stock_id][-1] != t:
+                stock_themes[stock_id].append(t)
+
+    return {
+        "codes": codes,
+        "themes": [theme["id"] for theme in themes],
+        "members": members,
+        "stock_themes": stock_themes,
+    }
+
+
+def save_theme_index(themes: List[Dict]):
+    """역색인 생성 후 저장 (theme_index.json, compact)"""
+    filepath = os.path.join(BASE_PATH, "theme_index.json")
+    save_json(filepath, build_theme_index(themes), compact=True)
+
+
+def load_theme_index() -> Dict:
+    """역색인 로드 (없으면 themes.json 으로 생성)"""
+    filepath = os.path.join(BASE_PATH, "theme_index.json")
+    return load_json(filepath) or build_theme_index(load_themes())
+
+
+def load_stock_themes() -> Dict[str, List[str]]:
+    """
+    종목별 포함 테마 (역색인 디코딩)
+
+    Returns:
+        {"005930": ["T001", "T005"], ...}
+    """
+    index = load_theme_index()
+    return {
+        code: [index["themes"][t] for t in theme_ids]
+        for code, theme_ids in zip(index["codes"], index["stock_themes"])
+    }
+
+
 # ============================================
 # market.json - 시장 데이터 (시총, 주식수, PER, PBR)
 # ============================================
@@ -108,28 +329,230 @@ def load_market() -> Dict:
 
 # ============================================
 # financial.json - 재무 데이터 (매출, 영업이익)
+# - financial.json: 종목별 최근 실적 분기 데이터 (웹 사용)
+# - financial/history.json: 종목별 분기/연간 실적 시계열
+# - financial/fingerprints.json: 종목별 재무정보 지문 (변경 감지)
 # ============================================
+FINANCIAL_FIELDS = ("revenue", "operating_profit")
+FINANCIAL_KINDS = ("quarterly", "annual")
+
+
 def save_financial(quarter: str, data: Dict[str, Dict]):
     """
-    재무 데이터 저장
+    재무 데이터 저장 (기존 데이터에 병합)
+    - 종목별 실적 시계열(history + 최근 실적 분기)을 financial/history.json 에 병합
+    - financial.json 은 종목별로 더 최근(같은) 분기 데이터로 교체
+    - fingerprint 가 있으면 지문 파일 갱신 (확인일 = 오늘)
 
     Args:
-        quarter: "2024-Q3"
+        quarter: "2024-Q3" (수집 기준 분기, period 가 없는 데이터에 사용)
         data: {
-            "005930": {"revenue": 79000000000000, "operating_profit": 9180000000000},
+            "005930": {"period": "2024-Q3", "revenue": 79000000000000, "operating_profit": 9180000000000,
+                       "history": {"quarterly": {...}, "annual": {...}}, "fingerprint": "3f2a..."},
             ...
         }
     """
+    today = datetime.now().strftime("%Y-%m-%d")
+    latest_records = {}
+    history = {}
+    fingerprints = {}
+
+    for code, record in data.items():
+        record = dict(record)
+        fingerprint = record.pop("fingerprint", None)
+        stock_history = record.pop("history", None) or {}
+        period = record.get("period") or quarter
+        record["period"] = period
+        latest_records[code] = record
+
+        quarterly = dict(stock_history.get("quarterly", {}))
+        quarterly[period] = {field: record.get(field) for field in FINANCIAL_FIELDS}
+        history[code] = {"quarterly": quarterly, "annual": stock_history.get("annual", {})}
+
+        if fingerprint:
+            fingerprints[code] = {"period": period, "hash": fingerprint, "checked": today}
+
+    merge_financial_history(history)
+
+    # 최신 스냅샷
+    latest = load_financial()["data"]
+    for code, record in latest_records.items():
+        if record["period"] >= latest.get(code, {}).get("period", ""):
+            latest[code] = record
+
+    periods = [record["period"] for record in latest.values() if record.get("period")]
     filepath = os.path.join(BASE_PATH, "financial.json")
-    save_json(filepath, {"quarter": quarter, "data": data})
+    save_json(filepath, {"quarter": max(periods) if periods else quarter, "data": latest})
+
+    if fingerprints:
+        stored_fingerprints = load_financial_fingerprints()
+        stored_fingerprints.update(fingerprints)
+        save_financial_fingerprints(stored_fingerprints)
 
 
 def load_financial() -> Dict:
-    """재무 데이터 로드"""
+    """재무 데이터 로드 (종목별 최근 실적 분기)"""
     filepath = os.path.join(BASE_PATH, "financial.json")
     return load_json(filepath) or {"quarter": None, "data": {}}
 
 
+# ============================================
+# financial/history.json - 재무 시계열
+# {
+#   "periods": {"quarterly": ["2024-Q4", "2025-Q1", ...], "annual": ["2022", "2023", ...]},
+#   "data": {"005930": {"quarterly": {"revenue": [...], "operating_profit": [...]}, "annual": {...}}}
+# }
+# - 배열은 periods 순서에 맞춘 값 (원), 데이터 없음 = null
+# ============================================
+def get_financial_history_filepath() -> str:
+    """재무 시계열 파일 경로 반환"""
+    return os.path.join(BASE_PATH, "financial", "history.json")
+
+
+def load_financial_history() -> Dict:
+    """재무 시계열 로드"""
+    history = load_json(get_financial_history_filepath()) or {}
+    history.setdefault("periods", {kind: [] for kind in FINANCIAL_KINDS})
+    history.setdefault("data", {})
+    return history
+
+
+def merge_financial_history(data: Dict[str, Dict]):
+    """
+    종목별 실적을 재무 시계열에 병합 (같은 기간 값은 새 값으로 교체 - 정정 공시 반영)
+
+    Args:
+        data: {"005930": {"quarterly": {"2025-Q3": {"revenue": ..., "operating_profit": ...}}, "annual": {...}}}
+    """
+    if not data:
+        return
+
+    history = load_financial_history()
+
+    for kind in FINANCIAL_KINDS:
+        old_periods = history["periods"].get(kind, [])
+        new_periods = set(old_periods)
+        for stock in data.values():
+            new_periods.update(stock.get(kind, {}))
+        periods = sorted(new_periods)
+        history["periods"][kind] = periods
+
+        # 기간이 추가되었으면 기존 배열을 새 기간 순서로 재배치
+        if periods != old_periods:
+            position = [periods.index(period) for period in old_periods]
+            for stock in history["data"].values():
+                series = stock.get(kind)
+                if not series:
+                    continue
+                for field in FINANCIAL_FIELDS:
+                    values = [None] * len(periods)
+                    for i, value in zip(position, series.get(field, [])):
+                        values[i] = value
+                    series[field] = values
+
+        period_index = {period: i for i, period in enumerate(periods)}
+        for code, stock in data.items():
+            points = stock.get(kind)
+            if not points:
+                continue
+            series = history["data"].setdefault(code, {}).setdefault(
+                kind, {field: [None] * len(periods) for field in FINANCIAL_FIELDS}
+            )
+            for period, point in points.items():
+                for field in FINANCIAL_FIELDS:
+                    series[field][period_index[period]] = point.get(field)
+
+    ensure_dir(os.path.join(BASE_PATH, "financial"))
+    save_json(get_financial_history_filepath(), history, compact=True)
+
+
+def load_financial_series(
+    stock_codes: List[str] = None,
+    kind: str = "quarterly",
+    periods: List[str] = None
+) -> Tuple[List[str], List[str], np.ndarray, np.ndarray]:
+    """
+    여러 종목 재무 시계열을 기간 축을 맞춘 배열로 조회 (성장률 등 벡터 계산용)
+
+    Args:
+        stock_codes: 종목코드 리스트 (None 이면 전체)
+        kind: "quarterly" 또는 "annual"
+        periods: 조회 기간 ["2024-Q3", "2025-Q3"] (None 이면 전체)
+
+    Returns:
+        (periods, codes, revenue, operating_profit)
+        - revenue/operating_profit: (기간 × 종목) float64 배열 (원), 데이터 없으면 NaN
+
+    예) 전년 동기 대비 매출 성장률:
+        periods, codes, revenue, _ = load_financial_series(codes)
+        growth = revenue[4:] / revenue[:-4] - 1
+    """
+    if kind not in FINANCIAL_KINDS:
+        raise ValueError(f"kind 는 {FINANCIAL_KINDS} 중 하나: {kind}")
+
+    history = load_financial_history()
+    stored_periods = history["periods"].get(kind, [])
+    if periods is None:
+        periods = stored_periods
+    if stock_codes is None:
+        stock_codes = sorted(history["data"])
+
+    period_index = {period: i for i, period in enumerate(stored_periods)}
+    columns = np.array([period_index.get(period, -1) for period in periods], dtype=np.int64)
+    found = columns >= 0
+
+    arrays = {}
+    for field in FINANCIAL_FIELDS:
+        matrix = np.full((len(periods), len(stock_codes)), np.nan)
+        for j, code in enumerate(stock_codes):
+            series = history["data"].get(code, {}).get(kind)
+            if not series:
+                continue
+            values = np.array(series[field], dtype=np.float64)  # null -> nan
+            matrix[found, j] = values[columns[found]]
+        arrays[field] = matrix
+
+    return list(periods), list(stock_codes), arrays["revenue"], arrays["operating_profit"]
+
+
+def load_financial_quarter(period: str) -> Dict[str, Dict]:
+    """
+    분기별 재무 데이터 {"005930": {"period", "revenue", "operating_profit"}}
+    - 값이 없는 항목은 None (둘 다 없으면 종목 제외)
+    """
+    periods, codes, revenue, operating_profit = load_financial_series(periods=[period])
+
+    def value(x):
+        return None if np.isnan(x) else int(x)
+
+    return {
+        code: {"period": period, "revenue": value(revenue[0, j]), "operating_profit": value(operating_profit[0, j])}
+        for j, code in enumerate(codes)
+        if not (np.isnan(revenue[0, j]) and np.isnan(operating_profit[0, j]))
+    }
+
+
+def list_financial_quarters() -> List[str]:
+    """보관된 분기 목록 (오래된 순)"""
+    return load_financial_history()["periods"].get("quarterly", [])
+
+
+def save_financial_fingerprints(fingerprints: Dict[str, Dict]):
+    """
+    재무정보 지문 저장
+
+    Args:
+        fingerprints: {"005930": {"period": "2024-Q3", "hash": "3f2a...", "checked": "2024-11-20"}, ...}
+    """
+    ensure_dir(os.path.join(BASE_PATH, "financial"))
+    save_json(os.path.join(BASE_PATH, "financial", "fingerprints.json"), fingerprints, compact=True)
+
+
+def load_financial_fingerprints() -> Dict[str, Dict]:
+    """재무정보 지문 로드"""
+    return load_json(os.path.join(BASE_PATH, "financial", "fingerprints.json")) or {}
+
+
 # ============================================
 # prices/YYYY-MM.json - 월별 가격 데이터
 # ============================================
@@ -152,14 +575,42 @@ def save_prices(year_month: str, data: Dict[str, Dict]):
             ...
         }
     """
+    get_price_store().write_prices(data)
+    _save_prices_json(year_month, data)
+    add_trading_dates(date for dates in data.values() for date in dates)
+
+    # 월 전체를 덮어썼으므로 해당 월 변경분은 폐기
+    _remove_price_deltas(list_price_delta_dates(year_month))
+
+
+def _save_prices_json(year_month: str, data: Dict[str, Dict]):
+    """월별 가격 JSON 저장 (웹 UI용)"""
     filepath = get_price_filepath(year_month)
-    save_json(filepath, data)
+    save_json(filepath, data, compact=True)
 
 
 def load_prices(year_month: str) -> Dict[str, Dict]:
-    """월별 가격 데이터 로드"""
+    """월별 가격 데이터 로드 (아직 압축되지 않은 일별 변경분 포함)"""
     filepath = get_price_filepath(year_month)
-    return load_json(filepath) or {}
+    data = load_json(filepath) or {}
+
+    for stock_code, dates in load_price_deltas(year_month).items():
+        if stock_code not in data:
+            data[stock_code] = {}
+        data[stock_code].update(dates)
+
+    return data
+
+
+def list_price_months() -> List[str]:
+    """저장된 월별 가격 파일 목록 (오름차순)"""
+    prices_dir = os.path.join(BASE_PATH, "prices")
+    if not os.path.isdir(prices_dir):
+        return []
+    return sorted(
+        name[:-5] for name in os.listdir(prices_dir)
+        if name.endswith(".json")
+    )
 
 
 def add_daily_prices(date: str, prices: Dict[str, Dict]):
@@ -173,30 +624,49 @@ def add_daily_prices(date: str, prices: Dict[str, Dict]):
             ...
         }
     """
-    year_month = date[:7]  # "2025-01-20" -> "2025-01"
+    # 컬럼형 저장소에 한 행 추가
+    get_price_store().append_day(date, prices)
 
-    # 기존 데이터 로드
-    existing = load_prices(year_month)
+    # 일별 변경분 로그에 추가 (월별 JSON은 압축 시 갱신)
+    append_price_delta(date, prices)
+    add_trading_dates([date])
+    print(f"{date} 가격 데이터 {len(prices)}개 종목 추가 완료")
 
-    # 각 종목별로 해당 날짜 데이터 추가
-    for stock_code, price_data in prices.items():
-        if stock_code not in existing:
-            existing[stock_code] = {}
-        existing[stock_code][date] = price_data
 
-    # 저장
-    save_prices(year_month, existing)
-    print(f"{date} 가격 데이터 {len(prices)}개 종목 추가 완료")
+def merge_monthly_prices(monthly_prices: Dict[str, Dict[str, Dict]]):
+    """
+    월별로 묶인 가격 데이터를 기존 데이터에 병합
+
+    Args:
+        monthly_prices: {"2025-01": {"005930": {"2025-01-20": {...}}}, ...}
+    """
+    # 한 번에 기록 (중간 날짜 삽입 시 재작성이 한 번만 일어나도록)
+    merged = {}
+    for new_data in monthly_prices.values():
+        for code, dates in new_data.items():
+            merged.setdefault(code, {}).update(dates)
+    get_price_store().write_prices(merged)
 
+    # 날짜별 변경분 로그에 추가
+    by_date = {}
+    for code, dates in merged.items():
+        for date, price in dates.items():
+            by_date.setdefault(date, {})[code] = price
+    for date in sorted(by_date):
+        append_price_delta(date, by_date[date])
+    add_trading_dates(by_date)
 
-def load_prices_range(months: List[str]) -> Dict[str, Dict]:
+
+def load_prices_range(months: List[str], columnar: bool = False):
     """
     여러 월의 가격 데이터 병합 로드
 
     Args:
         months: ["2025-01", "2024-12", "2024-11"]
+        columnar: True면 컬럼형 저장소의 zero-copy view 반환
 
     Returns:
+        columnar=False:
         {
             "005930": {
                 "2025-01-20": {"close": 71000, "value": ...},
@@ -205,7 +675,17 @@ def load_prices_range(months: List[str]) -> Dict[str, Dict]:
             },
             ...
         }
+
+        columnar=True:
+        (dates, codes, close, value)
+        - close/value: (거래일 × 종목) int64 배열, 데이터 없으면 PriceStore.MISSING
     """
+    if columnar:
+        store = get_price_store()
+        if not months:
+            return store.load_range(end_date="")
+        return store.load_range(f"{min(months)}-01", f"{max(months)}-31")
+
     merged = {}
 
     for month in months:
@@ -218,6 +698,622 @@ def load_prices_range(months: List[str]) -> Dict[str, Dict]:
     return merged
 
 
+# ============================================
+# prices/deltas/YYYY-MM-DD.jsonl - 일별 가격 변경분 로그
+# ============================================
+def get_price_delta_filepath(date: str) -> str:
+    """일별 변경분 파일 경로 반환"""
+    return os.path.join(PRICE_DELTA_PATH, f"{date}.jsonl")
+
+
+def list_price_delta_dates(year_month: str = None) -> List[str]:
+    """
+    압축 대기 중인 변경분 날짜 목록 (오름차순)
+
+    Args:
+        year_month: 지정 시 해당 월만
+    """
+    if not os.path.isdir(PRICE_DELTA_PATH):
+        return []
+    dates = sorted(
+        name[:-6] for name in os.listdir(PRICE_DELTA_PATH)
+        if name.endswith(".jsonl")
+    )
+    if year_month:
+        dates = [d for d in dates if d.startswith(year_month)]
+    return dates
+
+
+def append_price_delta(date: str, prices: Dict[str, Dict]):
+    """
+    일별 변경분 추가 (append-only, 한 줄 = 한 종목)
+
+    Args:
+        date: "2025-01-20"
+        prices: {"005930": {"close": 71000, "value": 850000000000}, ...}
+    """
+    if not prices:
+        return
+
+    filepath = get_price_delta_filepath(date)
+    is_new = not os.path.exists(filepath)
+    ensure_dir(PRICE_DELTA_PATH)
+
+    lines = "".join(
+        json.dumps({"code": code, "close": price["close"], "value": price["value"]}, separators=(",", ":")) + "\n"
+        for code, price in prices.items()
+    )
+    # 이전 기록이 줄 중간에서 끊겼으면 새 줄에서 시작
+    if not is_new and os.path.getsize(filepath) > 0:
+        with open(filepath, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                lines = "\n" + lines
+
+    content = lines.encode("utf-8")
+    with open(filepath, "ab") as f:
+        f.write(content)
+        f.flush()
+        os.fsync(f.fileno())
+    STORAGE_IO.add_write(len(content))
+
+    if is_new:
+        _save_price_delta_index()
+
+
+def load_price_deltas(year_month: str) -> Dict[str, Dict]:
+    """
+    해당 월 변경분 로드 (같은 종목/날짜는 나중 줄 우선)
+
+    Returns:
+        {"005930": {"2025-01-20": {"close": 71000, "value": ...}}, ...}
+    """
+    merged = {}
+
+    for date in list_price_delta_dates(year_month):
+        filepath = get_price_delta_filepath(date)
+        STORAGE_IO.add_read(os.path.getsize(filepath))
+        with open(filepath, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    # 기록 도중 중단된 마지막 줄
+                    continue
+                if row["code"] not in merged:
+                    merged[row["code"]] = {}
+                merged[row["code"]][date] = {"close": row["close"], "value": row["value"]}
+
+    return merged
+
+
+def compact_price_deltas(before_month: str = None) -> List[str]:
+    """
+    변경분을 월별 JSON에 병합 후 삭제
+
+    Args:
+        before_month: 지정 시 해당 월 이전 변경분만 압축 (월말 압축용), 기본값 전체
+
+    Returns:
+        압축된 월 목록
+    """
+    dates = list_price_delta_dates()
+    months = sorted({d[:7] for d in dates if before_month is None or d[:7] < before_month})
+
+    for year_month in months:
+        month_dates = list_price_delta_dates(year_month)
+        _save_prices_json(year_month, load_prices(year_month))
+        _remove_price_deltas(month_dates)
+        print(f"  {year_month} 변경분 {len(month_dates)}일 압축 완료")
+
+    return months
+
+
+def _remove_price_deltas(dates: List[str]):
+    """변경분 파일 삭제"""
+    if not dates:
+        return
+    for date in dates:
+        os.remove(get_price_delta_filepath(date))
+    _save_price_delta_index()
+
+
+def _save_price_delta_index():
+    """웹에서 읽을 변경분 날짜 목록 저장 (prices/deltas/index.json)"""
+    save_json(os.path.join(PRICE_DELTA_PATH, "index.json"), {"dates": list_price_delta_dates()})
+
+
+# ============================================
+# prices/store - 컬럼형 가격 저장소
+# ============================================
+def get_price_store() -> PriceStore:
+    """
+    컬럼형 가격 저장소 반환 (없으면 기존 월별 JSON으로 생성)
+    - 프로세스 안에서 재사용, 다른 프로세스가 갱신했으면 메타 다시 로드
+    """
+    global _price_store
+    if _price_store is None:
+        _price_store = PriceStore(PRICE_STORE_PATH)
+        if not _price_store.exists():
+            build_price_store(_price_store)
+    else:
+        _price_store.refresh()
+    return _price_store
+
+
+def build_price_store(store: PriceStore):
+    """월별 JSON 파일로 컬럼형 저장소 생성 (최초 1회)"""
+    months = list_price_months()
+    for month in months:
+        store.write_prices(load_prices(month))
+    print(f"가격 저장소 생성: {len(months)}개월, {len(store.dates)}거래일, {len(store.codes)}개 종목")
+
+
+def export_prices_json(year_month: str):
+    """컬럼형 저장소에서 월별 가격 JSON 내보내기 (기존 JSON 파싱 없음)"""
+    store = get_price_store()
+    _save_prices_json(year_month, store.to_nested(store.dates_in_month(year_month)))
+
+
+# 누락 검사 기본 범위 (최근 N거래일, 9주 수익률 + 여유)
+GAP_SCAN_SESSIONS = 70
+
+
+def find_price_gaps(codes: List[str] = None, sessions: int = GAP_SCAN_SESSIONS) -> Dict[str, List[Tuple[str, str]]]:
+    """
+    종목별 누락 구간 검사 (컬럼형 저장소 존재 비트맵)
+    - 종목의 첫 기록 이후 ~ 마지막 거래일 사이에 종가가 없는 칸 (TR 타임아웃 등으로 빠진 칸)
+    - 첫 기록 이전(신규 상장/추가 종목)은 누락으로 보지 않음
+
+    Args:
+        codes: 검사할 종목코드 리스트 (기본값 저장소 전체 종목)
+        sessions: 검사할 최근 거래일 수
+
+    Returns:
+        {"005930": [("2025-01-16", "2025-01-17"), ...], ...}  # 연속 누락 구간 (시작일, 종료일)
+    """
+    store = get_price_store()
+    if not store.dates:
+        return {}
+
+    start_date = store.dates[max(len(store.dates) - sessions, 0)]
+    dates, store_codes, present = store.presence(start_date)
+
+    if codes is not None:
+        columns = [store.code_index[code] for code in codes if code in store.code_index]
+        present = present[:, columns]
+        store_codes = [store_codes[col] for col in columns]
+
+    # 첫 기록 이후의 빈 칸
+    missing = (np.cumsum(present, axis=0) > 0) & ~present
+
+    # 종목별 연속 구간: 위아래로 0을 덧댄 뒤 변화 지점 (+1 = 시작, -1 = 끝 다음)
+    padded = np.zeros((len(dates) + 2, len(store_codes)), dtype=np.int8)
+    padded[1:-1] = missing
+    edges = np.diff(padded, axis=0)
+    starts_col, starts_row = np.nonzero(edges.T == 1)
+    _, ends_row = np.nonzero(edges.T == -1)
+
+    gaps: Dict[str, List[Tuple[str, str]]] = {}
+    for col, start, end in zip(starts_col, starts_row, ends_row):
+        gaps.setdefault(store_codes[col], []).append((dates[start], dates[end - 1]))
+    return gaps
+
+
+# ============================================
+# calendar.json - 거래일 달력 (가격 저장 시 함께 갱신)
+# ============================================
+def _calendar_stat() -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(os.path.join(BASE_PATH, "calendar.json"))
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def get_trading_calendar() -> TradingCalendar:
+    """
+    거래일 달력 반환 (없으면 컬럼형 저장소의 날짜로 생성)
+    - 프로세스 안에서 재사용, 다른 프로세스가 calendar.json 을 갱신했으면 다시 로드
+    """
+    global _trading_calendar, _trading_calendar_stat
+    if _trading_calendar is not None and _trading_calendar_stat is not None and _calendar_stat() != _trading_calendar_stat:
+        _trading_calendar = None
+
+    if _trading_calendar is None:
+        _trading_calendar_stat = _calendar_stat()
+        data = load_json(os.path.join(BASE_PATH, "calendar.json"))
+        if data is not None:
+            _trading_calendar = TradingCalendar(data["dates"])
+        else:
+            _trading_calendar = TradingCalendar(get_price_store().dates)
+            if len(_trading_calendar):
+                _save_trading_calendar()
+    return _trading_calendar
+
+
+def add_trading_dates(dates):
+    """거래일 추가 (새 거래일이 있을 때만 저장)"""
+    if get_trading_calendar().add(dates):
+        _save_trading_calendar()
+
+
+def _save_trading_calendar():
+    global _trading_calendar_stat
+    save_json(os.path.join(BASE_PATH, "calendar.json"), {"dates": _trading_calendar.dates}, compact=True)
+    _trading_calendar_stat = _calendar_stat()
+
+
+# ============================================
+# theme_metrics.json - 계산된 테마 지표 (backend/calculator.py)
+# ============================================
+def save_theme_metrics(date: str, themes: List[Dict]):
+    """
+    테마 지표 저장
+
+    Args:
+        date: 기준일 (가격 데이터 마지막 거래일)
+        themes: [
+            {"id": "141", "name": "...", "stocks": [...], "metrics": {...}, "stockMetrics": {...}, "history": []},
+            ...
+        ]
+    """
+    filepath = os.path.join(BASE_PATH, "theme_metrics.json")
+    save_json(filepath, {"date": date, "themes": themes}, compact=True)
+
+
+def load_theme_metrics() -> Dict:
+    """테마 지표 로드"""
+    filepath = os.path.join(BASE_PATH, "theme_metrics.json")
+    return load_json(filepath) or {"date": None, "themes": []}
+
+
+# ============================================
+# history/YYYY-MM.jsonl - 테마 일별 기록 (append-only, backend/history_recorder.py)
+# - 한 줄 = 하루 {"date": "2025-01-20", "themes": {"141": [HISTORY_FIELDS 순서 값]}}
+# - history/state.json: 꺾임 판정용 증분 상태 (전일 값, 고점, 연속 감소 일수)
+# ============================================
+HISTORY_FIELDS = (
+    "return_3w", "return_6w", "return_9w", "spread_3w", "spread_6w",
+    "stage", "leader_3w", "leader_6w", "leader_9w", "leader_volume", "collapse",
+)
+
+
+def get_history_filepath(year_month: str) -> str:
+    """월별 테마 기록 파일 경로 반환"""
+    return os.path.join(BASE_PATH, "history", f"{year_month}.jsonl")
+
+
+def list_history_months() -> List[str]:
+    """테마 기록이 있는 월 목록 (오름차순)"""
+    history_dir = os.path.join(BASE_PATH, "history")
+    if not os.path.isdir(history_dir):
+        return []
+    return sorted(name[:-6] for name in os.listdir(history_dir) if name.endswith(".jsonl"))
+
+
+def append_history(date: str, rows: Dict[str, List], truncate_at: int = None) -> int:
+    """
+    하루치 테마 기록 추가
+
+    Args:
+        date: "2025-01-20"
+        rows: {"141": [HISTORY_FIELDS 순서 값], ...}
+        truncate_at: 지정 시 해당 위치 이후를 잘라낸 뒤 기록 (같은 날 재기록)
+
+    Returns:
+        기록한 줄의 시작 위치 (byte offset)
+    """
+    filepath = get_history_filepath(date[:7])
+    ensure_dir(os.path.dirname(filepath))
+
+    line = json.dumps({"date": date, "themes": rows}, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+    with open(filepath, "ab") as f:
+        if truncate_at is not None and truncate_at <= f.tell():
+            f.truncate(truncate_at)
+            f.seek(truncate_at)
+        offset = f.tell()
+        # 이전 기록이 줄 중간에서 끊겼으면 새 줄에서 시작
+        if offset > 0:
+            with open(filepath, "rb") as r:
+                r.seek(offset - 1)
+                if r.read(1) != b"\n":
+                    line = "\n" + line
+                    offset += 1
+        content = line.encode("utf-8")
+        f.write(content)
+        f.flush()
+        os.fsync(f.fileno())
+    STORAGE_IO.add_write(len(content))
+
+    return offset
+
+
+def load_history(start_date: str, end_date: str, theme_ids: List[str] = None) -> List[Dict]:
+    """
+    기간 내 테마 기록 조회 (해당 월 파일만 읽음)
+
+    Args:
+        start_date: "2025-01-01"
+        end_date: "2025-01-31"
+        theme_ids: 지정 시 해당 테마만
+
+    Returns:
+        [{"date": "2025-01-20", "themes": {"141": [...]}}, ...] (날짜 오름차순, 값 순서 = HISTORY_FIELDS)
+    """
+    days = {}
+    for year_month in list_history_months():
+        if year_month < start_date[:7] or year_month > end_date[:7]:
+            continue
+        filepath = get_history_filepath(year_month)
+        STORAGE_IO.add_read(os.path.getsize(filepath))
+        with open(filepath, "r", encoding="utf-8") as f:
+            for line in f:
+                # 날짜만 먼저 확인 (기간 밖 줄은 파싱 생략)
+                date = line[9:19]
+                if date < start_date or date > end_date:
+                    continue
+                try:
+                    day = json.loads(line)
+                except ValueError:
+                    # 기록 도중 중단된 줄
+                    continue
+                if theme_ids is not None:
+                    day["themes"] = {tid: day["themes"][tid] for tid in theme_ids if tid in day["themes"]}
+                # 같은 날짜는 나중 줄 우선
+                days[day["date"]] = day
+
+    return [days[date] for date in sorted(days)]
+
+
+def save_history_state(state: Dict):
+    """테마 기록 증분 상태 저장 (history/state.json)"""
+    save_json(os.path.join(BASE_PATH, "history", "state.json"), state, compact=True)
+
+
+def load_history_state() -> Dict:
+    """테마 기록 증분 상태 로드"""
+    return load_json(os.path.join(BASE_PATH, "history", "state.json")) or {}
+
+
+# ============================================
+# bundle.json - 웹 데이터 묶음 (랭킹 페이지용, 내용 해시 파일명)
+# ============================================
+WEB_BUNDLE_VERSION = 1
+WEB_BUNDLE_SESSIONS = 50                       # 최근 N거래일 가격 (9주 수익률 + 여유)
+WEB_BUNDLE_MARKET_FIELDS = ("market_cap", "per", "pbr")
+WEB_BUNDLE_VALUE_UNIT = 1000000                # 거래대금 단위 (백만원, 키움 원 단위)
+WEB_BUNDLE_KEEP = 2                            # 보관할 묶음 수 (이전 포인터로 로드 중인 브라우저용)
+
+
+def build_web_bundle(sessions: int = WEB_BUNDLE_SESSIONS) -> Dict:
+    """
+    웹 데이터 묶음 생성
+    - 종목코드/이름/시장은 한 번만 나열하고 나머지는 종목 번호로 참조
+    - 가격은 최근 N거래일 (종목 × 거래일) 종가/거래대금 행렬, 데이터 없는 칸은 null
+
+    Returns:
+        {
+            "version": 1, "date": "2025-01-20",
+            "codes": ["005930", ...], "names": ["삼성전자", ...],
+            "markets": ["KOSPI", "KOSDAQ"], "stock_markets": [0, ...],
+            "themes": [{"id", "name", "stocks": [종목 번호...]}],
+            "market": {"date", "fields": [...], "rows": [[...] | null]},
+            "financial": {"quarter", "periods": [...], "fields": [...], "rows": [[분기 번호 | null, ...] | null]},
+            "prices": {"dates": [...], "value_unit": 1000000, "close": [[...] | null], "value": [[...] | null]},
+            "theme_metrics": theme_metrics.json 내용 | null
+        }
+    """
+    stocks = load_stocks()
+    themes = load_themes()
+    market = load_market()
+    financial = load_financial()
+
+    store = get_price_store()
+    start_date = store.dates[max(len(store.dates) - sessions, 0)] if store.dates else None
+    dates, store_codes, close, value = store.load_range(start_date)
+
+    codes = list(stocks)
+    seen = set(codes)
+    for extra in ([code for theme in themes for code in theme["stocks"]], market["data"], financial["data"], store_codes):
+        for code in extra:
+            if code not in seen:
+                seen.add(code)
+                codes.append(code)
+    code_ids = {code: i for i, code in enumerate(codes)}
+
+    markets = sorted({stock.get("market", "") for stock in stocks.values()})
+    market_ids = {name: i for i, name in enumerate(markets)}
+
+    periods = sorted({record["period"] for record in financial["data"].values() if record.get("period")})
+    period_ids = {period: i for i, period in enumerate(periods)}
+
+    def rows(records: Dict[str, Dict], build) -> List:
+        return [build(records[code]) if code in records else None for code in codes]
+
+    # 가격 행렬: 저장소 종목 순서 -> 묶음 종목 순서
+    close_rows = [None] * len(codes)
+    value_rows = [None] * len(codes)
+    if dates:
+        close_t = np.asarray(close).T
+        value_t = np.asarray(value).T
+        for col, code in enumerate(store_codes):
+            present = close_t[col] != PriceStore.MISSING
+            if not present.any():
+                continue
+            close_rows[code_ids[code]] = [int(c) if p else None for c, p in zip(close_t[col], present)]
+            value_rows[code_ids[code]] = [
+                int(round(v / WEB_BUNDLE_VALUE_UNIT)) if p else None for v, p in zip(value_t[col], present)
+            ]
+
+    return {
+        "version": WEB_BUNDLE_VERSION,
+        "date": dates[-1] if dates else market.get("date"),
+        "codes": codes,
+        "names": [stocks.get(code, {}).get("name", code) for code in codes],
+        "markets": markets,
+        "stock_markets": [market_ids.get(stocks.get(code, {}).get("market"), None) for code in codes],
+        "themes": [
+            {**theme, "stocks": [code_ids[code] for code in theme["stocks"]]}
+            for theme in themes
+        ],
+        "market": {
+            "date": market.get("date"),
+            "fields": list(WEB_BUNDLE_MARKET_FIELDS),
+            "rows": rows(market["data"], lambda record: [record.get(field) for field in WEB_BUNDLE_MARKET_FIELDS]),
+        },
+        "financial": {
+            "quarter": financial.get("quarter"),
+            "periods": periods,
+            "fields": list(FINANCIAL_FIELDS),
+            "rows": rows(financial["data"], lambda record: [period_ids.get(record.get("period"))] + [
+                record.get(field) for field in FINANCIAL_FIELDS
+            ]),
+        },
+        "prices": {
+            "dates": dates,
+            "value_unit": WEB_BUNDLE_VALUE_UNIT,
+            "close": close_rows,
+            "value": value_rows,
+        },
+        "theme_metrics": load_theme_metrics(),
+    }
+
+
+def export_web_bundle(sessions: int = WEB_BUNDLE_SESSIONS) -> str:
+    """
+    웹 데이터 묶음 저장
+    - bundle/<내용 해시>.json (+ .gz, brotli 설치 시 .br 미리 압축) -> 장기 캐시 가능
+    - bundle.json 포인터 {"version", "date", "file"} 만 매번 새로 받음
+
+    Returns:
+        묶음 파일 경로 (web/data 기준, "bundle/3f2a9c1b0d4e.json")
+    """
+    bundle = build_web_bundle(sessions)
+    content = json.dumps(bundle, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    digest = hashlib.sha256(content).hexdigest()[:12]
+
+    bundle_dir = os.path.join(BASE_PATH, "bundle")
+    ensure_dir(bundle_dir)
+    filename = f"{digest}.json"
+    filepath = os.path.join(bundle_dir, filename)
+
+    variants = [(filepath, content), (filepath + ".gz", gzip.compress(content, 9, mtime=0))]
+    if HAS_BROTLI:
+        variants.append((filepath + ".br", brotli.compress(content)))
+    for path, data in variants:
+        if not os.path.exists(path):
+            _write_file(path + ".tmp", data)
+            os.replace(path + ".tmp", path)
+
+    relative = f"bundle/{filename}"
+    save_json(os.path.join(BASE_PATH, "bundle.json"), {
+        "version": WEB_BUNDLE_VERSION,
+        "date": bundle["date"],
+        "file": relative,
+    })
+
+    # 오래된 묶음 정리 (현재 + 최근 것 포함 WEB_BUNDLE_KEEP 개 유지)
+    previous = sorted(
+        (name for name in os.listdir(bundle_dir) if name.endswith(".json") and name != filename),
+        key=lambda name: os.path.getmtime(os.path.join(bundle_dir, name)),
+        reverse=True
+    )
+    for name in previous[WEB_BUNDLE_KEEP - 1:]:
+        for suffix in ("", ".gz", ".br"):
+            path = os.path.join(bundle_dir, name + suffix)
+            if os.path.exists(path):
+                os.remove(path)
+
+    sizes = ", ".join(f"{os.path.basename(path)} {len(data) // 1024}KB" for path, data in variants)
+    print(f"웹 데이터 묶음 저장: {sizes}")
+    return relative
+
+
+# ============================================
+# progress/{job}.json - 장시간 수집 진행 상황 (체크포인트)
+# ============================================
+def get_crawl_progress_filepath(job: str) -> str:
+    """수집 진행 상황 파일 경로 반환"""
+    return os.path.join(BASE_PATH, "progress", f"{job}.json")
+
+
+def save_crawl_progress(job: str, progress: Dict):
+    """
+    수집 진행 상황 저장 (청크 저장 직후 호출)
+
+    Args:
+        job: "init", "all"
+        progress: {
+            "job": "init",
+            "started_at": "2025-01-20T15:40:00",
+            "today": "2025-01-20",
+            "codes": ["005930", ...],             # 수집 대상 전체
+            "done": {"prices": ["005930", ...]},  # 단계별 완료 종목
+            ...
+        }
+    """
+    ensure_dir(os.path.join(BASE_PATH, "progress"))
+    save_json(get_crawl_progress_filepath(job), progress)
+
+
+def load_crawl_progress(job: str) -> Dict:
+    """수집 진행 상황 로드 (없으면 None)"""
+    return load_json(get_crawl_progress_filepath(job))
+
+
+def clear_crawl_progress(job: str):
+    """수집 완료 후 진행 상황 삭제"""
+    filepath = get_crawl_progress_filepath(job)
+    for path in (filepath, filepath + CHECKSUM_SUFFIX):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+# ============================================
+# jobs/log.jsonl - 수집 작업 기록 (server.py 작업 관리자, append-only)
+# ============================================
+def get_job_log_filepath() -> str:
+    """작업 기록 파일 경로 반환"""
+    return os.path.join(BASE_PATH, "jobs", "log.jsonl")
+
+
+def append_job_log(job: Dict):
+    """
+    완료된 작업 한 줄 추가
+
+    Args:
+        job: {"id", "type", "state", "message", "created_at", "started_at", "finished_at",
+              "stages": [{"name", "seconds"}], ...}
+    """
+    filepath = get_job_log_filepath()
+    ensure_dir(os.path.dirname(filepath))
+    content = (json.dumps(job, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+    with open(filepath, "ab") as f:
+        f.write(content)
+        f.flush()
+        os.fsync(f.fileno())
+    STORAGE_IO.add_write(len(content))
+
+
+def load_job_log(limit: int = 50) -> List[Dict]:
+    """최근 작업 기록 (최신순, 중간에 끊긴 줄은 무시)"""
+    filepath = get_job_log_filepath()
+    if not os.path.exists(filepath):
+        return []
+
+    jobs = []
+    STORAGE_IO.add_read(os.path.getsize(filepath))
+    with open(filepath, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                jobs.append(json.loads(line))
+            except ValueError:
+                continue
+    return jobs[::-1][:limit]
+
+
 # ============================================
 # 유틸리티 함수
 # ============================================
@@ -238,18 +1334,24 @@ def get_recent_months(count: int = 3) -> List[str]:
 
 
 def get_last_price_date() -> str:
-    """저장된 가격 데이터의 마지막 날짜 반환"""
-    months = get_recent_months(3)
-    last_date = None
+    """저장된 가격 데이터의 마지막 날짜 반환 (거래일 달력)"""
+    return get_trading_calendar().last_date
 
-    for month in months:
-        data = load_prices(month)
-        for stock_code, dates in data.items():
-            for date in dates.keys():
-                if last_date is None or date > last_date:
-                    last_date = date
 
-    return last_date
+def set_base_path(path: str):
+    """
+    저장 경로 변경 (벤치마크/시뮬레이터 실행용)
+
+    Args:
+        path: 새 데이터 디렉토리 (web/data 구조)
+    """
+    global BASE_PATH, PRICE_STORE_PATH, PRICE_DELTA_PATH, _price_store, _trading_calendar, _trading_calendar_stat
+    BASE_PATH = path
+    PRICE_STORE_PATH = os.path.join(BASE_PATH, "prices", "store")
+    PRICE_DELTA_PATH = os.path.join(BASE_PATH, "prices", "deltas")
+    _price_store = None
+    _trading_calendar = None
+    _trading_calendar_stat = None
 
 
 def init_data_directory():
@@ -0,0 +1,112 @@
+"""
+재무 크롤러 테스트 (로컬 대역 서버 naver/fixture_server.py, 외부 네트워크 없음)
+
+실행:
+    cd crawlers && python -m unittest discover tests
+"""
+import os
+import sys
+import unittest
+from datetime import datetime
+
+# crawlers 디렉토리를 경로에 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from naver.financial_crawler import FinancialCrawler
+from naver.fixture_server import FixtureServer
+
+EOK = 100000000
+
+FINANCIAL = {
+    # 최근 실적 2025-Q3 (2025.12 열은 미발표 빈 칸)
+    "005930": {"period": "2025-Q3", "revenue": 79000 * EOK, "operating_profit": 9180 * EOK},
+    # 매출액 빈 칸 (은행 등)
+    "105560": {"period": "2025-Q4", "revenue": None, "operating_profit": 1500 * EOK},
+    "000660": {"period": "2025-Q4", "revenue": 40000 * EOK, "operating_profit": 12000 * EOK},
+}
+
+
+def make_crawler(server: FixtureServer, **kwargs) -> FinancialCrawler:
+    crawler = FinancialCrawler(base_url=server.base_url, request_interval=0.0, **kwargs)
+    crawler.RETRY_BACKOFF = 0.0
+    return crawler
+
+
+class FinancialCrawlerTest(unittest.TestCase):
+
+    def test_values(self):
+        """최근 실적 열 선택, 빈 칸 = None, 전체 실적 열 파싱"""
+        with FixtureServer(financial=FINANCIAL) as server:
+            result = make_crawler(server).crawl_stocks(list(FINANCIAL))
+
+        self.assertEqual(list(result), list(FINANCIAL))
+
+        samsung = result["005930"]
+        self.assertEqual(samsung["period"], "2025-Q3")
+        self.assertEqual(samsung["revenue"], 79000 * EOK)
+        self.assertEqual(samsung["operating_profit"], 9180 * EOK)
+        quarterly = samsung["history"]["quarterly"]
+        self.assertNotIn("2025-Q4", quarterly)
+        self.assertEqual(quarterly["2025-Q3"]["revenue"], 79000 * EOK)
+        self.assertLess(quarterly["2025-Q2"]["revenue"], quarterly["2025-Q3"]["revenue"])
+        self.assertIn("2024", samsung["history"]["annual"])
+        self.assertNotIn("2025", samsung["history"]["annual"])
+
+        bank = result["105560"]
+        self.assertEqual(bank["period"], "2025-Q4")
+        self.assertIsNone(bank["revenue"])
+        self.assertEqual(bank["operating_profit"], 1500 * EOK)
+
+    def test_parse_pool(self):
+        """프로세스 풀 파싱 결과 = 요청 스레드 파싱 결과"""
+        with FixtureServer(financial=FINANCIAL) as server:
+            inline = make_crawler(server, parse_workers=0).crawl_stocks(list(FINANCIAL))
+            pooled = make_crawler(server, parse_workers=2).crawl_stocks(list(FINANCIAL))
+        self.assertEqual(inline, pooled)
+
+    def test_retry_on_503(self):
+        """일시 오류(503) 재시도 후 전체 종목 수집"""
+        codes = [f"{i:06d}" for i in range(20)]
+        financial = {code: {"period": "2025-Q3", "revenue": (i + 1) * 1000 * EOK, "operating_profit": (i + 1) * 100 * EOK}
+                     for i, code in enumerate(codes)}
+
+        with FixtureServer(financial=financial, error_rate=0.3, seed=1) as server:
+            crawler = make_crawler(server)
+            crawler.MAX_RETRIES = 10
+            result = crawler.crawl_stocks(codes)
+
+        self.assertGreater(server.error_count, 0)
+        self.assertEqual(crawler.retry_count, server.error_count)
+        self.assertEqual(crawler.request_count, len(codes) + server.error_count)
+        self.assertEqual(sorted(result), codes)
+        self.assertEqual(result["000003"]["revenue"], 4000 * EOK)
+
+    def test_refresh_skips_unchanged(self):
+        """지문이 같은 종목은 변경 없음 처리, 최신 지문 종목은 요청 안 함"""
+        today = datetime.now().strftime("%Y-%m-%d")
+        financial = {code: dict(data) for code, data in FINANCIAL.items()}
+
+        with FixtureServer(financial=financial) as server:
+            first = make_crawler(server).crawl_stocks(list(financial))
+            fingerprints = {
+                code: {"period": data["period"], "hash": data["fingerprint"], "checked": "2000-01-01"}
+                for code, data in first.items()
+            }
+            # 005930: 최신 분기 + 오늘 확인 -> 요청 안 함
+            crawler = make_crawler(server)
+            fingerprints["005930"] = {"period": crawler.get_current_quarter(), "hash": "old", "checked": today}
+            # 000660: 내용 변경
+            financial["000660"]["operating_profit"] = 13000 * EOK
+
+            requests_before = server.request_count
+            changed = crawler.refresh_stocks(list(financial), fingerprints)
+
+        self.assertEqual(server.request_count - requests_before, 2)
+        self.assertEqual(list(changed), ["000660"])
+        self.assertEqual(changed["000660"]["operating_profit"], 13000 * EOK)
+        self.assertEqual(fingerprints["105560"]["checked"], today)
+        self.assertEqual(fingerprints["005930"]["hash"], "old")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+"""
+거래일 달력 인덱스
+- 정렬된 거래일 배열 + 날짜 -> 위치 맵
+- 마지막 거래일 / N거래일 전 / 누락 거래일 수를 O(1)로 조회
+- 저장/로드는 storage.get_trading_calendar() (calendar.json, 가격 저장 시 함께 갱신)
+"""
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+# KRX 휴장일 (주말 제외, 매년 거래소 휴장일 공지로 추가)
+# - 목록에 없는 연도는 평일 기준 (공휴일만큼 더 요청될 뿐 누락은 없음)
+# - 확정되지 않은 날은 넣지 않음 (잘못 넣으면 그 날 데이터를 요청하지 않음)
+KRX_HOLIDAYS = {
+    2025: [
+        "2025-01-01", "2025-01-27", "2025-01-28", "2025-01-29", "2025-01-30",
+        "2025-03-03", "2025-05-01", "2025-05-05", "2025-05-06", "2025-06-03", "2025-06-06",
+        "2025-08-15", "2025-10-03", "2025-10-06", "2025-10-07", "2025-10-08", "2025-10-09",
+        "2025-12-25", "2025-12-31",
+    ],
+    2026: [
+        "2026-01-01", "2026-02-16", "2026-02-17", "2026-02-18", "2026-03-02",
+        "2026-05-01", "2026-05-05", "2026-05-25", "2026-06-03", "2026-08-17",
+        "2026-09-24", "2026-09-25", "2026-09-28", "2026-10-05", "2026-10-09",
+        "2026-12-25", "2026-12-31",
+    ],
+}
+
+
+class TradingCalendar:
+    """거래일 달력 (오름차순)"""
+
+    def __init__(self, dates: Iterable[str] = (), holidays: Dict[int, List[str]] = None):
+        """
+        Args:
+            dates: 거래일 목록
+            holidays: 연도별 휴장일 {2025: ["2025-01-01", ...]}, 기본값 KRX_HOLIDAYS
+        """
+        self.dates: List[str] = sorted(set(dates))
+        self.index: Dict[str, int] = {date: i for i, date in enumerate(self.dates)}
+        self.holidays = KRX_HOLIDAYS if holidays is None else holidays
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def __contains__(self, date: str) -> bool:
+        return date in self.index
+
+    @property
+    def last_date(self) -> Optional[str]:
+        """마지막 거래일"""
+        return self.dates[-1] if self.dates else None
+
+    def position(self, date: str) -> Optional[int]:
+        """거래일 위치 (거래일이 아니면 None)"""
+        return self.index.get(date)
+
+    def days_ago(self, n: int, base_date: str = None) -> Optional[str]:
+        """
+        N거래일 전 날짜
+
+        Args:
+            n: 0 = 기준일
+            base_date: 기준 거래일 (기본값 마지막 거래일)
+        """
+        base = len(self.dates) - 1 if base_date is None else self.index.get(base_date)
+        if base is None or base - n < 0 or n < 0:
+            return None
+        return self.dates[base - n]
+
+    def sessions_after(self, date: str) -> int:
+        """해당 날짜 이후 기록된 거래일 수"""
+        position = self.index.get(date)
+        if position is not None:
+            return len(self.dates) - 1 - position
+        return sum(1 for d in self.dates if d > date)
+
+    def missing_sessions(self, today: str) -> int:
+        """
+        마지막 거래일 다음 날 ~ 오늘까지 거래일 수 (평일 - KRX 휴장일)
+        - 휴장일 목록에 없는 연도가 포함되면 그 연도는 평일 기준 (실제 거래일 수 이상)
+        """
+        if not self.dates or today <= self.dates[-1]:
+            return 0
+        start = datetime.strptime(self.dates[-1], "%Y-%m-%d") + timedelta(days=1)
+        end = datetime.strptime(today, "%Y-%m-%d") + timedelta(days=1)
+
+        missing_years = [year for year in range(start.year, end.year + 1) if year not in self.holidays]
+        if missing_years:
+            print(f"휴장일 목록에 없는 연도: {missing_years} - 평일 기준으로 계산 (공휴일만큼 더 요청)")
+
+        holidays = [date for dates in self.holidays.values() for date in dates]
+        return int(np.busday_count(start.date(), end.date(), holidays=np.array(holidays, dtype="datetime64[D]")))
+
+    def add(self, dates: Iterable[str]) -> bool:
+        """
+        거래일 추가
+
+        Returns:
+            새 거래일이 있었으면 True
+        """
+        new_dates = sorted(set(dates) - self.index.keys())
+        if not new_dates:
+            return False
+
+        if not self.dates or new_dates[0] > self.dates[-1]:
+            # 일반적인 경우: 끝에 추가
+            for date in new_dates:
+                self.index[date] = len(self.dates)
+                self.dates.append(date)
+        else:
+            # 과거 날짜 삽입 (백필): 다시 정렬
+            self.dates = sorted(self.dates + new_dates)
+            self.index = {date: i for i, date in enumerate(self.dates)}
+        return True
@@ -5,7 +5,7 @@ let currentStage = 'all';
 // 초기화
 document.addEventListener('DOMContentLoaded', async () => {
     showLoading(true);
-    const success = await loadAllData();
+    const success = await loadAllData({ prices: false });
     showLoading(false);
 
     if (success) {
@@ -361,6 +361,22 @@ function openThemeDetail(themeId) {
                     </table>
                 </div>
             </div>
+            ${theme.history && theme.history.length ? `
+            <div class="detail-card full-width">
+                <div class="detail-history">
+                    <h4>📊 단계 히스토리</h4>
+                    <ul class="history-list">
+                        ${theme.history.map(event => `
+                            <li>
+                                <span class="date">${event.date}</span>
+                                <span class="badge ${getStageClass(event.stage)}">${event.stage}</span>
+                                <span class="event">${event.message}</span>
+                            </li>
+                        `).join('')}
+                    </ul>
+                </div>
+            </div>
+            ` : ''}
             <div class="modal-bottom-close">
                 <button class="btn-close-modal" onclick="closeModal()">닫기</button>
             </div>
@@ -5,8 +5,10 @@ let DATA = {
     stocks: {},      // 종목 기본정보
     themes: [],      // 테마 목록
     prices: {},      // 가격 데이터 (월별 통합)
+    calendar: [],    // 거래일 달력 (로드된 가격 데이터의 날짜, 오름차순)
     market: {},      // 시장 데이터
     financial: {},   // 재무 데이터
+    stockThemes: {}, // 종목 → 포함 테마 인덱스 (DATA.themes 위치, theme_index.json)
     baseDate: null,  // 기준일
     loaded: false
 };
@@ -14,26 +16,139 @@ let DATA = {
 // 계산된 테마 데이터
 let CALCULATED_THEMES = [];
 
+// 종목별 지표 공유 테이블 (종목당 1회 계산, 여러 테마에서 재사용)
+// - { "005930": { return_3w, return_6w, return_9w, avg_volume_1w } }, 수익률 계산 불가 = null
+// - 가격 데이터가 바뀌면 resetStockMetrics() 로 초기화
+let STOCK_METRICS = {};
+
 // 데이터 로드
-async function loadAllData() {
+// - options.prices: 가격 데이터 로드 여부 (내 테마 계산 등 클라이언트 계산에 필요)
+// - data/bundle.json 이 있으면 묶음 파일 하나만 받음 (storage.export_web_bundle), 없으면 개별 JSON 로드
+async function loadAllData(options = {}) {
+    const { prices: needPrices = true } = options;
+
     try {
         console.log('데이터 로드 시작...');
 
-        // 병렬로 모든 데이터 로드
-        const [stocks, themes, market, financial] = await Promise.all([
-            fetch('data/stocks.json').then(r => r.json()),
-            fetch('data/themes.json').then(r => r.json()),
-            fetch('data/market.json').then(r => r.json()),
-            fetch('data/financial.json').then(r => r.json())
-        ]);
-
-        DATA.stocks = stocks;
-        DATA.themes = themes.themes;
-        DATA.market = market.data;
-        DATA.financial = financial.data;
-        DATA.baseDate = market.date;
-
-        // 가격 데이터 로드 (최근 3개월)
+        const bundle = await fetchBundle();
+        const themeMetrics = bundle
+            ? applyBundle(bundle, needPrices)
+            : await loadDataFiles(needPrices);
+        buildTradingCalendar();
+        resetStockMetrics();
+
+        DATA.loaded = true;
+        console.log(`데이터 로드 완료: ${Object.keys(DATA.stocks).length}개 종목, ${DATA.themes.length}개 테마`);
+
+        // 테마 지표: 미리 계산된 결과 사용, 없으면 직접 계산
+        if (hasPrecomputedMetrics(themeMetrics)) {
+            CALCULATED_THEMES = themeMetrics.themes;
+            DATA.baseDate = themeMetrics.date || DATA.baseDate;
+            console.log(`테마 지표 로드 완료: ${CALCULATED_THEMES.length}개 테마 (${themeMetrics.date} 기준)`);
+        } else {
+            calculateAllThemeMetrics();
+        }
+
+        return true;
+    } catch (error) {
+        console.error('데이터 로드 실패:', error);
+        return false;
+    }
+}
+
+function hasPrecomputedMetrics(themeMetrics) {
+    return !!(themeMetrics && themeMetrics.themes && themeMetrics.themes.length);
+}
+
+// 웹 데이터 묶음 (bundle.json 포인터는 매번 새로 받고, 내용 해시 파일명의 묶음은 캐시 사용)
+async function fetchBundle() {
+    const pointer = await fetch('data/bundle.json', { cache: 'no-cache' })
+        .then(r => r.ok ? r.json() : null)
+        .catch(() => null);
+    if (!pointer || pointer.version !== 1 || !pointer.file) return null;
+
+    return fetch(`data/${pointer.file}`)
+        .then(r => r.ok ? r.json() : null)
+        .catch(() => null);
+}
+
+// 묶음 -> DATA (종목 번호 -> 종목코드, 행 배열 -> 객체)
+// - 반환: 미리 계산된 테마 지표 (theme_metrics.json 내용) 또는 null
+function applyBundle(bundle, needPrices) {
+    const codes = bundle.codes;
+    const toRecords = (section, build) => {
+        const records = {};
+        section.rows.forEach((row, i) => {
+            if (row) records[codes[i]] = build(row);
+        });
+        return records;
+    };
+    const withFields = (fields, values) => {
+        const record = {};
+        fields.forEach((field, f) => { record[field] = values[f]; });
+        return record;
+    };
+
+    DATA.stocks = {};
+    codes.forEach((code, i) => {
+        const market = bundle.stock_markets[i];
+        DATA.stocks[code] = { name: bundle.names[i], market: market === null ? '' : bundle.markets[market] };
+    });
+    DATA.themes = bundle.themes.map(theme => ({ ...theme, stocks: theme.stocks.map(i => codes[i]) }));
+    DATA.stockThemes = buildStockThemes(DATA.themes, null);
+    DATA.market = toRecords(bundle.market, row => withFields(bundle.market.fields, row));
+    DATA.financial = toRecords(bundle.financial, row => {
+        const record = withFields(bundle.financial.fields, row.slice(1));
+        if (row[0] !== null) record.period = bundle.financial.periods[row[0]];
+        return record;
+    });
+    DATA.baseDate = bundle.market.date;
+
+    DATA.prices = {};
+    const themeMetrics = bundle.theme_metrics;
+    if (needPrices || !hasPrecomputedMetrics(themeMetrics)) {
+        const { dates, close, value, value_unit: unit } = bundle.prices;
+        close.forEach((closes, i) => {
+            if (!closes) return;
+            const values = value[i];
+            const priceData = DATA.prices[codes[i]] = {};
+            dates.forEach((date, d) => {
+                if (closes[d] !== null) priceData[date] = { close: closes[d], value: values[d] * unit };
+            });
+        });
+    }
+    return themeMetrics;
+}
+
+// 개별 JSON 로드 (묶음이 없을 때)
+// - 반환: 미리 계산된 테마 지표 (theme_metrics.json) 또는 null
+async function loadDataFiles(needPrices) {
+    // 병렬로 모든 데이터 로드
+    const [stocks, themes, themeIndex, market, financial, themeMetrics] = await Promise.all([
+        fetch('data/stocks.json').then(r => r.json()),
+        fetch('data/themes.json').then(r => r.json()),
+        // 종목 → 테마 역색인 (없으면 themes.json 으로 생성)
+        fetch('data/theme_index.json')
+            .then(r => r.ok ? r.json() : null)
+            .catch(() => null),
+        fetch('data/market.json').then(r => r.json()),
+        fetch('data/financial.json').then(r => r.json()),
+        // 서버에서 미리 계산된 테마 지표 (backend/calculator.py)
+        fetch('data/theme_metrics.json')
+            .then(r => r.ok ? r.json() : null)
+            .catch(() => null)
+    ]);
+
+    DATA.stocks = stocks;
+    DATA.themes = themes.themes;
+    DATA.stockThemes = buildStockThemes(DATA.themes, themeIndex);
+    DATA.market = market.data;
+    DATA.financial = financial.data;
+    DATA.baseDate = market.date;
+
+    // 가격 데이터 로드 (최근 3개월) - 미리 계산된 지표가 없으면 직접 계산해야 하므로 필수
+    DATA.prices = {};
+    if (needPrices || !hasPrecomputedMetrics(themeMetrics)) {
         const priceMonths = getRecentMonths(3);
         const pricePromises = priceMonths.map(month =>
             fetch(`data/prices/${month}.json`)
@@ -43,7 +158,6 @@ async function loadAllData() {
         const priceDataArray = await Promise.all(pricePromises);
 
         // 가격 데이터 병합
-        DATA.prices = {};
         priceDataArray.forEach(monthData => {
             for (const [code, dates] of Object.entries(monthData)) {
                 if (!DATA.prices[code]) DATA.prices[code] = {};
@@ -51,17 +165,65 @@ async function loadAllData() {
             }
         });
 
-        DATA.loaded = true;
-        console.log(`데이터 로드 완료: ${Object.keys(DATA.stocks).length}개 종목, ${DATA.themes.length}개 테마`);
-
-        // 테마 지표 계산
-        calculateAllThemeMetrics();
+        // 아직 월별 파일에 압축되지 않은 일별 변경분 병합
+        await mergePriceDeltas(priceMonths);
+    }
+    return themeMetrics;
+}
 
-        return true;
-    } catch (error) {
-        console.error('데이터 로드 실패:', error);
-        return false;
+// 종목 → 포함 테마 인덱스 (DATA.themes 위치)
+// - theme_index.json: codes[종목 ID], stock_themes[종목 ID] = [테마 ID...] (테마 ID = themes.json 순서)
+function buildStockThemes(themes, index) {
+    const stockThemes = {};
+    if (index && index.themes && index.themes.length === themes.length
+        && index.themes.every((id, t) => id === themes[t].id)) {
+        index.codes.forEach((code, i) => {
+            stockThemes[code] = index.stock_themes[i];
+        });
+        return stockThemes;
     }
+
+    // 역색인이 없거나 themes.json 과 맞지 않으면 직접 생성
+    themes.forEach((theme, t) => {
+        for (const code of theme.stocks) {
+            const list = stockThemes[code] || (stockThemes[code] = []);
+            if (list[list.length - 1] !== t) list.push(t);
+        }
+    });
+    return stockThemes;
+}
+
+// 종목이 포함된 테마 목록
+function getStockThemes(code) {
+    return (DATA.stockThemes[code] || []).map(t => DATA.themes[t]);
+}
+
+// 일별 가격 변경분 병합 (prices/deltas/YYYY-MM-DD.jsonl, 한 줄 = 한 종목)
+async function mergePriceDeltas(months) {
+    const index = await fetch('data/prices/deltas/index.json')
+        .then(r => r.ok ? r.json() : { dates: [] })
+        .catch(() => ({ dates: [] }));
+
+    const dates = (index.dates || []).filter(date => months.includes(date.slice(0, 7)));
+    const texts = await Promise.all(dates.map(date =>
+        fetch(`data/prices/deltas/${date}.jsonl`)
+            .then(r => r.ok ? r.text() : '')
+            .catch(() => '')
+    ));
+
+    texts.forEach((text, i) => {
+        for (const line of text.split('\n')) {
+            if (!line.trim()) continue;
+            let row;
+            try {
+                row = JSON.parse(line);
+            } catch (e) {
+                continue;  // 기록 도중 중단된 줄
+            }
+            if (!DATA.prices[row.code]) DATA.prices[row.code] = {};
+            DATA.prices[row.code][dates[i]] = { close: row.close, value: row.value };
+        }
+    });
 }
 
 // 최근 N개월 목록 반환
@@ -75,15 +237,35 @@ function getRecentMonths(n) {
     return months;
 }
 
-// 종목의 N일전 종가 가져오기
-function getClosePrice(code, daysAgo = 0) {
+// 거래일 달력 생성 (가격 데이터 로드 후 1회 정렬)
+function buildTradingCalendar() {
+    const dates = new Set();
+    for (const priceData of Object.values(DATA.prices)) {
+        for (const date in priceData) dates.add(date);
+    }
+    DATA.calendar = [...dates].sort();
+}
+
+// 종목의 최근 N개 거래일 가격 (최신순, 거래일 달력을 뒤에서부터 탐색 - 정렬 없음)
+function getRecentPrices(code, count) {
     const priceData = DATA.prices[code];
-    if (!priceData) return null;
+    const recent = [];
+    if (!priceData) return recent;
 
-    const dates = Object.keys(priceData).sort().reverse();
-    if (dates.length <= daysAgo) return null;
+    const calendar = DATA.calendar;
+    for (let i = calendar.length - 1; i >= 0 && recent.length < count; i--) {
+        const price = priceData[calendar[i]];
+        if (price !== undefined) recent.push(price);
+    }
+    return recent;
+}
 
-    return priceData[dates[daysAgo]]?.close || null;
+// 종목의 N일전 종가 가져오기 (종목에 데이터가 있는 날짜 기준)
+function getClosePrice(code, daysAgo = 0) {
+    const recent = getRecentPrices(code, daysAgo + 1);
+    if (recent.length <= daysAgo) return null;
+
+    return recent[daysAgo]?.close || null;
 }
 
 // 종목의 N주 수익률 계산
@@ -98,22 +280,58 @@ function calcReturn(code, weeks) {
 
 // 종목의 최근 1주 평균 거래대금
 function calcAvgVolume(code, days = 5) {
-    const priceData = DATA.prices[code];
-    if (!priceData) return 0;
+    const recent = getRecentPrices(code, days);
+    if (recent.length === 0) return 0;
 
-    const dates = Object.keys(priceData).sort().reverse().slice(0, days);
-    if (dates.length === 0) return 0;
+    const total = recent.reduce((sum, price) => sum + (price?.value || 0), 0);
+    return total / recent.length;
+}
 
-    const total = dates.reduce((sum, date) => sum + (priceData[date]?.value || 0), 0);
-    return total / dates.length;
+// 종목 지표 계산 (수익률 3/6/9주 + 1주 평균 거래대금)
+function calcStockMetrics(code) {
+    return {
+        return_3w: calcReturn(code, 3),
+        return_6w: calcReturn(code, 6),
+        return_9w: calcReturn(code, 9),
+        avg_volume_1w: calcAvgVolume(code)
+    };
+}
+
+// 공유 테이블에서 종목 지표 조회 (없으면 계산 후 저장)
+function getStockMetrics(code) {
+    let metrics = STOCK_METRICS[code];
+    if (!metrics) {
+        metrics = STOCK_METRICS[code] = calcStockMetrics(code);
+    }
+    return metrics;
+}
+
+// 공유 테이블 채우기 (1단계: 고유 종목당 1회)
+function buildStockMetrics(codes) {
+    for (const code of codes) {
+        getStockMetrics(code);
+    }
+    return STOCK_METRICS;
+}
+
+function resetStockMetrics() {
+    STOCK_METRICS = {};
+}
+
+// 테마 종목의 N주 수익률 (계산 불가 종목 제외)
+function gatherReturns(theme, weeks) {
+    const key = `return_${weeks}w`;
+    const returns = [];
+    for (const code of theme.stocks) {
+        const ret = getStockMetrics(code)[key];
+        if (ret !== null) returns.push(ret);
+    }
+    return returns;
 }
 
 // 테마 수익률 계산 (상위 3~5개 평균)
 function calcThemeReturn(theme, weeks) {
-    const returns = theme.stocks
-        .map(code => calcReturn(code, weeks))
-        .filter(r => r !== null)
-        .sort((a, b) => b - a);
+    const returns = gatherReturns(theme, weeks).sort((a, b) => b - a);
 
     if (returns.length === 0) return 0;
 
@@ -125,9 +343,7 @@ function calcThemeReturn(theme, weeks) {
 
 // 확산도 계산 (threshold 이상 상승한 종목 비율)
 function calcSpread(theme, weeks, threshold) {
-    const returns = theme.stocks
-        .map(code => calcReturn(code, weeks))
-        .filter(r => r !== null);
+    const returns = gatherReturns(theme, weeks);
 
     if (returns.length === 0) return 0;
 
@@ -137,11 +353,12 @@ function calcSpread(theme, weeks, threshold) {
 
 // 대장주 찾기 (수익률 기준)
 function findLeader(theme, weeks) {
+    const key = `return_${weeks}w`;
     let maxReturn = -Infinity;
     let leader = null;
 
     for (const code of theme.stocks) {
-        const ret = calcReturn(code, weeks);
+        const ret = getStockMetrics(code)[key];
         if (ret !== null && ret > maxReturn) {
             maxReturn = ret;
             leader = code;
@@ -156,7 +373,7 @@ function findVolumeLeader(theme) {
     let leader = null;
 
     for (const code of theme.stocks) {
-        const vol = calcAvgVolume(code);
+        const vol = getStockMetrics(code).avg_volume_1w;
         if (vol > maxVolume) {
             maxVolume = vol;
             leader = code;
@@ -193,6 +410,13 @@ function determineStage(return3w, return6w, spread3w, spread6w) {
 function calculateAllThemeMetrics() {
     console.log('테마 지표 계산 시작...');
 
+    // 1단계: 종목 지표를 종목당 1회 계산
+    const codes = Object.keys(DATA.stockThemes);
+    buildStockMetrics(codes);
+    const memberships = DATA.themes.reduce((sum, theme) => sum + theme.stocks.length, 0);
+    console.log(`종목 지표 계산: ${codes.length}개 종목 (테마 소속 ${memberships}건)`);
+
+    // 2단계: 공유 테이블에서 테마별 집계
     const themeMetrics = DATA.themes.map(theme => {
         // 기간별 수익률
         const return_3w = calcThemeReturn(theme, 3);
@@ -215,11 +439,12 @@ function calculateAllThemeMetrics() {
         // 종목별 지표
         const stockMetrics = {};
         for (const code of theme.stocks) {
+            const metrics = getStockMetrics(code);
             stockMetrics[code] = {
-                return_3w: calcReturn(code, 3) || 0,
-                return_6w: calcReturn(code, 6) || 0,
-                return_9w: calcReturn(code, 9) || 0,
-                avg_volume_1w: calcAvgVolume(code)
+                return_3w: metrics.return_3w || 0,
+                return_6w: metrics.return_6w || 0,
+                return_9w: metrics.return_9w || 0,
+                avg_volume_1w: metrics.avg_volume_1w
             };
         }
 
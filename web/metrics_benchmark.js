@@ -0,0 +1,94 @@
+// Thema Signal - 테마 지표 계산 호출 수 벤치마크 (Node.js)
+//
+// data.js 의 calculateAllThemeMetrics 를 실제 themes.json / 가격 데이터로 실행하고
+// 종목 지표 함수(calcReturn, calcAvgVolume) 호출 수와 시간을 비교
+//   - 공유 없음: 테마마다 종목 지표 재계산 (종목이 속한 테마 수만큼 반복)
+//   - 공유 테이블: 종목 지표를 종목당 1회 계산 후 테마별 집계 (현재 방식)
+//
+// 사용법:
+//   node web/metrics_benchmark.js                # web/data
+//   node web/metrics_benchmark.js /tmp/thema     # 다른 데이터 경로
+
+const fs = require('fs');
+const path = require('path');
+const vm = require('vm');
+
+const DATA_PATH = process.argv[2] || path.join(__dirname, 'data');
+
+// 최근 3개월 가격 파일 병합 (웹과 동일)
+function loadPrices() {
+    const prices = {};
+    const months = fs.readdirSync(path.join(DATA_PATH, 'prices'))
+        .filter(name => /^\d{4}-\d{2}\.json$/.test(name))
+        .sort()
+        .slice(-3);
+    for (const name of months) {
+        const monthData = JSON.parse(fs.readFileSync(path.join(DATA_PATH, 'prices', name), 'utf8'));
+        for (const [code, dates] of Object.entries(monthData)) {
+            prices[code] = Object.assign(prices[code] || {}, dates);
+        }
+    }
+    return prices;
+}
+
+// data.js 를 독립된 컨텍스트에 적재하고 종목 지표 함수 호출 수 계측
+function createContext(themes, prices) {
+    const context = { console: { log() {} }, calls: { calcReturn: 0, calcAvgVolume: 0 } };
+    vm.createContext(context);
+    vm.runInContext(fs.readFileSync(path.join(__dirname, 'data.js'), 'utf8'), context);
+
+    context.themes = themes;
+    context.prices = prices;
+    vm.runInContext(`
+        DATA.themes = themes;
+        DATA.prices = prices;
+        DATA.stockThemes = buildStockThemes(DATA.themes, null);
+        buildTradingCalendar();
+
+        const _calcReturn = calcReturn;
+        const _calcAvgVolume = calcAvgVolume;
+        calcReturn = (code, weeks) => { calls.calcReturn++; return _calcReturn(code, weeks); };
+        calcAvgVolume = (code, days) => { calls.calcAvgVolume++; return _calcAvgVolume(code, days); };
+    `, context);
+    return context;
+}
+
+function measure(themes, prices, shared) {
+    const context = createContext(themes, prices);
+    if (!shared) {
+        // 공유 테이블 없이 조회할 때마다 계산
+        vm.runInContext('getStockMetrics = code => calcStockMetrics(code);', context);
+    }
+
+    const start = process.hrtime.bigint();
+    vm.runInContext('calculateAllThemeMetrics();', context);
+    const ms = Number(process.hrtime.bigint() - start) / 1e6;
+
+    return {
+        calcReturn: context.calls.calcReturn,
+        calcAvgVolume: context.calls.calcAvgVolume,
+        ms: Math.round(ms * 10) / 10,
+        result: JSON.stringify(vm.runInContext('CALCULATED_THEMES', context))
+    };
+}
+
+const themes = JSON.parse(fs.readFileSync(path.join(DATA_PATH, 'themes.json'), 'utf8')).themes;
+const prices = loadPrices();
+
+const memberships = themes.reduce((sum, theme) => sum + theme.stocks.length, 0);
+const uniqueStocks = new Set(themes.flatMap(theme => theme.stocks)).size;
+
+const perTheme = measure(themes, prices, false);
+const shared = measure(themes, prices, true);
+
+console.log(JSON.stringify({
+    themes: themes.length,
+    memberships,
+    unique_stocks: uniqueStocks,
+    per_theme: { calcReturn: perTheme.calcReturn, calcAvgVolume: perTheme.calcAvgVolume, ms: perTheme.ms },
+    shared: { calcReturn: shared.calcReturn, calcAvgVolume: shared.calcAvgVolume, ms: shared.ms },
+    call_reduction: Math.round(
+        (perTheme.calcReturn + perTheme.calcAvgVolume) / (shared.calcReturn + shared.calcAvgVolume) * 10
+    ) / 10,
+    same_result: perTheme.result === shared.result
+}, null, 2));